@@ -2,21 +2,37 @@
 
 # Imports
 import sys
+from utilities.startup import startup  # First, so startup is timed from here
+from utilities.tracer import tracer
 from views.style import Style
 from views.window_view import Window
 # Qt
 from PySide6.QtWidgets import QApplication
 
 
-"""Main program for analyzing user data."""
+"""Main program for analyzing user data.
+
+Set ANALYZER_TRACE=1 to show a latency overlay of processing stages, or to
+a .json path to also write a Chrome trace there on exit. Set
+ANALYZER_STARTUP=1 to print the time to first paint and other startup
+milestones, or to a .json path to write them there.
+"""
 __author__ = "Timothy Burroughs"
 
 def launch():
+    startup.mark("imports")
     app = QApplication([])
     Style(app)
     window = Window()
+    app.aboutToQuit.connect(window.shutdown)  # Quitting skips closeEvent
+    startup.mark("window")
     window.show()
-    sys.exit(app.exec())
+    status = app.exec()
+
+    if tracer.export_path:
+        tracer.export(tracer.export_path)
+
+    sys.exit(status)
 
 if __name__ == "__main__":
     launch()
\ No newline at end of file
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+# Imports
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from pandas import DataFrame
+from models.power_model import PowerModel
+from models.stats_model import StatsModel
+from utilities.chunked_loader import ChunkedLoader
+from utilities.data_loader import DataLoader
+from utilities.envelope import EnvelopePyramid
+from utilities.range_index import RangeIndex
+from utilities.spectrum import SegmentSpectrum
+
+
+"""Headless batch analysis of a directory of data files.
+
+Computes the analyzer's statistics for every qualified file in parallel
+worker processes and writes one summary table. Optionally also renders a
+PNG or PDF report of every file, in the same workers. Imports Qt only to
+render reports.
+
+A file that fails to load or render gets a single summary row with the
+error instead of statistics, and the run goes on. The exit status is 1 if
+any file failed.
+
+Usage:
+    python batch.py <directory> -o summary.csv [-j workers] [-r] [--fft]
+                    [--float32] [--report dir] [--format png|pdf]
+                    [--dpi dpi] [--size WxH]
+"""
+__author__ = "Timothy Burroughs"
+
+FORMATS = (".csv", ".json", ".parquet")
+REPORT_FORMATS = ("png", "pdf")
+_gui = None  # The QGuiApplication of a process that renders reports
+
+def load(fpath: str, welch: bool = True, dtype: str = None,
+         plots: bool = False) -> dict | None:
+    """Loads and analyzes one file, or returns None if it does not qualify.
+
+    Returns the channel 'names' and 'units', the file's 'time_axis', the
+    per-channel 'stats' and, if plots is set, an EnvelopePyramid per channel
+    as 'plots'.
+
+    With welch, as in the analyzer, dominant frequencies are averaged over
+    bounded segments. Without it they come from one FFT of the whole file,
+    except for files larger than RAM, which always use segments and say so
+    on stderr. A float32 dtype halves the memory of loaded samples.
+    """
+
+    loader = DataLoader(dtype)
+
+    if not loader.qualify(fpath):
+        return None
+
+    power = PowerModel(DataLoader.UNITS)
+    chunked_loader = ChunkedLoader(dtype)
+    if chunked_loader.is_large(fpath):
+        if not welch:
+            print(f"Using segment spectra for {fpath}; too large for one FFT",
+                  file=sys.stderr)
+            welch = True  # A whole-file FFT would not fit in RAM
+
+        loaded = chunked_loader.load(fpath)
+        derived = chunked_loader.derive(loaded['samples'], power.derive, len(power))
+        groups = [loaded['index'], derived['index']]  # Memory-mapped, segment by segment
+        pyramids = loaded['plots'] + derived['plots']  # Seeded from the cached preview
+    else:
+        samples = loader.load_samples(fpath)
+        groups = [RangeIndex(samples), RangeIndex(power.derive(samples))]
+        pyramids = None
+
+    time_axis = loader.time_axis(fpath)
+    fs = time_axis.fs
+
+    channels = []
+    for data, group_units in zip(groups, (DataLoader.UNITS, power.units)):
+        if group_units:
+            spectrum = SegmentSpectrum(data.values, fs) if welch else None
+            channels += StatsModel(data, group_units, spectrum=spectrum, fs=fs).channels
+
+    if plots and pyramids is None:
+        pyramids = [EnvelopePyramid(row) for group in groups for row in group.values]
+
+    return {
+        'names': DataLoader.KEYS + power.names,
+        'units': DataLoader.UNITS + power.units,
+        'time_axis': time_axis,
+        'stats': channels,
+        'plots': pyramids if plots else None,
+    }
+
+def analyze(fpath: str, welch: bool = True, dtype: str = None,
+            report: dict = None) -> list[dict]:
+    """Returns one row of statistics per channel, or none if the file does
+    not qualify. Runs in a worker process.
+
+    If report options are given (see write_report), a report of the file
+    is also written. If either fails, the file gets one row with an
+    'error' instead.
+    """
+
+    try:
+        loaded = load(fpath, welch, dtype, plots=report is not None)
+        if loaded is None:
+            return []
+
+        if report is not None:
+            write_report(fpath, loaded, **report)
+    except Exception as e:
+        return [{'file': str(fpath), 'error': f"{type(e).__name__}: {e}"}]
+
+    rows = []
+    fs = loaded['time_axis'].fs
+    for name, unit, channel in zip(loaded['names'], loaded['units'], loaded['stats']):
+        row = {'file': str(fpath), 'channel': name, 'unit': unit,
+               'sample rate': fs}
+        for stat in channel:
+            row[stat['name']] = stat['value']
+        rows.append(row)
+
+    return rows
+
+def write_report(fpath: str, loaded: dict, directory: Path, output: Path,
+                 suffix: str = ".png", size: tuple = None, dpi: int = None) -> Path:
+    """Renders a whole-file report of a loaded file offscreen.
+
+    The report mirrors the file's place under directory in the output
+    directory. Qt is imported here, and only in the processes that render.
+    """
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    from views.report_renderer import ReportRenderer
+
+    global _gui
+    _gui = QGuiApplication.instance() or QGuiApplication([])  # Needed for fonts
+
+    source = Path(fpath).resolve()
+    target = (output / source.relative_to(directory)).with_suffix(suffix)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    time_axis = loaded['time_axis']
+    samples = len(loaded['plots'][0]) if loaded['plots'] else 0
+    end = float(time_axis.time(max(samples - 1, 0)))
+    label = source.stem
+    report = {
+        'title': source.name,
+        'lines': [f"{time_axis.fs:g} Hz, {samples} samples, "
+                  f"{time_axis.start:.6g} s to {end:.6g} s"],
+        'start': time_axis.start,
+        'end': end,
+        'channels': [
+            {'name': name, 'unit': unit, 'traces': [
+                {'label': label, 'color': None, 'pyramid': pyramid,
+                 'axis': time_axis, 'stats': stats}
+            ]}
+            for name, unit, pyramid, stats in zip(
+                loaded['names'], loaded['units'], loaded['plots'], loaded['stats']
+            )
+        ],
+    }
+
+    options = {'size': size, 'dpi': dpi}
+    ReportRenderer(**{k: v for k, v in options.items() if v is not None}).save(target, report)
+    return target
+
+def find_files(directory: Path, recursive: bool) -> list[str]:
+    """Lists candidate files, skipping hidden ones such as sample caches."""
+
+    pattern = "**/*" if recursive else "*"
+    return sorted(
+        str(f) for f in directory.glob(pattern)
+        if f.is_file() and not f.name.startswith(".")
+    )
+
+def write_summary(rows: list[dict], output: Path):
+    table = DataFrame(rows)
+    suffix = output.suffix.lower()
+
+    if suffix == ".csv":
+        table.to_csv(output, index=False)
+    elif suffix == ".json":
+        table.to_json(output, orient='records', indent=2)
+    elif suffix == ".parquet":
+        table.to_parquet(output, index=False)  # Requires pyarrow
+
+def page_size(text: str) -> tuple[float, float]:
+    """Parses a WxH page size in inches."""
+
+    try:
+        width, height = (float(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WxH in inches, not {text!r}")
+    if not (width > 0 and height > 0):
+        raise argparse.ArgumentTypeError(f"page size must be positive: {text!r}")
+    return width, height
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Analyze every qualified data file in a directory."
+    )
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("-o", "--output", type=Path, default=Path("summary.csv"),
+                        help=f"summary file; one of {', '.join(FORMATS)}")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="worker processes (default: all cores)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="include subdirectories")
+    parser.add_argument("--fft", dest="welch", action="store_false",
+                        help="estimate dominant frequencies from one FFT of "
+                             "the whole file instead of averaged segment "
+                             "spectra, the analyzer's estimator; files too "
+                             "large to load whole still use segments")
+    parser.add_argument("--welch", dest="welch", action="store_true",
+                        help=argparse.SUPPRESS)  # The default; kept for old scripts
+    parser.add_argument("--float32", action="store_true",
+                        help="load samples in single precision to halve memory")
+    parser.add_argument("--report", type=Path, metavar="DIR",
+                        help="also write a report of every file here, "
+                             "mirroring the directory layout")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default="png",
+                        help="report file format (default: png)")
+    parser.add_argument("--dpi", type=int, help="report resolution (default: 200)")
+    parser.add_argument("--size", type=page_size, metavar="WxH",
+                        help="report page size in inches (default: 11x8.5)")
+    args = parser.parse_args(argv)
+
+    if not args.directory.is_dir():
+        parser.error(f"not a directory: {args.directory}")
+    if args.output.suffix.lower() not in FORMATS:
+        parser.error(f"unsupported output format: {args.output.suffix}")
+
+    files = find_files(args.directory, args.recursive)
+    rows = []
+    analyzed = 0
+    failed = []
+
+    # Small chunks keep workers busy when file sizes vary widely
+    chunksize = max(1, len(files) // (4 * args.jobs))
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        report = None
+        if args.report:
+            report = {'directory': args.directory.resolve(),
+                      'output': args.report.resolve(),
+                      'suffix': f".{args.format}", 'size': args.size,
+                      'dpi': args.dpi}
+        work = partial(analyze, welch=args.welch,
+                       dtype='float32' if args.float32 else None, report=report)
+        for file_rows in pool.map(work, files, chunksize=chunksize):
+            rows.extend(file_rows)
+            if file_rows and 'error' in file_rows[0]:
+                failed.append(file_rows[0])
+            else:
+                analyzed += bool(file_rows)
+
+    write_summary(rows, args.output)
+    print(f"Analyzed {analyzed} of {len(files)} files "
+          f"into {args.output}", file=sys.stderr)
+    if args.report:
+        print(f"Wrote {analyzed} reports into {args.report}", file=sys.stderr)
+    for row in failed:
+        print(f"Failed {row['file']}: {row['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
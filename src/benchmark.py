@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+
+# Imports
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import numpy as np
+from pandas import DataFrame
+from models.file_model import FileModel
+from utilities import columnar
+from models.stats_model import StatsModel
+from models.event_model import EventDetector
+from utilities.data_loader import DataLoader
+from utilities.range_index import RangeIndex
+from utilities.sample_cache import SampleCache
+from utilities.spectrum import SegmentSpectrum
+from utilities.startup import StartupTimer
+# Qt
+from PySide6.QtCore import QEventLoop, QTimer
+from PySide6.QtWidgets import QApplication
+
+
+"""Reproducible benchmarks of the analyzer's hot paths.
+
+Generates synthetic captures, then times file loading, statistics and event
+detection, directory filtering, the zoom-to-stats roundtrip of the analysis
+view and application startup. Runs headless on the offscreen Qt platform.
+Each benchmark reports the median and best wall time of its runs and the
+peak Python heap use of one more, traced run. Results can be saved as a baseline and compared against later.
+
+Usage:
+    python benchmark.py [-n sizes] [--files count] [-r repeat] [-k pattern]
+                        [--save baseline.json] [--compare baseline.json]
+"""
+__author__ = "Timothy Burroughs"
+
+SIZES = "1e4,1e5,1e6"  # Samples per capture; up to 1e8
+RATE = 10000  # Hz
+DIRECTORY_FILES = 1000
+DIRECTORY_SAMPLES = 1000
+WRITE_ROWS = 1 << 20  # Rows generated and written at a time
+TOLERANCE = 0.25  # Slowdown relative to the baseline counted as a regression
+TIMEOUT = 600  # Seconds to wait for a background job
+
+def write_capture(fpath: Path, samples: int, fs: float = RATE, seed: int = 0):
+    """Writes a synthetic capture of the KEYS columns, chunk by chunk.
+
+    The voltage and current are noisy sines around fixed levels, seeded so
+    that the same arguments always write the same file.
+    """
+
+    rng = np.random.default_rng(seed)
+    levels = np.linspace(3.8, 3.3, len(DataLoader.KEYS))
+
+    with open(fpath, 'w', newline='') as f:
+        f.write(f"# sample rate: {fs:g}\n")
+        f.write(",".join(DataLoader.KEYS) + "\n")
+
+        for start in range(0, samples, WRITE_ROWS):
+            t = np.arange(start, min(start + WRITE_ROWS, samples)) / fs
+            columns = {
+                key: level + 1e-3 * level * np.sin(2*np.pi * 20 * (row + 1) * t)
+                     + rng.normal(0, 1e-4 * level, len(t))
+                for row, (key, level) in enumerate(zip(DataLoader.KEYS, levels))
+            }
+            DataFrame(columns).to_csv(f, header=False, index=False,
+                                      float_format="%.6g")
+
+def write_directory(directory: Path, files: int, samples: int) -> int:
+    """Fills a directory with small captures, one in ten of which do not
+    qualify. Returns the number of qualifying files.
+    """
+
+    directory.mkdir(parents=True, exist_ok=True)
+    qualified = 0
+
+    for number in range(files):
+        fpath = directory / f"capture_{number:05d}.csv"
+        if number % 10 == 9:
+            fpath.write_text("unrelated,columns\n1,2\n")
+        else:
+            write_capture(fpath, samples, seed=number)
+            qualified += 1
+
+    return qualified
+
+def size_label(samples: int) -> str:
+    for scale, suffix in ((10**9, "G"), (10**6, "M"), (10**3, "k")):
+        if samples >= scale:
+            return f"{samples / scale:g}{suffix}"
+    return str(samples)
+
+def measure(fn, repeat: int, setup=None) -> dict:
+    """Times repeated calls of fn, then traces the peak heap of one more.
+
+    The traced run is kept separate because tracing slows allocations.
+    setup is called before every run, outside the timings.
+    """
+
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'median': statistics.median(times), 'min': min(times), 'peak': peak}
+
+def wait(condition, timeout: float = TIMEOUT):
+    """Runs the Qt event loop until condition() holds."""
+
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.setInterval(1)
+    deadline = time.perf_counter() + timeout
+
+    def check():
+        if condition():
+            loop.quit()
+        elif time.perf_counter() > deadline:
+            loop.quit()
+
+    poll.timeout.connect(check)
+    poll.start()
+    if not condition():
+        loop.exec()
+    poll.stop()
+
+    if not condition():
+        raise TimeoutError(f"no result within {timeout:g} s")
+
+class Counter:
+    """Counts signal emissions."""
+
+    def __init__(self, signal):
+        self.count = 0
+        signal.connect(self._increment)
+
+    def _increment(self, *args):
+        self.count += 1
+
+def load_benchmarks(captures: dict, repeat: int) -> dict:
+    loader = DataLoader()
+    results = {}
+
+    for samples, fpath in captures.items():
+        cache = SampleCache(fpath, DataLoader.KEYS, loader.dtype)
+        label = size_label(samples)
+        results[f"load.parse[{label}]"] = measure(
+            lambda: loader.load_samples(fpath), repeat, setup=cache.clear
+        )
+        results[f"load.cached[{label}]"] = measure(
+            lambda: loader.load_samples(fpath), repeat
+        )
+
+        if columnar.available():
+            converted = Path(fpath).with_suffix(".arrow")
+            columnar.write(converted, loader.load_samples(fpath), DataLoader.KEYS)
+            results[f"load.arrow[{label}]"] = measure(
+                lambda: loader.load_samples(converted), repeat
+            )
+
+    return results
+
+def stats_benchmarks(captures: dict, repeat: int) -> dict:
+    loader = DataLoader()
+    results = {}
+
+    for samples, fpath in captures.items():
+        data = loader.load_samples(fpath)
+        fs = loader.time_axis(fpath).fs
+        index = RangeIndex(data)
+        label = size_label(samples)
+        quarter = samples // 4
+        spectrum = None
+
+        def fresh_spectrum():
+            nonlocal spectrum
+            spectrum = SegmentSpectrum(data, fs)  # Nothing cached yet
+
+        results[f"stats.index[{label}]"] = measure(lambda: RangeIndex(data), repeat)
+        results[f"stats.cheap[{label}]"] = measure(
+            lambda: StatsModel(index, DataLoader.UNITS, spectral=False, fs=fs),
+            repeat,
+        )
+        results[f"stats.zoom[{label}]"] = measure(
+            lambda: StatsModel(index, DataLoader.UNITS, quarter, 3 * quarter,
+                               spectral=False, fs=fs),
+            repeat,
+        )
+        if samples <= StatsModel.SPECTRAL_LIMIT:
+            results[f"stats.fft[{label}]"] = measure(
+                lambda: StatsModel(index, DataLoader.UNITS, fs=fs), repeat
+            )
+        results[f"stats.welch[{label}]"] = measure(
+            lambda: StatsModel(index, DataLoader.UNITS, spectrum=spectrum, fs=fs),
+            repeat, setup=fresh_spectrum,
+        )
+        results[f"stats.events[{label}]"] = measure(
+            lambda: EventDetector().detect(data), repeat
+        )
+
+    return results
+
+def filter_benchmarks(directory: Path, qualified: int, repeat: int) -> dict:
+    model = None
+
+    def scan():
+        nonlocal model
+        model = FileModel()
+        model.apply_file_filter(directory)
+        wait(lambda: model.rowCount() == qualified)
+
+    return {
+        f"filter.cold[{qualified}]": measure(scan, repeat, setup=DataLoader._qualified.clear),
+        f"filter.warm[{qualified}]": measure(scan, repeat),
+    }
+
+def startup_benchmarks(repeat: int) -> dict:
+    """Times application startup to first paint and to ready, launching
+    the application in a new process for every run.
+
+    Only the time to each milestone is measured; peaks are not.
+    """
+
+    runs = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for run in range(repeat):
+            report = Path(directory) / f"startup_{run}.json"
+            env = {**os.environ, StartupTimer.REPORT_ENV: str(report)}
+            app = subprocess.Popen(
+                [sys.executable, str(Path(__file__).with_name("app.py"))],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+
+            try:
+                deadline = time.perf_counter() + TIMEOUT
+                while not report.exists():
+                    if app.poll() is not None or time.perf_counter() > deadline:
+                        raise RuntimeError("application exited before startup finished")
+                    time.sleep(0.01)
+            finally:
+                app.kill()
+                app.wait()
+
+            for milestone, ms in json.loads(report.read_text()).items():
+                runs.setdefault(milestone, []).append(ms / 1e3)
+
+    return {
+        f"startup.{milestone.replace(' ', '_')}": {
+            'median': statistics.median(times), 'min': min(times), 'peak': 0,
+        }
+        for milestone, times in runs.items()
+    }
+
+def view_benchmarks(captures: dict, repeat: int) -> dict:
+    """Times loading into the analysis view and the zoom-to-stats roundtrip.
+
+    Stats timers are set to zero so that the roundtrip measures work, not
+    the deliberate throttle and settle latencies.
+    """
+
+    from views.analyzer_view import Analyzer, DataBlock, Graph
+
+    analyzer = Analyzer()
+    analyzer.resize(1280, 960)
+    analyzer.show()
+    viewmodel = analyzer.viewmodel
+    blocks = analyzer.findChildren(DataBlock)
+    graph = blocks[0].findChild(Graph)  # Owns the shared x-range
+    for block in blocks:
+        block.viewmodel.refresh_ms = 0
+        block.viewmodel.settle_ms = 0
+
+    plotted = Counter(viewmodel.plotChanged)
+    updated = Counter(viewmodel.statsChanged)
+    channels = len(blocks)
+    results = {}
+
+    for samples, fpath in captures.items():
+        label = size_label(samples)
+        zooms = 0
+
+        def load():
+            expected = plotted.count + channels
+            viewmodel.update_views(Path(fpath))
+            wait(lambda: plotted.count >= expected)
+
+        def zoom(batches: int):
+            nonlocal zooms
+            zooms += 1  # A new window each time, so nothing is cached
+            duration = samples / RATE
+            left = duration * (0.1 + 0.001 * zooms)
+            expected = updated.count + batches * channels
+            graph.setXRange(left, left + duration / 2, padding=0)
+            wait(lambda: updated.count >= expected)
+
+        def forget():
+            viewmodel.stats_cache.clear()
+            viewmodel.sample_store.clear()
+
+        results[f"view.load[{label}]"] = measure(load, repeat, setup=forget)
+        results[f"view.refresh[{label}]"] = measure(lambda: zoom(1), repeat)
+        results[f"view.settle[{label}]"] = measure(lambda: zoom(2), repeat)
+
+    analyzer.close()
+    return results
+
+def compare(results: dict, baseline: dict) -> dict:
+    """Returns the median time of each result relative to the baseline."""
+
+    ratios = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base and base['median'] > 0:
+            ratios[name] = result['median'] / base['median']
+    return ratios
+
+def report(results: dict, ratios: dict, tolerance: float):
+    width = max([len(name) for name in results] + [9])
+    print(f"{'benchmark':<{width}}  {'median ms':>10}  {'min ms':>10}  "
+          f"{'peak MiB':>9}  {'vs base':>8}")
+
+    for name, result in results.items():
+        ratio = ratios.get(name)
+        change = "" if ratio is None else f"{ratio - 1:+.0%}"
+        flag = " !" if ratio is not None and ratio > 1 + tolerance else ""
+        print(f"{name:<{width}}  {1e3 * result['median']:>10.2f}  "
+              f"{1e3 * result['min']:>10.2f}  {result['peak'] / 1024**2:>9.1f}  "
+              f"{change:>8}{flag}")
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading, stats and view refreshes on "
+                    "synthetic captures."
+    )
+    parser.add_argument("-n", "--sizes", default=SIZES,
+                        help=f"comma-separated samples per capture (default: {SIZES})")
+    parser.add_argument("--files", type=int, default=DIRECTORY_FILES,
+                        help="files in the directory filter benchmark")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="timed runs per benchmark")
+    parser.add_argument("-k", "--filter", default="",
+                        help="only run benchmarks whose group contains this")
+    parser.add_argument("--workdir", type=Path,
+                        help="keep generated captures here and reuse them")
+    parser.add_argument("--save", type=Path, help="write results as a baseline")
+    parser.add_argument("--compare", type=Path, help="compare with a baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="slowdown reported as a regression (default: "
+                             f"{TOLERANCE:g})")
+    args = parser.parse_args(argv)
+
+    sizes = sorted({int(float(size)) for size in args.sizes.split(",")})
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    DataLoader()  # Reads KEYS before captures are generated
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="benchmark-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        captures = {}
+        for samples in sizes:
+            fpath = workdir / f"capture_{size_label(samples)}.csv"
+            if not fpath.exists():
+                print(f"Writing {fpath.name}", file=sys.stderr)
+                write_capture(fpath, samples)
+            captures[samples] = str(fpath)
+
+        groups = {
+            'load': lambda: load_benchmarks(captures, args.repeat),
+            'stats': lambda: stats_benchmarks(captures, args.repeat),
+            'filter': lambda: filter_benchmarks(
+                workdir / "directory",
+                write_directory(workdir / "directory", args.files, DIRECTORY_SAMPLES),
+                args.repeat,
+            ),
+            'view': lambda: view_benchmarks(captures, args.repeat),
+            'startup': lambda: startup_benchmarks(args.repeat),
+        }
+
+        results = {}
+        for name, run in groups.items():
+            if args.filter in name:
+                print(f"Running {name} benchmarks", file=sys.stderr)
+                results.update(run())
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    ratios = compare(results, baseline)
+    report(results, ratios, args.tolerance)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+    regressions = [name for name, ratio in ratios.items() if ratio > 1 + args.tolerance]
+    if regressions:
+        print(f"{len(regressions)} regressions beyond {args.tolerance:.0%}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
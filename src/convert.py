@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+# Imports
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from utilities import columnar
+from utilities.chunked_loader import ChunkedLoader
+from utilities.data_loader import DataLoader
+from utilities.sample_cache import SampleCache
+
+
+"""Bulk conversion of CSV captures to the columnar Arrow format.
+
+Rewrites every qualified CSV in a directory as an Arrow IPC file, in
+parallel worker processes, mirroring the directory layout under the output
+directory. Only the KEYS columns are kept. The sample rate and start time
+are stored in the file's metadata, so time columns are dropped. Requires
+pyarrow. Does not import Qt.
+
+A file that fails to convert is reported and skipped, and the run goes on.
+The exit status is 1 if any file failed.
+
+Usage:
+    python convert.py <directory> [-o output] [-j workers] [-r]
+                      [--compression none|lz4|zstd] [--float32] [--force]
+"""
+__author__ = "Timothy Burroughs"
+
+SUFFIX = ".arrow"
+
+def convert(fpath: str, directory: Path, output: Path, compression: str = "none",
+            dtype: str = None, force: bool = False) -> str | None:
+    """Converts one file and returns the path written, or None if the file
+    does not qualify or is already converted. Runs in a worker process.
+    """
+
+    loader = DataLoader(dtype)
+    source = Path(fpath)
+
+    if source.suffix.lower() != ".csv" or not loader.qualify(source):
+        return None
+
+    target = (output / source.relative_to(directory)).with_suffix(SUFFIX)
+    if not force and target.exists() and \
+            target.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+        return None  # Up to date
+
+    _, _, metadata = loader.header(source)
+    time_axis = loader.time_axis(source)
+    metadata.update({
+        'sample rate': repr(time_axis.fs),
+        'start time': repr(time_axis.start),
+        'units': ",".join(DataLoader.UNITS),
+        'source': source.name,
+    })
+
+    # Parse through the sample cache so large files never sit in RAM
+    cache = SampleCache(source, DataLoader.KEYS, loader.dtype)
+    cached = cache.load() is not None
+    chunked_loader = ChunkedLoader(dtype)
+    samples = None
+    try:
+        if chunked_loader.is_large(source):
+            samples = chunked_loader.load(source)['samples']
+        else:
+            samples = loader.load_samples(source)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        columnar.write(target, samples, DataLoader.KEYS, metadata, compression)
+    finally:
+        if not cached:
+            del samples
+            cache.clear()  # Only made for this conversion
+
+    return str(target)
+
+def attempt(fpath: str, **options) -> tuple[str | None, str | None]:
+    """Converts one file, returning the path written and None, or None and
+    the error it failed with. Runs in a worker process.
+    """
+
+    try:
+        return convert(fpath, **options), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def find_files(directory: Path, recursive: bool) -> list[str]:
+    pattern = "**/*.csv" if recursive else "*.csv"
+    return sorted(
+        str(f) for f in directory.glob(pattern)
+        if f.is_file() and not f.name.startswith(".")
+    )
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert every qualified CSV in a directory to Arrow."
+    )
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("-o", "--output", type=Path,
+                        help="output directory (default: <directory>-arrow)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="worker processes (default: all cores)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="include subdirectories")
+    parser.add_argument("--compression", choices=columnar.COMPRESSIONS,
+                        default="none",
+                        help="smaller files, but loads decompress instead of "
+                             "memory-mapping (default: none)")
+    parser.add_argument("--float32", action="store_true",
+                        help="store samples in single precision")
+    parser.add_argument("--force", action="store_true",
+                        help="rewrite files that are already converted")
+    args = parser.parse_args(argv)
+
+    if not columnar.available():
+        parser.error("converting requires pyarrow")
+    if not args.directory.is_dir():
+        parser.error(f"not a directory: {args.directory}")
+
+    directory = args.directory.resolve()
+    output = (args.output or directory.with_name(f"{directory.name}-arrow")).resolve()
+    files = find_files(directory, args.recursive)
+    converted = 0
+    failed = []
+
+    work = partial(attempt, directory=directory, output=output,
+                   compression=args.compression,
+                   dtype='float32' if args.float32 else None, force=args.force)
+    chunksize = max(1, len(files) // (4 * args.jobs))
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for fpath, (target, error) in zip(files, pool.map(work, files, chunksize=chunksize)):
+            converted += target is not None
+            if error is not None:
+                failed.append((fpath, error))
+
+    print(f"Converted {converted} of {len(files)} files into {output}",
+          file=sys.stderr)
+    for fpath, error in failed:
+        print(f"Failed {fpath}: {error}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
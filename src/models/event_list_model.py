@@ -0,0 +1,81 @@
+# Imports
+from models.event_model import EventDetector, EventIndex
+from utilities.time_axis import TimeAxis
+# Qt
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+class EventListModel(QAbstractListModel):
+    """Represents the detected events of the plotted file.
+
+    Rows are formatted only when a view asks for them, so lists of any
+    length cost nothing until scrolled through. While detection runs, or
+    when it found nothing, the list holds a single status row that cannot
+    be selected.
+    """
+
+    def __init__(self, channels: list[tuple[str, str]]):
+        super().__init__()
+        self._channels = channels  # Name and unit, in view order
+        self._events = EventIndex()
+        self._axis = TimeAxis()
+        self._status = ""
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._events) or int(bool(self._status))
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+
+        event = self.event_at(index.row())
+        if event is None:
+            return self._status
+
+        name, unit = self._channels[event['channel']]
+        kind = EventDetector.KINDS[event['kind']]
+        return (f"{self._axis.time(event['peak']):.6g} s  {name} {kind}  "
+                f"{event['value']:.4g} {unit}")
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if self.event_at(index.row()) is None:
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index)
+
+    def event_at(self, row: int):
+        """Returns the event of a row, or None for the status row."""
+
+        if 0 <= row < len(self._events):
+            return self._events[row]
+        return None
+
+    def set_events(self, events: EventIndex, axis: TimeAxis):
+        """Lists new events, located in time by axis."""
+
+        self.beginResetModel()
+        self._events = events
+        self._axis = axis
+        self._status = "No events" if not len(events) else ""
+        self.endResetModel()
+
+    def set_progress(self, fraction: float):
+        """Replaces the list with the progress of a running detection."""
+
+        self.set_status(f"Detecting events... {fraction:.0%}")
+
+    def set_status(self, status: str):
+        """Replaces the list with a status row, or with nothing if status
+        is ''.
+        """
+
+        if not len(self._events) and self._status and status:
+            self._status = status
+            self.dataChanged.emit(self.index(0), self.index(0))
+            return
+
+        self.beginResetModel()
+        self._events = EventIndex()
+        self._status = status
+        self.endResetModel()
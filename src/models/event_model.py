@@ -0,0 +1,231 @@
+# Imports
+import numpy as np
+from utilities.range_index import as_float
+from utilities.tracer import traced
+
+
+class EventIndex:
+    """Detected events of a capture, sorted by start.
+
+    Each event is a run of flagged samples on one channel: its half-open
+    sample range, the sample where it deviates most and that sample's
+    value, the channel, the kind of rule that flagged it, and its score in
+    robust standard deviations.
+
+    Attributes:
+        events: A structured array with the fields of DTYPE.
+        truncated: Whether lower-scoring events were dropped to stay within
+            the detector's bound.
+    """
+
+    ### Constants ###
+    DTYPE = np.dtype([
+        ('start', np.int64), ('end', np.int64), ('peak', np.int64),
+        ('value', np.float64), ('score', np.float32),
+        ('channel', np.int16), ('kind', np.int8),
+    ])
+
+    def __init__(self, events: np.ndarray = None, truncated: bool = False):
+        if events is None:
+            events = np.empty(0, dtype=EventIndex.DTYPE)
+        self.events = np.sort(events, order='start')
+        self.truncated = truncated
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __getitem__(self, row: int):
+        return self.events[row]
+
+    @property
+    def nbytes(self) -> int:
+        return self.events.nbytes
+
+    def within(self, left: int, right: int) -> np.ndarray:
+        """Returns the events that start in the sample window [left, right)."""
+
+        first, last = np.searchsorted(self.events['start'], [left, right])
+        return self.events[first:last]
+
+
+class EventDetector:
+    """Vectorized detection of threshold, slew-rate and glitch events.
+
+    Every rule compares a per-sample deviation with a limit in robust
+    standard deviations of the capture:
+        threshold: The distance of a sample from the channel's median,
+            as in a brownout or an overcurrent.
+        slew: The step from the previous sample, as in an inrush spike.
+        glitch: The distance of a sample from the midpoint of its two
+            neighbours, as in a single-sample spike.
+
+    Scales come from the median absolute deviation of evenly spaced sample
+    blocks, so they cost the same for any capture length and are not
+    inflated by the events themselves. Data is then scanned in chunks of
+    CHUNK samples for all channels at once, so memory-mapped captures
+    larger than RAM are read once. Flagged runs closer than MERGE_GAP
+    samples are merged into one event.
+
+    At most MAX_EVENTS events are kept, the highest-scoring ones.
+    """
+
+    ### Constants ###
+    KINDS = ("threshold", "slew", "glitch")
+    SIGMAS = (8.0, 10.0, 10.0)  # Limit of each kind, in robust deviations
+    CHUNK = 1 << 20  # Samples per channel scanned at a time
+    SAMPLE_BLOCKS = 64  # Blocks sampled to estimate scales
+    SAMPLE_BLOCK = 4096  # Samples per sampled block
+    MERGE_GAP = 16  # Samples between runs that still make one event
+    MAX_EVENTS = 100_000
+
+    def __init__(self, sigmas: tuple = SIGMAS):
+        self.sigmas = np.asarray(sigmas, dtype=np.float64)
+
+    @traced()
+    def detect(self, data, report=None) -> EventIndex | None:
+        """Finds the events of (channels, samples) data.
+
+        Args:
+            data: The samples, which may be memory-mapped.
+            report: An optional callback given the fraction scanned after
+                every chunk. Returning False stops the scan.
+
+        Returns:
+            The events, or None if the scan was stopped.
+        """
+
+        data = as_float(data)
+        if data.ndim == 1:
+            data = data[np.newaxis]
+        if data.shape[-1] < 3:
+            return EventIndex()  # Too short for any rule
+
+        center, scales = self._scales(data)
+        pieces = []
+        n = data.shape[-1]
+
+        for start in range(0, n, EventDetector.CHUNK):
+            end = min(start + EventDetector.CHUNK, n)
+            pieces.append(self._scan(data, start, end, center, scales))
+
+            if report is not None and report(end / n) is False:
+                return None
+
+        return self._merge(np.concatenate(pieces) if pieces else None)
+
+    def _scales(self, data: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns each channel's median and its robust deviation for
+        every kind, as (channels, 1) and (kinds, channels, 1) arrays.
+        """
+
+        n = data.shape[-1]
+        size = EventDetector.SAMPLE_BLOCK
+        starts = np.linspace(0, max(n - size, 0), EventDetector.SAMPLE_BLOCKS).astype(int)
+        blocks = np.concatenate(
+            [data[:, start:start + size] for start in np.unique(starts)], axis=-1
+        ).astype(np.float64)
+
+        center = np.median(blocks, axis=-1, keepdims=True)
+        deviations = (
+            blocks - center,
+            np.diff(blocks, axis=-1),  # Spans block joins; negligible
+            blocks[:, 1:-1] - (blocks[:, :-2] + blocks[:, 2:]) / 2,
+        )
+
+        scales = []
+        for deviation in deviations:
+            mad = 1.4826 * np.median(np.abs(deviation), axis=-1, keepdims=True)
+            std = np.std(deviation, axis=-1, keepdims=True)
+            scale = np.where(mad > 0, mad, std)  # Quantized data can have no MAD
+            scales.append(np.where(scale > 0, scale, np.inf))  # Flat: never flags
+
+        return center, np.stack(scales)
+
+    def _scan(self, data: np.ndarray, start: int, end: int, center: np.ndarray,
+              scales: np.ndarray) -> np.ndarray:
+        """Returns the flagged runs of [start, end) as events."""
+
+        # One neighbour either side, so differences span chunk joins; the
+        # capture's ends have none and are padded with NaN, which never flags
+        n = data.shape[-1]
+        window = np.full((len(data), end - start + 2), np.nan)
+        left, right = max(start - 1, 0), min(end + 1, n)
+        window[:, left - start + 1:right - start + 1] = data[:, left:right]
+
+        before, x, after = window[:, :-2], window[:, 1:-1], window[:, 2:]
+        deviations = (x - center, x - before, x - (before + after) / 2)
+
+        pieces = []
+        for kind, deviation in enumerate(deviations):
+            score = np.abs(deviation) / scales[kind]
+            with np.errstate(invalid='ignore'):
+                flagged = score > self.sigmas[kind]
+            pieces.append(_runs(flagged, score, x, start, kind))
+
+        return np.concatenate(pieces)
+
+    def _merge(self, pieces: np.ndarray | None) -> EventIndex:
+        """Joins the runs of a channel that overlap, are split by chunk joins
+        or are separated by short gaps. Each event takes the peak, score and
+        kind of its highest-scoring run.
+        """
+
+        if pieces is None or not len(pieces):
+            return EventIndex()
+
+        # Runs of any kind that overlap or nearly touch on a channel are one
+        # event, reaching as far as any run before it on that channel
+        pieces = np.sort(pieces, order=('channel', 'start'))
+        span = int(pieces['end'].max()) + EventDetector.MERGE_GAP
+        offset = pieces['channel'].astype(np.int64) * span
+        reach = np.maximum.accumulate(pieces['end'] + offset)
+        new = np.ones(len(pieces), dtype=bool)
+        new[1:] = pieces['start'][1:] + offset[1:] - reach[:-1] >= EventDetector.MERGE_GAP
+        group = np.cumsum(new) - 1
+
+        # Highest score first within each group, then the first of each
+        order = np.lexsort((-pieces['score'], group))
+        best = order[np.flatnonzero(np.diff(group[order], prepend=-1))]
+
+        events = pieces[best].copy()
+        events['start'] = pieces['start'][new]
+        events['end'] = np.maximum.reduceat(pieces['end'], np.flatnonzero(new))
+        events['channel'] = pieces['channel'][new]
+
+        truncated = len(events) > EventDetector.MAX_EVENTS
+        if truncated:
+            keep = np.argpartition(-events['score'], EventDetector.MAX_EVENTS)
+            events = events[keep[:EventDetector.MAX_EVENTS]]
+
+        return EventIndex(events, truncated)
+
+
+def _runs(flagged: np.ndarray, score: np.ndarray, values: np.ndarray, offset: int,
+          kind: int) -> np.ndarray:
+    """Returns one event per run of flagged samples in each row, with the
+    run's highest-scoring sample as its peak.
+    """
+
+    rows, positions = np.nonzero(flagged)
+    if not len(positions):
+        return np.empty(0, dtype=EventIndex.DTYPE)
+
+    # A run starts wherever the previous flagged sample is not adjacent
+    new = np.ones(len(positions), dtype=bool)
+    new[1:] = (rows[1:] != rows[:-1]) | (positions[1:] != positions[:-1] + 1)
+    group = np.cumsum(new) - 1
+    firsts = np.flatnonzero(new)
+
+    scores = score[rows, positions]
+    order = np.lexsort((-scores, group))
+    peaks = order[np.flatnonzero(np.diff(group[order], prepend=-1))]
+
+    events = np.empty(len(firsts), dtype=EventIndex.DTYPE)
+    events['start'] = offset + positions[firsts]
+    events['end'] = offset + np.append(positions[firsts[1:] - 1], positions[-1]) + 1
+    events['peak'] = offset + positions[peaks]
+    events['value'] = values[rows[peaks], positions[peaks]]
+    events['score'] = scores[peaks]
+    events['channel'] = rows[firsts]
+    events['kind'] = kind
+    return events
@@ -1,38 +1,238 @@
 # Imports
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import logging
+from time import monotonic
 from utilities.data_loader import DataLoader
+from utilities.tracer import traced
+from utilities.worker import TaskRunner
 # Qt
-from PySide6.QtCore import QStringListModel
+from PySide6.QtCore import QStringListModel, QFileSystemWatcher, QTimer
+
+logger = logging.getLogger(__name__)
 
 
 class FileModel(QStringListModel):
-    """Represents a set of compatible data files."""
+    """Represents a set of compatible data files.
+
+    Directories are scanned in the background. File headers are checked
+    concurrently by a bounded pool of I/O threads, and qualified files are
+    streamed into the list in batches as they are found.
+
+    The active directory is watched afterwards. Changes are applied as
+    diffs: only added or modified files are qualified, and deleted files
+    are removed, without rebuilding the list.
+    """
+
+    ### Constants ###
+    IO_WORKERS = 8  # Concurrent header reads per scan
+    BATCH_SECONDS = 0.1  # Longest wait before publishing found files
+    SETTLE_MS = 200  # Coalesces bursts of directory change notifications
 
     def __init__(self):
         super().__init__()
         self.qualified = {}
+        self._rows = {}  # Maps each listed name to its row
+        self._loader = DataLoader()
+        self._runner = TaskRunner()
+        self._dir: Path = None
+        self._signatures = {}  # Maps every known path to its (mtime, size)
+        self._stale = False  # Directory changed while a scan was running
+
+        self._watcher = QFileSystemWatcher(self)
+        self._change_timer = QTimer(self)
+        self._change_timer.setSingleShot(True)
+        self._change_timer.setInterval(FileModel.SETTLE_MS)
+
+        # Set signal/slot connections
+        self._watcher.directoryChanged.connect(self._change_timer.start)
+        self._change_timer.timeout.connect(self._refresh)
 
     def apply_file_filter(self, dir_path: Path):
         """Applies user-defined filter to generate a list of qualified
         files.
 
-        Qualified files are stored in a dictionary such that the key = filename,
-        and value = absolute path.
+        Qualified files are stored in a dictionary such that the key = file name,
+        and value = absolute path. Returns immediately; the list fills in as
+        the background scan progresses. A new call supersedes any scan still
+        in progress. Reapplying the filter to the watched directory only
+        diffs it, picking up changes not yet reported by the watcher. A
+        directory that could not be watched is rescanned instead.
         """
 
+        if dir_path == self._dir and self._watcher.directories():
+            self._refresh()
+            return
+
+        # Watch only the active directory
+        if self._watcher.directories():
+            self._watcher.removePaths(self._watcher.directories())
+        if not self._watcher.addPath(str(dir_path)):
+            logger.warning("Cannot watch %s; choose it again to rescan", dir_path)
+        self._dir = dir_path
+        self._stale = False
+        self._runner.cancel('diff')
+
         # Clear previously-qualified files every time this filter is reapplied
         self.qualified.clear()
+        self._rows.clear()
+        self._signatures.clear()
+        self.setStringList([])
 
         # Find files that meet user qualifications
+        self._runner.submit(
+            'scan', self._scan_finished, self._scan, dir_path,
+            progress=self._add_files,
+        )
+
+    @traced()
+    def _scan(self, dir_path: Path, report) -> dict:
+        """Qualifies every file in a directory. Runs on a worker thread.
+
+        Returns the (mtime, size) signature of every file seen.
+        """
+
+        signatures = self._list_signatures(dir_path)
+        paths = [Path(p) for p in signatures]
+        batch = []
+        published = monotonic()
+
+        pool = ThreadPoolExecutor(max_workers=FileModel.IO_WORKERS)
+        try:
+            for f, ok in zip(paths, pool.map(self._loader.qualify, paths)):
+                if ok:
+                    batch.append((f.name, str(f)))
+
+                # Publish in batches so the list grows while the scan runs
+                if batch and monotonic() - published >= FileModel.BATCH_SECONDS:
+                    if not report(batch):
+                        return signatures  # Superseded by a newer scan
+                    batch = []
+                    published = monotonic()
+
+            if batch:
+                report(batch)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return signatures
+
+    @traced()
+    def _diff(self, dir_path: Path, known: dict) -> tuple:
+        """Finds and qualifies changed files. Runs on a worker thread.
+
+        Returns the new signatures, the removed paths, and a dictionary
+        mapping each added or modified path to its qualification.
+        """
+
+        signatures = self._list_signatures(dir_path)
+        removed = known.keys() - signatures.keys()
+        changed = [p for p, sig in signatures.items() if known.get(p) != sig]
+
+        with ThreadPoolExecutor(max_workers=FileModel.IO_WORKERS) as pool:
+            results = dict(zip(changed, pool.map(self._loader.qualify, changed)))
+
+        return signatures, removed, results
+
+    def _list_signatures(self, dir_path: Path) -> dict:
+        signatures = {}
+
         for f in dir_path.iterdir():
-            if DataLoader().qualify(f):
-                self.qualified[f.stem] = str(f)
+            try:
+                stat = f.stat()
+            except OSError:
+                continue  # Deleted while listing
+            signatures[str(f)] = (stat.st_mtime_ns, stat.st_size)
+
+        return signatures
+
+    def _refresh(self):
+        """Schedules a diff of the watched directory."""
+
+        if self._dir is None:
+            return
+
+        # Let a running scan finish first; it then diffs once
+        if self._runner.pending('scan'):
+            self._stale = True
+            return
+
+        self._runner.submit(
+            'diff', self._apply_diff, self._diff, self._dir, dict(self._signatures)
+        )
+
+    def _scan_finished(self, signatures: dict):
+        self._signatures = signatures
+
+        if self._stale:
+            self._stale = False
+            self._refresh()
+
+    def _apply_diff(self, diff: tuple):
+        """Applies a directory diff to the list. Runs on the GUI thread."""
+
+        signatures, removed, results = diff
+        self._signatures = signatures
+
+        added = []
+        for path, ok in results.items():
+            if ok:
+                added.append((Path(path).name, path))
+            else:
+                removed.add(path)  # No longer qualifies
+
+        self._remove_files(removed)
+        self._add_files(added)
+
+    def _remove_files(self, paths: set):
+        """Removes listed files, renumbering the rows after them once."""
+
+        rows = []
+        for path in paths:
+            name = Path(path).name
+            if self.qualified.get(name) == path:
+                del self.qualified[name]
+                rows.append(self._rows.pop(name))
+
+        if not rows:
+            return
+
+        # From the end, so earlier rows keep their numbers meanwhile
+        for row in sorted(rows, reverse=True):
+            self.removeRows(row, 1)
+
+        first = min(rows)
+        for row in range(first, self.rowCount()):
+            self._rows[self.index(row).data()] = row
+
+    def _add_files(self, batch: list[tuple[str, str]]):
+        """Appends newly qualified files to the list. Runs on the GUI thread."""
+
+        names = []
+        for name, path in batch:
+            if name not in self.qualified:
+                self.qualified[name] = path
+                names.append(name)
+
+        if not names:
+            return
+
+        row = self.rowCount()
+        self.insertRows(row, len(names))
+        for offset, name in enumerate(names):
+            self.setData(self.index(row + offset), name)
+            self._rows[name] = row + offset
+
+    def neighbors(self, row: int) -> list[Path]:
+        """Returns the paths of the files after and before a row, in that
+        order, where they exist.
+        """
 
-        # Populate list with newly qualified files
-        self.setStringList(self.qualified.keys())
+        rows = [r for r in (row + 1, row - 1) if 0 <= r < self.rowCount()]
+        return [self.name_to_path(self.index(r).data()) for r in rows]
 
     def name_to_path(self, filename: str) -> Path:
         """Converts filename (key) to absolute path (value)."""
 
         filepath = self.qualified.get(filename)
-        return Path(filepath)
\ No newline at end of file
+        return Path(filepath)
@@ -0,0 +1,57 @@
+# Imports
+import numpy as np
+
+
+class PowerModel():
+    """Derives power channels from measured voltage and current channels.
+
+    Instantaneous power is the product of the first voltage channel and the
+    first current channel, found by their units. Cumulative energy and the
+    average power of any window follow from sums of the power channel, so
+    they are answered by the prefix sums of a RangeIndex over it rather
+    than stored per sample.
+
+    Attributes:
+        names: Names of the derived channels; empty when the measured
+            channels lack a voltage or current.
+        units: Units of the derived channels.
+    """
+
+    ### Constants ###
+    VOLTAGE_UNIT = "V"
+    CURRENT_UNIT = "A"
+    NAMES = ["Power"]
+    UNITS = ["W"]
+
+    def __init__(self, units: list[str]):
+        self._voltage = self._find(units, PowerModel.VOLTAGE_UNIT)
+        self._current = self._find(units, PowerModel.CURRENT_UNIT)
+
+        available = self._voltage is not None and self._current is not None
+        self.names = list(PowerModel.NAMES) if available else []
+        self.units = list(PowerModel.UNITS) if available else []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _find(self, units: list[str], unit: str) -> int | None:
+        return units.index(unit) if unit in units else None
+
+    def derive(self, samples: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Computes the derived channels of (channels, samples) data.
+
+        Args:
+            samples: Measured data, with rows in KEYS order.
+            out: An optional (derived channels, samples) array to fill.
+
+        Returns:
+            A (derived channels, samples) array.
+        """
+
+        if out is None:
+            out = np.empty((len(self), samples.shape[-1]), dtype=samples.dtype)
+
+        if len(self):
+            np.multiply(samples[self._voltage], samples[self._current], out=out[0])
+
+        return out
@@ -1,61 +1,287 @@
 # Imports
+from functools import cached_property
 import numpy as np
-from scipy.signal import find_peaks
+from utilities.range_index import RangeIndex
+from utilities.spectrum import SegmentSpectrum, peak_frequency
+from utilities.time_axis import TimeAxis
+from utilities.tracer import traced
+
+
+class RunningStats():
+    """Single-pass min/max/variance accumulator for data arriving in chunks.
+
+    Chunks are merged with Welford's parallel update, so the result matches
+    a one-shot calculation over the concatenated data without keeping it.
+    Chunks may be one-dimensional or (channels, samples) arrays.
+
+    Attributes:
+        count: Number of samples seen.
+        mean: Running mean.
+        min: Running minimum.
+        max: Running maximum.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._m2 = 0.0  # Sum of squared deviations from the mean
+
+    def update(self, chunk: np.ndarray):
+        n = chunk.shape[-1]
+
+        if not n:
+            return
+
+        chunk_mean = np.mean(chunk, axis=-1, dtype=np.float64)
+        chunk_m2 = np.sum(np.square(chunk - chunk_mean[..., np.newaxis]), axis=-1)
+
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self._m2 = self._m2 + chunk_m2 + np.square(delta) * self.count * n / total
+        self.count = total
+
+        self.min = np.minimum(self.min, np.min(chunk, axis=-1))
+        self.max = np.maximum(self.max, np.max(chunk, axis=-1))
+
+    @property
+    def std(self):
+        """Population standard deviation, matching np.std."""
+
+        return np.sqrt(self._m2 / self.count)
+
+    def state(self) -> dict:
+        """Returns the accumulated state as arrays, for from_state()."""
+
+        return {'count': np.array(self.count), 'mean': np.asarray(self.mean),
+                'min': np.asarray(self.min), 'max': np.asarray(self.max),
+                'm2': np.asarray(self._m2)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RunningStats":
+        """Restores an accumulator from its state()."""
+
+        stats = cls()
+        stats.count = int(state['count'])
+        stats.mean = state['mean']
+        stats.min = state['min']
+        stats.max = state['max']
+        stats._m2 = state['m2']
+        return stats
+
+
+class StatsWindow():
+    """Per-channel summaries of one data window, handed to stat kernels.
+
+    Summaries are computed on first use and shared by every kernel, so
+    each is computed once per window for all channels at once.
+
+    Attributes:
+        left, right: Half-open sample bounds of the window.
+        fs: Sample rate in Hz.
+        spectrum: An optional SegmentSpectrum of the data.
+    """
+
+    def __init__(self, source: RangeIndex | RunningStats, left: int, right: int,
+                 fs: float, spectrum: SegmentSpectrum = None):
+        self.left = left
+        self.right = right
+        self.fs = fs
+        self.spectrum = spectrum
+        self._source = source
+
+    def __len__(self) -> int:
+        return self.right - self.left
+
+    @cached_property
+    def min(self):
+        if isinstance(self._source, RunningStats):
+            return self._source.min
+        return self._source.min(self.left, self.right)
+
+    @cached_property
+    def max(self):
+        if isinstance(self._source, RunningStats):
+            return self._source.max
+        return self._source.max(self.left, self.right)
+
+    @cached_property
+    def mean(self):
+        if isinstance(self._source, RunningStats):
+            return self._source.mean
+        return self._source.mean(self.left, self.right)
+
+    @cached_property
+    def sum(self):
+        if isinstance(self._source, RunningStats):
+            return self._source.mean * self._source.count
+        return self._source.sum(self.left, self.right)
+
+    @cached_property
+    def std(self):
+        if isinstance(self._source, RunningStats):
+            return self._source.std
+        return self._source.std(self.left, self.right)
+
+    @property
+    def samples(self) -> np.ndarray:
+        """The raw window, as a view. Unavailable for running stats."""
+
+        return self._source.values[..., self.left:self.right]
 
 
 class StatsModel():
-    """Calculates statistics for a user-defined data list.
+    """Calculates statistics for a user-defined data array.
 
     Statistics are calculated once at class initialization and then buffered
-    for as long as the class instance exists.
+    for as long as the class instance exists. Passing a prebuilt RangeIndex
+    and window bounds answers the statistics for that window without
+    rescanning or copying it. Disabling the spectral stats skips the FFT, which
+    leaves only stats that are cheap enough to refresh on every redraw.
+    Passing a RunningStats accumulator reports its non-spectral stats.
+    Passing a SegmentSpectrum estimates the dominant frequency from cached,
+    averaged segment spectra whenever the window spans enough segments.
+    Otherwise a single FFT is used, and windows longer than SPECTRAL_LIMIT
+    report no dominant frequency, so an out-of-core file is never pulled
+    into memory for a single FFT. Frequencies assume the sample rate fs.
+
+    Each statistic is a kernel in the REGISTRY. Kernels are vectorized over
+    channels: given (channels, samples) data, each kernel runs once for
+    every channel together, and values hold one entry per channel. A
+    statistic may be limited to data of certain units, such as energy to
+    power channels.
 
     Attributes:
         stats: A list of statistic dictionaries. Dictionaries are uniformly
             formatted to contain 'name,' 'value,' and 'unit' entries.
     """
 
-    def __init__(self, data: list = [0], unit: str = ""):
+    ### Constants ###
+    SPECTRAL_LIMIT = 1 << 24  # Longest window given a single FFT
+    REGISTRY = []  # Registered statistics, in display order
+
+    @traced("StatsModel")
+    def __init__(self, data: np.ndarray | RangeIndex | RunningStats = (0,),
+                 unit: str | list[str] = "", left: int = 0, right: int = None,
+                 spectral: bool = True, spectrum: SegmentSpectrum = None,
+                 fs: float = TimeAxis.DEFAULT_RATE):
         self.stats = []
-        self._calc_stats(data, unit)
 
-    def _calc_freq(self, data: list, fs: int) -> np.intp:
-        """Single-sided, peak-detect FFT."""
+        if isinstance(data, RunningStats):
+            if not data.count:
+                return
+            window = StatsWindow(data, 0, data.count, fs)
+            spectral = False  # No samples to transform
+        else:
+            if not isinstance(data, RangeIndex):
+                data = RangeIndex(data)
 
-        fourier = np.abs(np.fft.rfft(data))
-        freqs = np.fft.rfftfreq(len(data), d=1/fs)
+            left, right = data.clip(left, right)
+            if left == right:
+                return
+            window = StatsWindow(data, left, right, fs, spectrum)
 
-        # Find peaks in the spectrum
-        peaks, _ = find_peaks(fourier)
-        peak_freqs = freqs[peaks]
+        units = {unit} if isinstance(unit, str) else set(unit)
+        self.stats = [
+            {'name': stat['name'], 'value': stat['kernel'](window),
+             'unit': stat['unit'] or unit}
+            for stat in StatsModel.REGISTRY
+            if (spectral or not stat['spectral'])
+            and (stat['applies'] is None or units <= stat['applies'])
+        ]
 
-        # Identify dominant normalized frequencies
-        norm_magnitudes = fourier[peaks] / np.max(fourier)
+    @staticmethod
+    def register(name: str, unit: str = None, spectral: bool = False,
+                 applies: tuple[str] = None):
+        """Decorates a kernel that computes a statistic from a StatsWindow.
 
-        if norm_magnitudes.any():
-            dominant_freq = peak_freqs[np.argmax(norm_magnitudes)]
-        else:
-            dominant_freq = 0  # No dominant frequency
+        Args:
+            name: The statistic's display name.
+            unit: A fixed unit, or None for the unit of the data.
+            spectral: Whether the kernel is too slow for every redraw.
+            applies: Units of the data the statistic applies to, or None
+                for any data.
+        """
 
-        return dominant_freq
+        def decorate(kernel):
+            StatsModel.REGISTRY.append(
+                {'name': name, 'unit': unit, 'kernel': kernel, 'spectral': spectral,
+                 'applies': None if applies is None else set(applies)}
+            )
+            return kernel
+        return decorate
 
-    def _calc_stats(self, data: list, unit: str):
-        if not data:
-            return
+    @property
+    def channels(self) -> list[list[dict]]:
+        """Splits the stats of (channels, samples) data into one list of
+        statistic dictionaries per channel.
+        """
+
+        if not self.stats:
+            return []
 
-        # Calculate base stats
-        min_peak = min(data)
-        max_peak = max(data)
-        delta = abs(max_peak-min_peak)
-        std_dev = np.std(data)
-        freq = self._calc_freq(data, fs=1000)  # 1 kHz sample rate
-
-        # Structure stats into a list of dicts
-        stats = [
-            {'name': "Min Peak",      'value': min_peak,  'unit': unit},
-            {'name': "Max Peak",      'value': max_peak,  'unit': unit},
-            {'name': "Delta Peaks",   'value': delta,     'unit': unit},
-            {'name': "RMS Noise",     'value': std_dev,   'unit': unit},
-            {'name': "Pk-Pk Noise",   'value': std_dev*6, 'unit': unit},
-            {'name': "Dominant Freq", 'value': freq,      'unit': "Hz"},
+        count = np.size(self.stats[0]['value'])
+        return [
+            [{'name': stat['name'],
+              'value': np.ravel(stat['value'])[channel],
+              'unit': stat['unit'] if isinstance(stat['unit'], str)
+                      else stat['unit'][channel]}
+             for stat in self.stats]
+            for channel in range(count)
         ]
-        self.stats = stats
\ No newline at end of file
+
+
+@StatsModel.register("Min Peak")
+def _min_peak(window: StatsWindow):
+    return window.min
+
+@StatsModel.register("Max Peak")
+def _max_peak(window: StatsWindow):
+    return window.max
+
+@StatsModel.register("Delta Peaks")
+def _delta_peaks(window: StatsWindow):
+    return np.abs(window.max - window.min)
+
+@StatsModel.register("RMS Noise")
+def _rms_noise(window: StatsWindow):
+    return window.std
+
+@StatsModel.register("Pk-Pk Noise")
+def _pk_pk_noise(window: StatsWindow):
+    return window.std * 6
+
+@StatsModel.register("Avg Power", unit="W", applies=("W",))
+def _avg_power(window: StatsWindow):
+    return window.mean
+
+@StatsModel.register("Energy", unit="J", applies=("W",))
+def _energy(window: StatsWindow):
+    """Integral of power over the window, from prefix sums."""
+
+    return window.sum / window.fs
+
+@StatsModel.register("Dominant Freq", unit="Hz", spectral=True)
+def _dominant_freq(window: StatsWindow):
+    """Single-sided, peak-detect FFT, zero-padded to a fast length.
+
+    The mean is removed first; padding would otherwise spread the DC term
+    into sidelobes that can outweigh the real peak.
+    """
+
+    spectrum = window.spectrum
+    if spectrum is not None and spectrum.covers(window.left, window.right):
+        return spectrum.dominant(window.left, window.right)
+
+    samples = window.samples  # View, not a copy
+    if len(window) > StatsModel.SPECTRAL_LIMIT:
+        return np.full(samples.shape[:-1], np.nan)[()]  # Too long for one FFT
+
+    from scipy.fft import next_fast_len  # Deferred; scipy is slow to import
+    nfft = next_fast_len(len(window), real=True)
+    centered = samples - samples.mean(axis=-1, keepdims=True)
+    fourier = np.abs(np.fft.rfft(centered, n=nfft, axis=-1))
+    freqs = np.fft.rfftfreq(nfft, d=1/window.fs)
+    return peak_frequency(freqs, fourier)
@@ -0,0 +1,9 @@
+# Imports
+import os
+import sys
+from pathlib import Path
+
+# Tests import application modules the way app.py does, from src
+SRC = Path(__file__).parents[1]
+sys.path.insert(0, str(SRC))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
@@ -0,0 +1,49 @@
+# Imports
+import os
+import subprocess
+import sys
+import pytest
+from conftest import SRC
+
+
+"""Tests that the application starts and exits cleanly."""
+
+# Runs the app, then ends it once startup finishes, or at once
+LAUNCH = """
+import sys
+import app
+from utilities.startup import startup
+from views.window_view import Window
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QApplication
+
+# Some PySide6 releases drop a reference to the True that emit() returns.
+# Reserving references that outlive teardown keeps its count from running
+# out, so only the app decides the exit code. True is immortal from 3.12.
+if sys.version_info < (3, 12):
+    import ctypes
+    ctypes.c_ssize_t.from_address(id(True)).value += 1 << 40
+
+show = Window.show
+def show_then_end(window):
+    show(window)
+    end = window.close if sys.argv[1] != 'quit' else QApplication.quit
+    if sys.argv[1] == 'early':
+        QTimer.singleShot(0, end)  # Before the analyzer is built
+        return
+    timer = QTimer(window)
+    timer.timeout.connect(lambda: 'ready' in startup.milestones() and end())
+    timer.start(50)
+
+Window.show = show_then_end
+app.launch()
+"""
+
+@pytest.mark.parametrize("ending", ["close", "quit", "early"])
+def test_exits_cleanly(ending):
+    env = {**os.environ, "QT_QPA_PLATFORM": "offscreen"}
+    result = subprocess.run(
+        [sys.executable, "-c", LAUNCH, ending], cwd=SRC, env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
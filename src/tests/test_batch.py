@@ -0,0 +1,55 @@
+# Imports
+import numpy as np
+import pandas as pd
+import pytest
+import batch
+import convert
+from utilities import columnar
+from utilities.data_loader import DataLoader
+
+
+"""Tests of the batch analysis and conversion command lines."""
+
+def write_captures(directory):
+    DataLoader()  # Loads KEYS
+    header = "# sample rate: 1000\n" + ",".join(DataLoader.KEYS) + "\n"
+    data = np.random.default_rng(0).random((1000, len(DataLoader.KEYS)))
+    with open(directory / "good.csv", 'w') as f:
+        f.write(header)
+        np.savetxt(f, data, delimiter=",", fmt="%.6f")
+    with open(directory / "bad.csv", 'w') as f:
+        f.write(header + ",".join(["1.0"] + ["volts"] * (len(DataLoader.KEYS) - 1)) + "\n")
+
+def test_batch_summarizes_past_a_bad_file(tmp_path):
+    write_captures(tmp_path)
+    output = tmp_path / "out" / "summary.csv"
+    output.parent.mkdir()
+
+    assert batch.main([str(tmp_path), "-o", str(output), "-j", "1"]) == 1
+
+    summary = pd.read_csv(output)
+    failed = summary[summary['error'].notna()]
+    assert list(failed['file']) == [str(tmp_path / "bad.csv")]
+    good = summary[summary['file'] == str(tmp_path / "good.csv")]
+    assert len(good) > 0 and good['error'].isna().all()
+
+def test_convert_continues_past_a_bad_file(tmp_path):
+    if not columnar.available():
+        pytest.skip("converting requires pyarrow")
+    write_captures(tmp_path)
+    output = tmp_path.with_name(f"{tmp_path.name}-arrow")
+
+    assert convert.main([str(tmp_path), "-o", str(output), "-j", "1"]) == 1
+
+    assert (output / "good.arrow").exists()
+    assert not (output / "bad.arrow").exists()
+    assert not any(f.name.startswith(".") for f in tmp_path.iterdir())  # No caches left
+
+def test_fft_of_a_large_file_falls_back_to_segments(tmp_path, monkeypatch, capsys):
+    write_captures(tmp_path)
+    monkeypatch.setattr(batch.ChunkedLoader, "LARGE_FILE", 0)
+
+    rows = batch.analyze(str(tmp_path / "good.csv"), welch=False)
+
+    assert rows and all(np.isfinite(row["Dominant Freq"]) for row in rows)
+    assert "segment spectra" in capsys.readouterr().err
@@ -0,0 +1,65 @@
+# Imports
+import numpy as np
+from utilities.chunked_loader import ChunkedLoader
+from utilities.data_loader import DataLoader
+
+
+"""Tests of the chunked loader and its sample cache."""
+
+def test_trailing_blank_lines_are_not_cached(tmp_path):
+    loader = ChunkedLoader()  # Loads KEYS
+    data = 1 + np.random.default_rng(0).random((10000, len(DataLoader.KEYS)))
+    fpath = tmp_path / "capture.csv"
+    with open(fpath, 'w') as f:
+        f.write("# sample rate: 10000\n" + ",".join(DataLoader.KEYS) + "\n")
+        np.savetxt(f, data, delimiter=",", fmt="%.6f")
+        f.write("\n\n\n")
+
+    parsed = loader.load(fpath)['samples']
+    cached = loader.load(fpath)['samples']  # Reloaded from the cache
+
+    assert isinstance(cached, np.memmap)
+    for samples in (parsed, cached):
+        assert samples.shape == (len(DataLoader.KEYS), len(data))
+        assert np.allclose(samples, data.T, atol=1e-6)
+
+def write_capture(fpath, rows: int):
+    data = 1 + np.random.default_rng(0).random((rows, len(DataLoader.KEYS)))
+    with open(fpath, 'w') as f:
+        f.write("# sample rate: 10000\n" + ",".join(DataLoader.KEYS) + "\n")
+        np.savetxt(f, data, delimiter=",", fmt="%.6f")
+    return data
+
+def test_cached_summaries_are_reused(tmp_path, monkeypatch):
+    loader = ChunkedLoader()
+    fpath = tmp_path / "capture.csv"
+    write_capture(fpath, 10000)
+    parsed = loader.load(fpath)
+
+    monkeypatch.setattr(loader, "_scan", None)  # Reloads must not rescan
+    cached = loader.load(fpath)
+
+    for loaded in (parsed, cached):
+        index, running = loaded['index'], loaded['running']
+        samples = loaded['samples']
+        assert np.allclose(index.mean(100, 9000), samples[:, 100:9000].mean(axis=-1))
+        assert np.array_equal(index.max(5, 7777), samples[:, 5:7777].max(axis=-1))
+        assert np.allclose(running.std, samples.std(axis=-1))
+
+def test_rows_appended_after_counting_are_left_for_the_next_load(tmp_path, monkeypatch):
+    loader = ChunkedLoader()
+    fpath = tmp_path / "capture.csv"
+    data = write_capture(fpath, 1000)
+    count_rows = loader._count_rows
+
+    def count_then_append(path):
+        rows = count_rows(path)
+        with open(fpath, 'a') as f:
+            np.savetxt(f, data[:10], delimiter=",", fmt="%.6f")
+        return rows
+
+    monkeypatch.setattr(loader, "_count_rows", count_then_append)
+    assert loader.load(fpath)['samples'].shape[-1] == 1000
+
+    monkeypatch.setattr(loader, "_count_rows", count_rows)
+    assert loader.load(fpath)['samples'].shape[-1] == 1010
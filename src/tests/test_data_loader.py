@@ -0,0 +1,57 @@
+# Imports
+import io
+import numpy as np
+import pytest
+from utilities import columnar
+from utilities.data_loader import DataLoader
+
+
+"""Tests of CSV loading."""
+
+@pytest.mark.parametrize("arrow", [True, False], ids=["pyarrow", "pandas"])
+def test_short_rows_are_padded_with_nan(tmp_path, monkeypatch, arrow):
+    if arrow and not columnar.available():
+        pytest.skip("requires pyarrow")
+    monkeypatch.setattr(columnar, "available", lambda: arrow)
+    loader = DataLoader()
+    row = ",".join(["1.5"] * len(DataLoader.KEYS))
+    fpath = tmp_path / "capture.csv"
+    fpath.write_text("# sample rate: 1000\n" + ",".join(DataLoader.KEYS) + "\n"
+                     + "\n".join([row, "2.5", row, "3.5"]))  # Last row still being written
+
+    samples = loader.load_samples(fpath)
+
+    assert samples.shape == (len(DataLoader.KEYS), 4)
+    assert samples[0].tolist() == [1.5, 2.5, 1.5, 3.5]
+    assert np.isnan(samples[1:, [1, 3]]).all()
+
+def test_rows_appended_while_parsing_are_loaded_next_time(tmp_path, monkeypatch):
+    loader = DataLoader()
+    row = ",".join(["1.5"] * len(DataLoader.KEYS))
+    fpath = tmp_path / "capture.csv"
+    fpath.write_text(",".join(DataLoader.KEYS) + "\n" + row + "\n")
+    parse = loader._parse_blocks
+
+    def parse_then_append(f, header):
+        samples = parse(f, header)
+        with open(fpath, 'a') as out:
+            out.write(row + "\n")
+        return samples
+
+    monkeypatch.setattr(columnar, "available", lambda: False)
+    monkeypatch.setattr(loader, "_parse_blocks", parse_then_append)
+    assert loader.load_samples(fpath).shape[-1] == 1
+
+    monkeypatch.setattr(loader, "_parse_blocks", parse)
+    assert loader.load_samples(fpath).shape[-1] == 2
+
+@pytest.mark.parametrize("text, units", [
+    ("Scaled Voltage,Scaled Current,Temp\nV,A,C", ["V", "A", "C"]),
+    ("Scaled Voltage,Scaled Current,Temp", ["V", "A", ""]),
+    ("Scaled Voltage", ["V"]),
+], ids=["units", "positional", "one key"])
+def test_keys_without_units_row_default_to_voltage_and_current(text, units):
+    keys, found = DataLoader._read_keys(io.StringIO(text))
+
+    assert keys == text.splitlines()[0].split(",")
+    assert found == units
@@ -0,0 +1,51 @@
+# Imports
+from pathlib import Path
+from models.file_model import FileModel
+# Qt
+from PySide6.QtCore import QCoreApplication
+
+
+"""Tests of the qualified file list."""
+
+def test_files_differing_only_in_suffix_are_listed_apart():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    model = FileModel()
+    csv, arrow = "/data/cap.csv", "/data/cap.arrow"
+
+    model._apply_diff(({}, set(), {csv: True, arrow: True}))
+
+    assert model.rowCount() == 2
+    assert {model.name_to_path(name) for name in model.stringList()} == {Path(csv), Path(arrow)}
+
+    model._apply_diff(({}, {csv}, {}))
+
+    assert model.stringList() == ["cap.arrow"]
+
+def test_removals_keep_rows_in_step_with_names():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    model = FileModel()
+    paths = [f"/data/cap{i}.csv" for i in range(6)]
+
+    model._apply_diff(({}, set(), dict.fromkeys(paths, True)))
+    model._apply_diff(({}, {paths[1], paths[4]}, {paths[2]: False}))
+
+    assert model.stringList() == ["cap0.csv", "cap3.csv", "cap5.csv"]
+    assert model._rows == {"cap0.csv": 0, "cap3.csv": 1, "cap5.csv": 2}
+    assert model.neighbors(1) == [Path(paths[5]), Path(paths[0])]
+
+    model._apply_diff(({}, {paths[0]}, {paths[1]: True}))
+
+    assert model.stringList() == ["cap3.csv", "cap5.csv", "cap1.csv"]
+    assert model._rows == {"cap3.csv": 0, "cap5.csv": 1, "cap1.csv": 2}
+
+def test_choosing_the_watched_directory_again_diffs_it(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    model = FileModel()
+    model.apply_file_filter(tmp_path)
+    model._runner.cancel('scan')
+    refreshed = []
+    model._refresh = lambda: refreshed.append(True)
+
+    model.apply_file_filter(tmp_path)
+
+    assert refreshed == [True]
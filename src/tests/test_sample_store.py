@@ -0,0 +1,20 @@
+# Imports
+import numpy as np
+from utilities.range_index import RangeIndex
+from utilities.sample_store import SampleStore
+from utilities.spectrum import SegmentSpectrum
+
+
+"""Tests of the shared store of loaded files."""
+
+def test_spectrum_caches_count_toward_the_bound():
+    samples = np.zeros((2, 1 << 20))
+    spectrum = SegmentSpectrum(samples, 1000)
+    entry = {'indices': [RangeIndex(samples)], 'plots': [], 'spectra': [spectrum, None]}
+    store = SampleStore()
+
+    store.put("file", {**entry, 'spectra': None})
+    bare = store.nbytes
+    store.put("file", entry)
+
+    assert store.nbytes - bare == spectrum.nbytes > 0
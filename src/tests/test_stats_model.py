@@ -0,0 +1,20 @@
+# Imports
+import numpy as np
+from models.stats_model import StatsModel
+from utilities.range_index import RangeIndex
+
+
+"""Tests of the per-channel statistics."""
+
+def dominant_freq(data: np.ndarray, fs: float) -> float:
+    channels = StatsModel(RangeIndex(data[np.newaxis]), ["V"], fs=fs).channels
+    return next(stat['value'] for stat in channels[0] if stat['name'] == "Dominant Freq")
+
+def test_dominant_freq_ignores_dc_offset():
+    # 1001 samples are zero-padded to 1024 for the FFT
+    fs, tone = 10000, 171.8
+    t = np.arange(1001) / fs
+    rng = np.random.default_rng(0)
+    data = 3.8 + 3e-3 * np.sin(2*np.pi * tone * t) + 1e-3 * rng.standard_normal(len(t))
+
+    assert abs(dominant_freq(data, fs) - tone) < fs / 1024
@@ -0,0 +1,24 @@
+# Imports
+import numpy as np
+from utilities.tail_reader import TailReader
+
+
+"""Tests of following a growing CSV."""
+
+def test_seek_resumes_after_loaded_rows(tmp_path):
+    fpath = tmp_path / "capture.csv"
+    rows = [f"{i},{2 * i}" for i in range(100)]
+    with open(fpath, 'w') as f:
+        f.write('# sample rate: 10\n"Time, s","Volts"\n')
+        f.write("\n".join(rows[:50]) + "\n\n  \n" + "\n".join(rows[50:]) + "\n100,2")
+
+    reader = TailReader(fpath, ["Volts"], 'float32')
+    assert reader.seek(60) == 60
+    block = reader.read()  # The unterminated last row is held back
+
+    assert block.dtype == np.float32
+    assert block[0].tolist() == [2 * i for i in range(60, 100)]
+
+    with open(fpath, 'a') as f:
+        f.write("00\n")
+    assert reader.read()[0].tolist() == [200]
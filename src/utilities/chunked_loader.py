@@ -0,0 +1,237 @@
+# Imports
+from pathlib import Path
+import tempfile
+import numpy as np
+from models.stats_model import RunningStats
+from utilities import columnar
+from utilities.data_loader import DataLoader
+from utilities.envelope import EnvelopePyramid
+from utilities.range_index import RangeIndex
+from utilities.sample_cache import SampleCache
+from utilities.tracer import traced
+
+
+class ChunkedLoader:
+    """Loads files larger than RAM in a single chunked pass.
+
+    The CSV is parsed CHUNK_ROWS rows at a time. Each chunk is written
+    straight into the memory-mapped sample cache, folded into per-channel
+    running stats and range indices, and reduced into a min/max preview.
+    The preview and summaries are cached on disk next to the samples. Only
+    the summaries are held in RAM; the samples stay on disk.
+
+    Re-opening a cached file restores the cached summaries without reading
+    the samples. Caches written without summaries get a chunked pass over
+    the binary samples to rebuild them. Columnar files are never parsed or
+    cached; they only get that pass.
+    """
+
+    ### Constants ###
+    LARGE_FILE = 256 * 1024**2  # Bytes above which files are loaded in chunks
+    CHUNK_ROWS = 1 << 20  # Multiple of PREVIEW_BLOCK
+    PREVIEW_BLOCK = EnvelopePyramid.FACTOR ** 5  # Samples per preview point
+
+    def __init__(self, dtype: str = None):
+        self._loader = DataLoader(dtype)
+
+    def is_large(self, fpath: str) -> bool:
+        return Path(fpath).stat().st_size > ChunkedLoader.LARGE_FILE
+
+    @traced()
+    def load(self, fpath: str) -> dict:
+        """Loads a file and its summaries.
+
+        Returns:
+            A dictionary with 'samples', a (channels, samples) memory-mapped
+            array in KEYS order, its 'index' (RangeIndex) and 'running'
+            (RunningStats) over all channels, and a per-channel list of
+            'plots' (EnvelopePyramid seeded from the preview).
+        """
+
+        if columnar.is_columnar(fpath):
+            # Already memory-mapped; only the summaries need a pass
+            samples = self._loader.load_samples(fpath)
+            previews = []
+            index, running = self._scan(samples, previews)
+            preview = self._join(previews, len(DataLoader.KEYS))
+        else:
+            cache = SampleCache(fpath, DataLoader.KEYS, self._loader.dtype)
+            samples = cache.load()
+            preview = cache.load_preview()
+
+            if samples is None or preview is None:
+                samples, preview, index, running = self._parse(fpath, cache)
+            else:
+                index, running = (self._restore(samples, cache.load_summary())
+                                  or self._scan(samples))
+
+        plots = [
+            EnvelopePyramid(row, base=(ChunkedLoader.PREVIEW_BLOCK, *envelope))
+            for row, envelope in zip(samples, preview)
+        ]
+
+        return {
+            'samples': samples,
+            'index': index,
+            'running': running,
+            'plots': plots,
+        }
+
+    @traced()
+    def derive(self, samples: np.ndarray, derive, channels: int) -> dict:
+        """Computes channels derived from loaded samples, chunk by chunk.
+
+        The derived samples are written to a temporary memory-mapped file,
+        so they never need to fit in RAM either.
+
+        Args:
+            samples: The 'samples' of a load.
+            derive: A function mapping a (channels, rows) chunk of samples
+                to a (derived channels, rows) chunk.
+            channels: The number of derived channels.
+
+        Returns:
+            A dictionary with the same entries as load().
+        """
+
+        rows = samples.shape[-1]
+        scratch = tempfile.TemporaryFile()
+        derived = np.memmap(scratch, mode='w+', dtype=samples.dtype,
+                            shape=(max(channels, 1), max(rows, 1)))[:channels, :rows]
+        previews = []
+
+        for start in range(0, rows, ChunkedLoader.CHUNK_ROWS):
+            end = min(start + ChunkedLoader.CHUNK_ROWS, rows)
+            chunk = derive(samples[:, start:end])
+            derived[:, start:end] = chunk
+            previews.append(self._preview(chunk))
+
+        preview = self._join(previews, channels)
+        index, running = self._scan(derived)
+        plots = [
+            EnvelopePyramid(row, base=(ChunkedLoader.PREVIEW_BLOCK, *envelope))
+            for row, envelope in zip(derived, preview)
+        ]
+
+        return {
+            'samples': derived,
+            'index': index,
+            'running': running,
+            'plots': plots,
+        }
+
+    def _parse(self, fpath: str, cache: SampleCache) -> tuple:
+        """Parses the CSV into the cache while summarizing it.
+
+        Only the rows counted up front are parsed. Rows appended later are
+        left for the next load, as the cache then no longer matches.
+        """
+
+        channels = len(DataLoader.KEYS)
+        rows = self._count_rows(fpath)
+        samples = cache.create((channels, rows))
+        summaries = self._summaries(channels, rows)
+        previews = []
+
+        written = 0
+        for chunk in self._loader.load_chunks(fpath, ChunkedLoader.CHUNK_ROWS):
+            chunk = chunk[:, :rows - written]
+            if not chunk.shape[-1]:
+                break
+            end = written + chunk.shape[-1]
+            samples[:, written:end] = chunk
+            self._summarize(summaries, samples[:, :end], chunk)
+            previews.append(self._preview(chunk))
+            written = end
+
+        preview = self._join(previews, channels)
+        cache.commit(samples, preview, length=written, summary=self._pack(*summaries))
+
+        # Blank lines are counted but not parsed; the cache records the
+        # parsed length, so reloads see the same samples
+        if written < rows:
+            samples = samples[:, :written]
+        return (samples, preview, *summaries)
+
+    def _scan(self, samples: np.ndarray, previews: list = None) -> tuple:
+        """Rebuilds summaries from cached samples, one chunk at a time.
+
+        Chunk previews are appended to previews, if given.
+        """
+
+        channels, rows = samples.shape
+        summaries = self._summaries(channels, rows)
+
+        for start in range(0, rows, ChunkedLoader.CHUNK_ROWS):
+            end = min(start + ChunkedLoader.CHUNK_ROWS, rows)
+            self._summarize(summaries, samples[:, :end], samples[:, start:end])
+            if previews is not None:
+                previews.append(self._preview(samples[:, start:end]))
+
+        return summaries
+
+    def _pack(self, index: RangeIndex, running: RunningStats) -> dict:
+        """Flattens summaries into named arrays for the cache."""
+
+        summary = {f"index_{name}": array for name, array in index.state().items()}
+        summary.update({f"running_{name}": array for name, array in running.state().items()})
+        return summary
+
+    def _restore(self, samples: np.ndarray, summary: dict | None) -> tuple | None:
+        """Restores summaries packed by _pack(), or returns None if there
+        are none for these samples.
+        """
+
+        if summary is None:
+            return None
+
+        states = {'index': {}, 'running': {}}
+        for key, array in summary.items():
+            group, _, name = key.partition('_')
+            states.setdefault(group, {})[name] = array
+
+        try:
+            index = RangeIndex.from_state(samples, states['index'])
+            running = RunningStats.from_state(states['running'])
+        except (KeyError, ValueError):
+            return None
+        return index, running
+
+    def _join(self, previews: list, channels: int) -> np.ndarray:
+        if not previews:
+            return np.empty((channels, 2, 0))
+        return np.concatenate(previews, axis=-1)
+
+    def _summaries(self, channels: int, rows: int) -> tuple:
+        index = RangeIndex(np.empty((channels, 0)), length=rows)
+        return index, RunningStats()
+
+    def _summarize(self, summaries: tuple, samples: np.ndarray, chunk: np.ndarray):
+        index, running = summaries
+        index.extend(samples)
+        running.update(chunk)
+
+    def _preview(self, chunk: np.ndarray) -> np.ndarray:
+        """Reduces a chunk to (channels, 2, blocks) block minima and maxima."""
+
+        starts = np.arange(0, chunk.shape[-1], ChunkedLoader.PREVIEW_BLOCK)
+        mins = np.minimum.reduceat(chunk, starts, axis=-1)
+        maxs = np.maximum.reduceat(chunk, starts, axis=-1)
+        return np.stack((mins, maxs), axis=1)
+
+    def _count_rows(self, fpath: str) -> int:
+        """Counts data rows by scanning for line breaks, without parsing."""
+
+        lines = 0
+        last = b'\n'
+
+        with open(fpath, 'rb') as f:
+            while block := f.read(1 << 24):
+                lines += block.count(b'\n')
+                last = block[-1:]
+
+        if last != b'\n':
+            lines += 1  # Final line without a line break
+
+        preamble, _, _ = self._loader.header(fpath)
+        return max(lines - 1 - preamble, 0)  # Minus metadata and the header
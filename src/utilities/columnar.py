@@ -0,0 +1,136 @@
+# Imports
+from functools import cache
+from importlib.util import find_spec
+from pathlib import Path
+import os
+import numpy as np
+
+
+"""Reading and writing captures as Arrow IPC files.
+
+Captures are stored one column per channel, in a single record batch, with
+the capture's metadata in the schema. Uncompressed files are read through a
+memory map: when the requested columns are stored in order with the
+requested dtype, the returned (channels, samples) array is a strided view
+of the map and nothing is copied or parsed. Compressed files trade that
+for size and are decompressed on read.
+
+Requires pyarrow; available() is False without it. pyarrow is imported on
+first use rather than with this module, since it is slow to import.
+"""
+
+SUFFIXES = (".arrow", ".feather")  # Feather v2 is the same IPC file format
+COMPRESSIONS = ("none", "lz4", "zstd")
+
+@cache
+def available() -> bool:
+    return find_spec("pyarrow") is not None
+
+def _arrow():
+    """Returns the pyarrow and pyarrow.ipc modules."""
+
+    import pyarrow
+    from pyarrow import ipc
+    return pyarrow, ipc
+
+def is_columnar(fpath: str) -> bool:
+    return Path(fpath).suffix.lower() in SUFFIXES
+
+def schema(fpath: str) -> tuple[list, dict]:
+    """Returns the column names and metadata of a file, with lowercase
+    metadata keys, without reading any samples.
+    """
+
+    pyarrow, ipc = _arrow()
+    with pyarrow.memory_map(str(fpath)) as source:
+        file_schema = ipc.open_file(source).schema
+
+    metadata = {
+        key.decode(errors='replace').lower(): value.decode(errors='replace')
+        for key, value in (file_schema.metadata or {}).items()
+    }
+    return file_schema.names, metadata
+
+def read(fpath: str, columns: list, dtype='float64') -> np.ndarray:
+    """Returns columns of a file as one (channels, samples) array.
+
+    The array is a read-only view of the memory-mapped file when possible,
+    or else a new array.
+
+    Raises:
+        ValueError: If a column cannot be read as numbers.
+    """
+
+    pyarrow, ipc = _arrow()
+    dtype = np.dtype(dtype)
+    source = pyarrow.memory_map(str(fpath))
+    whole = source.read_buffer()  # The whole map, without copying
+    table = ipc.open_file(whole).read_all()
+    arrays = [table.column(name) for name in columns]
+
+    samples = _view(whole, arrays, dtype)
+    if samples is not None:
+        return samples
+
+    samples = np.empty((len(columns), table.num_rows), dtype=dtype)
+    for row, array in enumerate(arrays):
+        samples[row] = array.to_numpy()  # Nulls become NaN
+    return samples
+
+def _view(whole, arrays: list, dtype: np.dtype) -> np.ndarray | None:
+    """Returns a strided view of column buffers lying inside whole at an
+    even spacing, or None if they do not.
+    """
+
+    if not arrays or any(array.num_chunks != 1 or array.null_count for array in arrays):
+        return None
+
+    pyarrow, _ = _arrow()
+    chunks = [array.chunk(0) for array in arrays]
+    if any(chunk.type != pyarrow.from_numpy_dtype(dtype) for chunk in chunks):
+        return None
+
+    rows = len(chunks[0])
+    addresses = [
+        chunk.buffers()[1].address + chunk.offset * dtype.itemsize for chunk in chunks
+    ]
+    steps = set(np.diff(addresses).tolist()) or {rows * dtype.itemsize}
+    step = steps.pop()
+
+    start = addresses[0] - whole.address
+    end = addresses[-1] - whole.address + rows * dtype.itemsize
+    if steps or step < 0 or step % dtype.itemsize or start < 0 or end > whole.size:
+        return None  # Decompressed, reordered or interleaved with other columns
+
+    memory = np.frombuffer(whole, dtype=np.uint8)  # Keeps the map alive
+    return np.ndarray((len(chunks), rows), dtype=dtype, buffer=memory,
+                      offset=start, strides=(step, dtype.itemsize))
+
+def write(fpath: str, samples: np.ndarray, columns: list, metadata: dict = None,
+          compression: str = "none"):
+    """Writes (channels, samples) data as a single-batch Arrow IPC file.
+
+    The file is written next to its destination and then moved into place,
+    so readers never see a partial file.
+    """
+
+    pyarrow, ipc = _arrow()
+    fpath = Path(fpath)
+    table = pyarrow.table(
+        [pyarrow.array(row) for row in samples],  # Contiguous rows are not copied
+        names=list(columns),
+    )
+    table = table.replace_schema_metadata(
+        {str(key): str(value) for key, value in (metadata or {}).items()}
+    )
+    options = ipc.IpcWriteOptions(
+        compression=None if compression == "none" else compression
+    )
+
+    partial = fpath.with_name(f".{fpath.name}.tmp")
+    try:
+        with ipc.new_file(str(partial), table.schema, options=options) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+        os.replace(partial, fpath)
+    finally:
+        partial.unlink(missing_ok=True)
@@ -1,59 +1,408 @@
 # Imports
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
 from pathlib import Path
-from pandas import read_csv
+from utilities import columnar
+from utilities.sample_cache import SampleCache
+from utilities.time_axis import TimeAxis
+from utilities.tracer import traced
 import csv
+import os
+import re
+import numpy as np
 
 
 class DataLoader:
     """Provides functions for loading and qualifying individual files.
 
     Qualification is defined by an external KEYS file that gets read once
-    during class initialization.
+    per process, on first class initialization. Its first row names the
+    data columns; an optional second row gives their units. Without it, the
+    first two columns are taken to be a voltage and a current, as before
+    units were configurable. Qualification results are cached by path, modification time and size, so revisiting a
+    directory only stats its files instead of re-reading their headers.
+
+    A header may be preceded by '#' comment lines of 'key: value' metadata.
+    The sample rate is taken from that metadata, or else from the spacing of
+    a time column, which is never loaded as a whole.
+
+    Loading opens a file once, validates its header and parses only the KEYS
+    columns from the same handle. Whole files are parsed by pyarrow when it
+    is installed, or else in blocks of lines on several threads by the
+    pandas C parser. Samples are float64 unless the loader is created with
+    dtype 'float32', which halves memory at the cost of precision.
+
+    Captures converted to the columnar Arrow format (see utilities.columnar)
+    qualify and load the same way when pyarrow is installed. Their header
+    and metadata come from the file's schema, and their samples are
+    memory-mapped rather than parsed, so they need no sample cache.
 
     Attributes:
         keys: A list global constant that stores user-defined data types.
+        units: The unit of each key, in KEYS order.
+        dtype: The dtype of loaded samples.
     """
 
     ### Constants ###
     KEYS = []  # Keys into model values
+    UNITS = []  # Unit of each key
+    DEFAULT_UNITS = ("V", "A")  # Of the first keys, if KEYS.csv has no units row
+    _qualified = {}  # Maps path to (mtime, size, qualified) of its last check
+    RATE_KEYS = ("sample rate", "sampling rate", "sample_rate", "fs")  # In Hz
+    START_KEYS = ("start time", "start_time", "start")  # In seconds
+    TIME_UNITS = {"s": 1, "ms": 1e-3, "us": 1e-6, "µs": 1e-6, "ns": 1e-9}
+    TIME_PROBE_ROWS = 4096  # Time column rows read to find the sample period
+    DTYPE = 'float64'  # Default sample dtype
+    PARSE_BLOCK = 64 * 1024**2  # Bytes per thread when parsing without pyarrow
+    PARSE_THREADS = os.cpu_count() or 1
+
+    def __init__(self, dtype: str = None):
+        self.dtype = np.dtype(dtype or DataLoader.DTYPE)
+
+        if DataLoader.KEYS:
+            return  # Already loaded by an earlier instance
 
-    def __init__(self):
         # Load in keys from user template
         with open(Path(__file__).parents[1] / 'data/KEYS.csv', 'r') as f:
-            reader = csv.DictReader(f)
-            DataLoader.KEYS = reader.fieldnames
+            DataLoader.KEYS, DataLoader.UNITS = DataLoader._read_keys(f)
+
+    @staticmethod
+    def _read_keys(f) -> tuple[list, list]:
+        """Returns the keys of a KEYS file and their units."""
+
+        reader = csv.DictReader(f)
+        keys = reader.fieldnames or []
+        units = next(reader, None)
+
+        if units is None:
+            defaults = DataLoader.DEFAULT_UNITS[:len(keys)]
+            return keys, [*defaults, *[""] * (len(keys) - len(defaults))]
+        return keys, [units.get(key) or "" for key in keys]
+
+    @staticmethod
+    def formats() -> tuple[str]:
+        """Returns the file suffixes that can be loaded."""
+
+        return (".csv",) + (columnar.SUFFIXES if columnar.available() else ())
+
+    @staticmethod
+    def preload():
+        """Imports the parsers that loading needs, so the first load does
+        not wait for them. Safe to run on a worker thread.
+        """
+
+        import pandas
+        if columnar.available():
+            import pyarrow.csv
+            import pyarrow.ipc
 
     def qualify(self, fpath: str) -> bool:
-        """Check if target CSV contains expected header."""
+        """Check if target file contains expected header.
 
-        isCSV = Path(fpath).suffix.lower() == ".csv"
+        Safe to call from multiple threads at once.
+        """
 
-        if not isCSV:
+        if Path(fpath).suffix.lower() not in DataLoader.formats():
             return False
 
         try:
-            with open(Path(fpath), 'r') as f:
-                reader = csv.DictReader(f)
-                header = reader.fieldnames
+            stat = Path(fpath).stat()
+        except OSError:
+            return False
+
+        # Reuse the last result while the file is unchanged
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = DataLoader._qualified.get(str(fpath))
+        if cached and cached[:2] == signature:
+            return cached[2]
+
+        try:
+            _, header, _ = self.header(fpath)
 
             # Return True if qualifying names are in header
-            has_match = header <= DataLoader.KEYS
-            return has_match
+            has_match = set(DataLoader.KEYS) <= set(header)
 
         except:
-            return False
+            has_match = False
+
+        DataLoader._qualified[str(fpath)] = (*signature, has_match)
+        return has_match
+
+    def header(self, fpath: str) -> tuple[int, list, dict]:
+        """Reads the metadata lines and column names of a file.
+
+        Returns:
+            The number of metadata lines before the column names, the
+            column names, and a dictionary of metadata with lowercase keys.
+        """
+
+        if columnar.is_columnar(fpath):
+            return (0, *columnar.schema(fpath))
+
+        with open(Path(fpath), 'rb') as f:
+            return self._read_header(f)
+
+    def _read_header(self, f) -> tuple[int, list, dict]:
+        """Reads the metadata lines and column names from a binary file,
+        leaving it positioned at the first row of data.
+        """
+
+        preamble = 0
+        metadata = {}
+
+        line = f.readline().decode(errors='replace')
+        while line.startswith('#'):
+            preamble += 1
+            match = re.match(r'#\s*([^:=]+?)\s*[:=]\s*(.*)', line)
+            if match:
+                metadata[match.group(1).lower()] = match.group(2).strip()
+            line = f.readline().decode(errors='replace')
+
+        header = next(csv.reader([line]), [])
+
+        return preamble, header, metadata
+
+    def _validate(self, fpath: str, header: list):
+        missing = [key for key in DataLoader.KEYS if key not in header]
+        if missing:
+            raise ValueError(f"{fpath} is missing columns: {', '.join(missing)}")
+
+    @traced()
+    def time_axis(self, fpath: str) -> TimeAxis:
+        """Detects the sample rate and start time of a file.
+
+        Metadata takes precedence over a time column. Files with neither
+        are assumed to be sampled at the default rate.
+        """
+
+        try:
+            preamble, header, metadata = self.header(fpath)
+        except OSError:
+            return TimeAxis()
+
+        rate = self._metadata_value(metadata, DataLoader.RATE_KEYS)
+        start = self._metadata_value(metadata, DataLoader.START_KEYS)
+        if rate:
+            return TimeAxis(rate, start or 0.0)
+
+        column = next((name for name in header if self._time_scale(name)), None)
+        if column is None:
+            return TimeAxis(start=start or 0.0)
+
+        # A short probe is enough for uniformly sampled data
+        try:
+            if columnar.is_columnar(fpath):
+                times = columnar.read(fpath, [column])[0][:DataLoader.TIME_PROBE_ROWS]
+            else:
+                times = _read_csv(
+                    filepath_or_buffer = fpath,
+                    skiprows = preamble,
+                    header = 0,
+                    usecols = [column],
+                    delimiter = ',',
+                    dtype = 'float64',
+                    nrows = DataLoader.TIME_PROBE_ROWS,
+                )[column].to_numpy()
+            times = times * self._time_scale(column)
+        except ValueError:
+            return TimeAxis(start=start or 0.0)  # Not numeric times
+
+        period = np.median(np.diff(times)) if len(times) > 1 else 0
+        if not period > 0:
+            return TimeAxis(start=start or 0.0)
+
+        return TimeAxis(1 / period, times[0])
+
+    def _metadata_value(self, metadata: dict, keys: tuple) -> float | None:
+        for key in keys:
+            try:
+                return float(metadata[key].split()[0])
+            except (KeyError, IndexError, ValueError):
+                continue
+        return None
+
+    def _time_scale(self, name: str) -> float | None:
+        """Returns seconds per unit of a time column name, such as
+        'Time (ms)', or None if the column does not hold times.
+        """
+
+        match = re.fullmatch(r'\s*(time|timestamp|t)\s*(?:\((\S+)\)|\[(\S+)\])?\s*',
+                             name, re.IGNORECASE)
+        if match is None:
+            return None
+
+        unit = match.group(2) or match.group(3) or "s"
+        return DataLoader.TIME_UNITS.get(unit.lower())
+
+    def load_chunks(self, fpath: str, rows: int):
+        """Yields (channels, rows) arrays of the KEYS columns, in file order,
+        without holding more than one chunk in memory.
+
+        Raises:
+            ValueError: If the file lacks any of the KEYS columns.
+        """
+
+        if columnar.is_columnar(fpath):
+            samples = self.load_samples(fpath)
+            for start in range(0, samples.shape[-1], rows):
+                yield samples[:, start:start + rows]
+            return
+
+        with open(Path(fpath), 'rb') as f:
+            _, header, _ = self._read_header(f)
+            self._validate(fpath, header)
+
+            reader = _read_csv(
+                filepath_or_buffer = f,
+                header = None,
+                names = header,
+                usecols = DataLoader.KEYS,
+                delimiter = ',',
+                dtype = self.dtype,
+                chunksize = rows,
+            )
+
+            with reader:
+                for dataframe in reader:
+                    yield self._columns(dataframe)
+
+    def _columns(self, dataframe) -> np.ndarray:
+        """Returns one contiguous row per key, in KEYS order."""
+
+        return np.ascontiguousarray(
+            dataframe[DataLoader.KEYS].to_numpy(dtype=self.dtype).T
+        )
 
     def load(self, fpath: str = '') -> dict:
-        """Load compatible data sets into a dictionary."""
+        """Load compatible data sets into a dictionary of sample arrays.
+
+        The arrays are rows of the array returned by load_samples.
+        """
+
+        return dict(zip(DataLoader.KEYS, self.load_samples(fpath)))
+
+    @traced()
+    def load_samples(self, fpath: str) -> np.ndarray:
+        """Loads the KEYS columns as one (channels, samples) array.
+
+        The first load of a file parses the CSV and writes a binary sidecar
+        cache; later loads of the unchanged file memory-map that cache.
+        Columnar files are memory-mapped directly.
+
+        Raises:
+            ValueError: If the file lacks any of the KEYS columns.
+        """
+
+        if columnar.is_columnar(fpath):
+            _, header, _ = self.header(fpath)
+            self._validate(fpath, header)
+            return columnar.read(fpath, DataLoader.KEYS, self.dtype)
+
+        cache = SampleCache(fpath, DataLoader.KEYS, self.dtype)
+        samples = cache.load()
+
+        if samples is None:
+            with open(Path(fpath), 'rb') as f:
+                _, header, _ = self._read_header(f)
+                self._validate(fpath, header)
+
+                if columnar.available():  # Multithreaded CSV engine
+                    samples = self._parse_arrow(f, header)
+                else:
+                    samples = self._parse_blocks(f, header)
+
+            cache.store(samples)
+
+        return samples
+
+    def _parse_arrow(self, f, header: list) -> np.ndarray:
+        """Parses the rest of a file with pyarrow's CSV engine.
 
-        # Buffer only the relevant columns
-        dataframe = read_csv(
-            filepath_or_buffer = fpath,
-            header = 0,
+        pyarrow cannot pad rows with too few fields, such as one still
+        being written, so files with any are parsed by _parse_blocks
+        instead, which fills the missing fields with NaN.
+        """
+
+        import pyarrow
+        from pyarrow import csv as arrow_csv
+
+        start = f.tell()
+        short = []
+        table = arrow_csv.read_csv(
+            f,
+            read_options = arrow_csv.ReadOptions(column_names=header),
+            parse_options = arrow_csv.ParseOptions(
+                invalid_row_handler=lambda row: short.append(row) or 'skip'
+            ),
+            convert_options = arrow_csv.ConvertOptions(
+                include_columns = DataLoader.KEYS,
+                column_types = {key: pyarrow.from_numpy_dtype(self.dtype)
+                                for key in DataLoader.KEYS},
+            ),
+        )
+
+        if short:
+            f.seek(start)
+            return self._parse_blocks(f, header)
+
+        samples = np.empty((len(DataLoader.KEYS), table.num_rows), dtype=self.dtype)
+        for row, key in enumerate(DataLoader.KEYS):
+            samples[row] = table.column(key).to_numpy()
+
+        return samples
+
+    def _parse_blocks(self, f, header: list) -> np.ndarray:
+        """Parses the rest of a file in blocks of whole lines, one thread
+        per block. The C parser releases the GIL while tokenizing.
+        """
+
+        blocks = self._split(f.read(), DataLoader.PARSE_BLOCK)
+        parse = partial(self._parse_block, header=header)
+
+        with ThreadPoolExecutor(DataLoader.PARSE_THREADS) as pool:
+            parts = list(pool.map(parse, blocks))
+
+        if not parts:
+            return np.empty((len(DataLoader.KEYS), 0), dtype=self.dtype)
+
+        return np.concatenate(parts, axis=-1)
+
+    def _parse_block(self, block: memoryview, header: list) -> np.ndarray:
+        dataframe = _read_csv(
+            filepath_or_buffer = BytesIO(block),
+            header = None,
+            names = header,
             usecols = DataLoader.KEYS,
             delimiter = ',',
-            dtype = 'float64',
+            dtype = self.dtype,
         )
 
-        datadict = dataframe.to_dict(orient='series')
-        return datadict
\ No newline at end of file
+        return self._columns(dataframe)
+
+    def _split(self, data: bytes, size: int) -> list[memoryview]:
+        """Splits data into blocks of about size bytes at line ends."""
+
+        view = memoryview(data)
+        blocks = []
+        start = 0
+
+        while start < len(data):
+            end = data.find(b'\n', start + size)
+            end = len(data) if end < 0 else end + 1
+            if end < len(data) or data[start:].strip():  # Skip trailing blank lines
+                blocks.append(view[start:end])
+            start = end
+
+        return blocks
+
+
+def _read_csv(*args, **kwargs):
+    """Calls pandas.read_csv, importing pandas on first use.
+
+    pandas takes longer to import than the window takes to appear, and
+    qualifying files never needs it.
+    """
+
+    from pandas import read_csv
+    return read_csv(*args, **kwargs)
@@ -0,0 +1,166 @@
+# Imports
+import numpy as np
+from utilities.range_index import as_float
+
+
+class EnvelopePyramid:
+    """Multi-resolution min/max envelope of a data set for plotting.
+
+    Each level reduces the level below it by FACTOR, keeping the minimum and
+    maximum of every block. Plotting a level draws one vertical stroke per
+    block from its minimum to its maximum, so every peak in the raw data
+    stays visible no matter how far the view is zoomed out. A pyramid can
+    be extended as its data grows; only the blocks touched by new samples
+    are recomputed.
+
+    A pyramid may also be seeded with a precomputed base level, such as an
+    on-disk preview of a file larger than RAM. Levels finer than the base
+    are then reduced on demand from the visible samples only.
+
+    Attributes:
+        values: The raw data. Held by reference, never copied.
+    """
+
+    ### Constants ###
+    FACTOR = 4  # Samples per block at each successive level
+
+    def __init__(self, data, base: tuple = None):
+        """Builds the pyramid.
+
+        Args:
+            data: The raw data.
+            base: An optional (block size, block minima, block maxima)
+                level to build coarser levels from. The block size must be
+                a power of FACTOR.
+        """
+
+        self.values = as_float(data)
+        self._levels = []  # [block size, block minima, block maxima]
+        self._base = 1  # Block size below which levels are not stored
+
+        if base is None:
+            self._update(0)
+        else:
+            self._base = base[0]
+            self._levels.append(list(base))
+            self._update(0, start=1)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the stored levels, not counting the raw data."""
+
+        return sum(mins.nbytes + maxs.nbytes for _, mins, maxs in self._levels)
+
+    def extend(self, data):
+        """Re-points the pyramid at a longer version of its data.
+
+        Args:
+            data: An array whose leading samples equal the current data.
+        """
+
+        first = len(self)
+        self.values = as_float(data)
+        self._update(first)
+
+    def _update(self, first: int, start: int = 0):
+        """Recomputes every block that holds a sample at or after first,
+        from level start upwards.
+        """
+
+        if start:
+            size, mins, maxs = self._levels[start-1]
+        else:
+            size, mins, maxs = 1, self.values, self.values
+        level = start
+
+        while len(mins) > EnvelopePyramid.FACTOR:
+            size *= EnvelopePyramid.FACTOR
+            block = first // size
+            starts = np.arange(block * EnvelopePyramid.FACTOR, len(mins),
+                               EnvelopePyramid.FACTOR)
+
+            # Reduce only the dirty tail of the level below
+            if len(starts):
+                offset = starts[0]
+                new_mins = np.minimum.reduceat(mins[offset:], starts - offset)
+                new_maxs = np.maximum.reduceat(maxs[offset:], starts - offset)
+            else:
+                new_mins = new_maxs = mins[:0]
+
+            if level == len(self._levels):
+                self._levels.append([size, new_mins, new_maxs])
+            else:
+                _, old_mins, old_maxs = self._levels[level]
+                self._levels[level][1] = np.concatenate((old_mins[:block], new_mins))
+                self._levels[level][2] = np.concatenate((old_maxs[:block], new_maxs))
+
+            _, mins, maxs = self._levels[level]
+            level += 1
+
+    def bounds(self) -> tuple[float, float]:
+        """Returns the minimum and maximum of the whole data set."""
+
+        if not len(self):
+            return 0.0, 0.0
+        if not self._levels:
+            return float(self.values.min()), float(self.values.max())
+
+        _, mins, maxs = self._levels[-1]
+        return float(mins.min()), float(maxs.max())
+
+    def segment(self, left: int, right: int, max_points: int) -> tuple:
+        """Returns plot-ready (x, y) arrays for the window [left, right).
+
+        The finest level that fits within max_points is used. Raw samples
+        are returned unchanged when the window is already small enough.
+        """
+
+        n = len(self)
+        left = min(max(0, int(left)), n)
+        right = min(max(left, int(right)), n)
+
+        if right - left <= max_points or not self._levels:
+            x = np.arange(left, right)
+            return x, self.values[left:right]
+
+        # Coarsest level is the fallback for very narrow plots
+        size, mins, maxs = self._levels[-1]
+        for level in self._candidates():
+            if 2 * (right - left) // level[0] <= max_points:
+                size, mins, maxs = level
+                break
+
+        first = left // size
+        last = -(-right // size)  # Ceiling division
+
+        # Levels below the base are reduced from the visible samples only
+        if mins is None:
+            window = self.values[first*size:min(last*size, n)]
+            starts = np.arange(0, len(window), size)
+            mins = np.minimum.reduceat(window, starts)
+            maxs = np.maximum.reduceat(window, starts)
+            first, last = 0, len(starts)
+            offset = left // size * size
+        else:
+            offset = 0
+
+        # Stroke each block from its minimum to its maximum at its centre
+        centres = offset + np.arange(first, last) * size + (size - 1) / 2
+        x = np.repeat(np.minimum(centres, n - 1), 2)
+        y = np.column_stack((mins[first:last], maxs[first:last])).ravel()
+        return x, y
+
+    def _candidates(self):
+        """Yields levels from finest to coarsest, with unstored levels below
+        the base as (block size, None, None).
+        """
+
+        size = EnvelopePyramid.FACTOR
+        while size < self._base:
+            yield size, None, None
+            size *= EnvelopePyramid.FACTOR
+
+        yield from self._levels
@@ -0,0 +1,78 @@
+# Imports
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """Least-recently-used mapping bounded by the total size of its values.
+
+    Subclasses define the size of an entry with _size(). The oldest entries
+    are evicted once the size of all entries exceeds the byte bound; the
+    newest entry stays even if it alone exceeds it.
+
+    Safe to use from several threads at once.
+
+    Attributes:
+        hits: Lookups answered from the cache.
+        misses: Lookups that found nothing.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # Maps key to (value, size)
+        self._bytes = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        """Checks for an entry without counting a lookup."""
+
+        return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        """Size of all entries."""
+
+        return self._bytes
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        self._store(key, value, self._size(key, value))
+
+    def _store(self, key, value, size: int):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def _size(self, key, value) -> int:
+        """Returns the bytes an entry counts towards the bound."""
+
+        raise NotImplementedError
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,339 @@
+# Imports
+from copy import copy
+import numpy as np
+
+
+class RangeIndex:
+    """Answers min/max/mean/std queries over any index window of a data set.
+
+    The data is split into fixed-size blocks. Per-block sums and sums of
+    squares are accumulated into prefix arrays, and per-block minima and
+    maxima are arranged into sparse tables. A query over [left, right)
+    combines whole blocks in constant time and scans at most two partial
+    edge blocks, so its cost does not grow with the data length and the
+    window is never copied.
+
+    Data may be one-dimensional or a (channels, samples) array, in which
+    case every query answers for all channels at once. An index can be
+    extended as its data grows; only the blocks touched by new samples are
+    recomputed.
+
+    Blocks grow beyond BLOCK for very long data so the tables stay within
+    MAX_BLOCKS entries; memory-mapped data can then be indexed without
+    holding more than a small summary of it in RAM.
+
+    Attributes:
+        values: The indexed data. Held by reference, never copied. Sums are
+            accumulated in float64 even for float32 data.
+        block: Samples per block.
+    """
+
+    ### Constants ###
+    BLOCK = 256  # Minimum samples per block
+    MAX_BLOCKS = 1 << 16  # Block count beyond which blocks grow
+
+    def __init__(self, data, length: int = None):
+        """Indexes data once; later queries never rescan it.
+
+        Args:
+            data: The data to index.
+            length: The expected final data length, if the index will be
+                extended. Defaults to the current length.
+        """
+
+        self.values = as_float(data)
+        lead = self.values.shape[:-1]
+        self.block = RangeIndex.block_size(length or len(self))
+
+        self._offset = None  # Reference level, fixed by the first block
+        self._nblocks = 0
+        self._sum = np.zeros(lead + (1,))  # Prefix sums, with a leading zero
+        self._sq = np.zeros(lead + (1,))
+        self._min_table = []  # Level k holds the extreme of 2**k blocks
+        self._max_table = []
+        self._update(0)
+
+    def __len__(self) -> int:
+        return self.values.shape[-1]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the index's tables, not counting the indexed data."""
+
+        tables = self._min_table + self._max_table
+        return self._sum.nbytes + self._sq.nbytes + sum(t.nbytes for t in tables)
+
+    @staticmethod
+    def block_size(length: int) -> int:
+        """Returns the power-of-two block size suited to a data length."""
+
+        block = RangeIndex.BLOCK
+        while length > block * RangeIndex.MAX_BLOCKS:
+            block *= 2
+        return block
+
+    def extend(self, data):
+        """Re-points the index at a longer version of its data.
+
+        Args:
+            data: An array whose leading samples equal the current data.
+                Typically a fresh view of a growing buffer.
+        """
+
+        first = len(self) // self.block  # Last partial block is redone
+        self.values = as_float(data)
+        self._update(first)
+
+    def snapshot(self) -> "RangeIndex":
+        """Returns a copy that later extensions leave unchanged, so it can
+        be queried on another thread while this index grows.
+
+        Only the summary tables are copied. The data is shared, since a
+        growing buffer only ever writes past the snapshot's end.
+        """
+
+        snapshot = copy(self)
+        snapshot._sum = self._sum[..., :self._nblocks + 1].copy()
+        snapshot._sq = self._sq[..., :self._nblocks + 1].copy()
+        snapshot._min_table = [table.copy() for table in self._min_table]
+        snapshot._max_table = [table.copy() for table in self._max_table]
+        return snapshot
+
+    def state(self) -> dict:
+        """Returns the summary tables as arrays, so an index of unchanged
+        data can be restored by from_state() without scanning it again.
+        """
+
+        if not self._nblocks:
+            blocks = np.zeros(self.values.shape[:-1] + (0,))
+            block_min, block_max = blocks, blocks
+        else:
+            # Higher table levels are rebuilt from the block extremes
+            block_min = self._min_table[0][..., :self._nblocks]
+            block_max = self._max_table[0][..., :self._nblocks]
+
+        return {
+            'block': np.array(self.block),
+            'offset': self._offset,
+            'sum': self._sum[..., :self._nblocks + 1],
+            'sq': self._sq[..., :self._nblocks + 1],
+            'min': block_min,
+            'max': block_max,
+        }
+
+    @classmethod
+    def from_state(cls, data, state: dict) -> "RangeIndex":
+        """Restores an index of data from its state(), without a scan.
+
+        Raises:
+            ValueError: The state is of data of another length.
+        """
+
+        index = cls.__new__(cls)
+        index.values = as_float(data)
+        index.block = int(state['block'])
+        index._nblocks = state['min'].shape[-1]
+        if index._nblocks != -(-len(index) // index.block):
+            raise ValueError("Index state does not match the data length")
+
+        index._offset = np.array(state['offset'])
+        index._sum = np.array(state['sum'])
+        index._sq = np.array(state['sq'])
+        index._min_table = []
+        index._max_table = []
+        if index._nblocks:
+            index._extend_table(index._min_table, np.minimum, state['min'], 0, index._nblocks)
+            index._extend_table(index._max_table, np.maximum, state['max'], 0, index._nblocks)
+        return index
+
+    def _update(self, first: int):
+        """Recomputes every block from block index first onwards."""
+
+        n = len(self)
+        nblocks = -(-n // self.block)  # Ceiling division
+
+        if not n:
+            self._offset = np.zeros(self.values.shape[:-1])
+            return
+
+        # Shift by a reference level so sums of squares keep their precision
+        if self._offset is None or not self._nblocks:
+            self._offset = np.mean(self.values[..., :self.block], axis=-1,
+                                   dtype=np.float64)
+
+        block_sum, block_sq, block_min, block_max = self._reduce_blocks(first, nblocks)
+
+        # Prefix sums over blocks
+        self._sum = _store(self._sum, first + 1, self._sum[..., first:first+1]
+                           + np.cumsum(block_sum, axis=-1))
+        self._sq = _store(self._sq, first + 1, self._sq[..., first:first+1]
+                          + np.cumsum(block_sq, axis=-1))
+
+        # Sparse tables, redoing only entries whose span reaches a new block
+        self._extend_table(self._min_table, np.minimum, block_min, first, nblocks)
+        self._extend_table(self._max_table, np.maximum, block_max, first, nblocks)
+        self._nblocks = nblocks
+
+    def _reduce_blocks(self, first: int, nblocks: int) -> tuple:
+        """Returns sums, sums of squares, minima and maxima of blocks."""
+
+        n = len(self)
+        lead = self.values.shape[:-1]
+        count = nblocks - first
+        start = first * self.block
+
+        # Pad the ragged tail block with its own edge values
+        samples = self.values[..., start:n]
+        padding = count * self.block - samples.shape[-1]
+        if padding:
+            pad_width = [(0, 0)] * len(lead) + [(0, padding)]
+            samples = np.pad(samples, pad_width, mode='edge')
+        blocks = samples.reshape(lead + (count, self.block))
+        shifted = blocks - self._offset[..., np.newaxis, np.newaxis]
+
+        # Padded samples must not count towards the sums
+        if padding:
+            shifted = shifted.copy()
+            shifted[..., -1, self.block-padding:] = 0
+
+        return (shifted.sum(axis=-1), np.square(shifted).sum(axis=-1),
+                blocks.min(axis=-1), blocks.max(axis=-1))
+
+    def _extend_table(self, table: list, reduce, blocks, first: int, nblocks: int):
+        if not table:
+            table.append(np.zeros(blocks.shape[:-1] + (0,)))
+        table[0] = _store(table[0], first, blocks)
+
+        level = 1
+        while (1 << level) <= nblocks:
+            span = 1 << (level - 1)
+            length = nblocks - (1 << level) + 1
+            start = max(0, first - (1 << level) + 1)
+            below = table[level-1]
+            entries = reduce(below[..., start:length], below[..., start+span:length+span])
+
+            if level == len(table):
+                table.append(np.zeros(blocks.shape[:-1] + (0,)))
+            table[level] = _store(table[level], start, entries)
+            level += 1
+
+    def _shifted(self, left: int, right: int) -> np.ndarray:
+        return self.values[..., left:right] - self._offset[..., np.newaxis]
+
+    def _blocks(self, left: int, right: int) -> tuple[int, int]:
+        """Returns the range of whole blocks inside [left, right)."""
+
+        first = -(-left // self.block)
+        last = right // self.block
+        return first, max(first, last)
+
+    def _extreme(self, table: list, reduce, left: int, right: int):
+        first, last = self._blocks(left, right)
+
+        # Narrow windows are cheaper to scan directly
+        if first == last:
+            return reduce.reduce(self.values[..., left:right], axis=-1)
+
+        # Two overlapping power-of-two spans cover the whole blocks
+        level = (last - first).bit_length() - 1
+        span = 1 << level
+        result = reduce(table[level][..., first], table[level][..., last - span])
+
+        # Fold in the partial edge blocks
+        head = self.values[..., left:first * self.block]
+        tail = self.values[..., last * self.block:right]
+        for edge in (head, tail):
+            if edge.shape[-1]:
+                result = reduce(result, reduce.reduce(edge, axis=-1))
+        return result
+
+    def _sums(self, left: int, right: int) -> tuple:
+        """Returns shifted sum and sum of squares over [left, right)."""
+
+        first, last = self._blocks(left, right)
+
+        if first == last:
+            shifted = self._shifted(left, right)
+            return shifted.sum(axis=-1), np.square(shifted).sum(axis=-1)
+
+        total = self._sum[..., last] - self._sum[..., first]
+        total_sq = self._sq[..., last] - self._sq[..., first]
+
+        for edge in (self._shifted(left, first * self.block),
+                     self._shifted(last * self.block, right)):
+            total = total + edge.sum(axis=-1)
+            total_sq = total_sq + np.square(edge).sum(axis=-1)
+        return total, total_sq
+
+    def clip(self, left: int = 0, right: int = None) -> tuple[int, int]:
+        """Coerces window bounds to the indexed data."""
+
+        n = len(self)
+        right = n if right is None else int(right)
+        left = min(max(0, int(left)), n)
+        right = min(max(left, right), n)
+        return left, right
+
+    def min(self, left: int = 0, right: int = None):
+        left, right = self.clip(left, right)
+        return self._extreme(self._min_table, np.minimum, left, right)
+
+    def max(self, left: int = 0, right: int = None):
+        left, right = self.clip(left, right)
+        return self._extreme(self._max_table, np.maximum, left, right)
+
+    def sum(self, left: int = 0, right: int = None):
+        left, right = self.clip(left, right)
+        total, _ = self._sums(left, right)
+        return total + self._offset * (right - left)
+
+    def mean(self, left: int = 0, right: int = None):
+        left, right = self.clip(left, right)
+        total, _ = self._sums(left, right)
+        return self._offset + total / (right - left)
+
+    def std(self, left: int = 0, right: int = None):
+        """Population standard deviation, matching np.std."""
+
+        left, right = self.clip(left, right)
+        count = right - left
+        total, total_sq = self._sums(left, right)
+        variance = total_sq / count - np.square(total / count)
+        return np.sqrt(np.maximum(variance, 0))
+
+    def rms(self, left: int = 0, right: int = None):
+        left, right = self.clip(left, right)
+        count = right - left
+        total, total_sq = self._sums(left, right)
+        mean_sq = (total_sq + 2 * self._offset * total) / count + np.square(self._offset)
+        return np.sqrt(np.maximum(mean_sq, 0))
+
+
+def as_float(data) -> np.ndarray:
+    """Returns data as a floating-point array. Float data of any precision
+    is returned as is, without a copy.
+    """
+
+    values = np.asarray(data)
+    if not np.issubdtype(values.dtype, np.floating):
+        values = values.astype(np.float64)
+    return values
+
+
+def _store(array: np.ndarray, start: int, entries: np.ndarray) -> np.ndarray:
+    """Writes entries into array from start along the last axis.
+
+    Capacity grows geometrically, so repeated extension stays amortized
+    linear. Entries past the logical end are never read.
+    """
+
+    end = start + entries.shape[-1]
+
+    if end > array.shape[-1]:
+        capacity = max(end, 2 * array.shape[-1])
+        grown = np.zeros(array.shape[:-1] + (capacity,))
+        grown[..., :start] = array[..., :start]
+        array = grown
+
+    array[..., start:end] = entries
+    return array
@@ -0,0 +1,65 @@
+# Imports
+import tempfile
+import numpy as np
+
+
+class SampleBuffer:
+    """Growable (channels, samples) buffer for data that arrives in blocks.
+
+    Storage is preallocated and doubled when full, so appending is amortized
+    linear in the number of new samples. Views returned by values stay valid
+    until the next append that reallocates.
+
+    Buffers for data larger than RAM are kept in a temporary memory-mapped
+    file instead, like the derived channels of a chunked load.
+    """
+
+    ### Constants ###
+    CAPACITY = 1 << 16  # Initial samples per channel
+    COPY_ROWS = 1 << 20  # Samples per channel copied at a time into storage
+
+    def __init__(self, channels: int, capacity: int = CAPACITY,
+                 dtype: str = 'float64', on_disk: bool = False):
+        self.dtype = np.dtype(dtype)
+        self._on_disk = on_disk
+        self._data = self._allocate(channels, max(capacity, 1))
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def values(self) -> np.ndarray:
+        """A view of the filled part of the buffer."""
+
+        return self._data[:, :self._length]
+
+    def _allocate(self, channels: int, capacity: int) -> np.ndarray:
+        if not self._on_disk:
+            return np.empty((channels, capacity), dtype=self.dtype)
+
+        scratch = tempfile.TemporaryFile()
+        return np.memmap(scratch, mode='w+', dtype=self.dtype, shape=(channels, capacity))
+
+    def append(self, block: np.ndarray) -> np.ndarray:
+        """Appends a (channels, samples) block and returns the new values.
+
+        Large blocks, such as memory-mapped data, are copied in chunks.
+        """
+
+        end = self._length + block.shape[-1]
+
+        if end > self._data.shape[-1]:
+            capacity = max(end, 2 * self._data.shape[-1])
+            grown = self._allocate(self._data.shape[0], capacity)
+            self._copy(grown, 0, self.values)
+            self._data = grown
+
+        self._copy(self._data, self._length, block)
+        self._length = end
+        return self.values
+
+    def _copy(self, target: np.ndarray, start: int, block: np.ndarray):
+        for offset in range(0, block.shape[-1], SampleBuffer.COPY_ROWS):
+            chunk = block[:, offset:offset + SampleBuffer.COPY_ROWS]
+            target[:, start + offset:start + offset + chunk.shape[-1]] = chunk
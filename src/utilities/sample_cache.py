@@ -0,0 +1,205 @@
+# Imports
+from pathlib import Path
+import json
+import os
+import tempfile
+import numpy as np
+
+
+class SampleCache:
+    """Binary sidecar cache of the parsed samples of a single data file.
+
+    Samples are stored next to the source file as a hidden (channels, samples)
+    .npy array with a small JSON manifest. The manifest records the source
+    path, modification time, size, the KEYS header used for parsing and the
+    sample dtype; the cache is only used while all of them still match.
+    Cached samples are opened memory-mapped, so re-opening a file is nearly
+    instant and large files do not need to fit in RAM.
+
+    Files larger than RAM are written incrementally: create() returns a
+    writable memory-mapped array that is filled chunk by chunk and then
+    published with commit(), optionally along with a decimated preview and
+    named summary arrays.
+    If fewer samples were filled than allocated, commit() records how many
+    and load() returns only those.
+    """
+
+    ### Constants ###
+    PREFIX = "."  # Hide sidecar files from directory listings
+    SUFFIX = ".cache"
+
+    def __init__(self, fpath: str, keys: list, dtype: str = 'float64'):
+        self._source = Path(fpath)
+        self._keys = list(keys)
+        self._dtype = np.dtype(dtype)
+        stem = f"{SampleCache.PREFIX}{self._source.name}{SampleCache.SUFFIX}"
+        self._data_path = self._source.with_name(f"{stem}.npy")
+        self._meta_path = self._source.with_name(f"{stem}.json")
+        self._preview_path = self._source.with_name(f"{stem}.preview.npy")
+        self._summary_path = self._source.with_name(f"{stem}.summary.npz")
+        self._tmp_path = self._data_path.with_suffix(".tmp")
+        self._pending: dict = None  # Identity of the source being written
+
+    def _identity(self) -> dict:
+        """Describes the source file state that the cache must match."""
+
+        stat = self._source.stat()
+        return {
+            'path': str(self._source.resolve()),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'keys': self._keys,
+            'dtype': self._dtype.name,
+        }
+
+    def _manifest(self) -> dict | None:
+        """Returns the manifest if it matches the source, else None.
+
+        A miss records the source identity for a following store() or
+        create(). It is taken before the source is parsed, so a source that
+        grows meanwhile is not cached as unchanged.
+        """
+
+        try:
+            identity = self._identity()
+        except OSError:
+            return None
+
+        try:
+            with open(self._meta_path, 'r') as f:
+                meta = json.load(f)
+            if {key: meta.get(key) for key in identity} == identity:
+                return meta
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        self._pending = identity
+        return None
+
+    def _valid(self) -> bool:
+        return self._manifest() is not None
+
+    def load(self) -> np.ndarray | None:
+        """Returns memory-mapped cached samples, or None if stale/missing."""
+
+        meta = self._manifest()
+        if meta is None:
+            return None
+
+        try:
+            samples = np.load(self._data_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+        length = meta.get('length')
+        return samples if length is None else samples[..., :length]
+
+    def load_preview(self) -> np.ndarray | None:
+        """Returns the cached preview, or None if stale/missing."""
+
+        if not self._valid():
+            return None
+
+        try:
+            return np.load(self._preview_path)
+        except (OSError, ValueError):
+            return None
+
+    def load_summary(self) -> dict | None:
+        """Returns the cached summary arrays by name, or None if
+        stale/missing.
+        """
+
+        if not self._valid():
+            return None
+
+        try:
+            with np.load(self._summary_path) as summary:
+                return dict(summary)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, samples: np.ndarray):
+        """Writes samples to the cache. Failures leave no cache behind.
+
+        The samples are described by the identity recorded by the last
+        cache miss, taken before they were parsed.
+        """
+
+        try:
+            identity = self._pending or self._identity()
+            self._pending = None
+            self._meta_path.unlink(missing_ok=True)
+            self._summary_path.unlink(missing_ok=True)  # Describes the old samples
+            with open(self._tmp_path, 'wb') as f:
+                np.save(f, samples)
+            os.replace(self._tmp_path, self._data_path)
+            self._write_manifest(identity)
+        except OSError:
+            # Read-only or full directories simply go uncached
+            self._tmp_path.unlink(missing_ok=True)
+
+    def create(self, shape: tuple) -> np.ndarray:
+        """Returns a writable memory-mapped array to fill incrementally.
+
+        Falls back to an anonymous temporary file, which is never cached,
+        if the sidecar cannot be written. The array is described by the
+        identity recorded by a cache miss before it, if any.
+        """
+
+        try:
+            # Without a manifest the data file is ignored until committed
+            self._pending = self._pending or self._identity()
+            self._meta_path.unlink(missing_ok=True)
+            self._summary_path.unlink(missing_ok=True)  # Describes the old samples
+            return np.lib.format.open_memmap(
+                self._data_path, mode='w+', dtype=self._dtype, shape=shape
+            )
+        except OSError:
+            self._pending = None
+            scratch = tempfile.TemporaryFile()
+            return np.memmap(scratch, mode='w+', dtype=self._dtype, shape=shape)
+
+    def commit(self, samples: np.memmap, preview: np.ndarray = None,
+               length: int = None, summary: dict = None):
+        """Publishes an array filled after create().
+
+        Args:
+            samples: The array returned by create().
+            preview: An optional decimated preview to cache alongside.
+            length: The number of samples filled, if fewer than allocated.
+            summary: Optional named arrays to cache alongside.
+        """
+
+        samples.flush()
+
+        if self._pending is None:
+            return  # Scratch storage; nothing to publish
+
+        manifest = dict(self._pending)
+        if length is not None:
+            manifest['length'] = length
+
+        try:
+            if preview is not None:
+                np.save(self._preview_path, preview)
+            if summary is not None:
+                np.savez(self._summary_path, **summary)
+            self._write_manifest(manifest)
+        except OSError:
+            pass  # Samples stay usable; they just will not be reused
+
+        self._pending = None
+
+    def clear(self):
+        """Deletes the cache files, so the next load parses the source."""
+
+        # Manifest first, so a partial delete never leaves a valid cache
+        for path in (self._meta_path, self._data_path, self._preview_path,
+                     self._summary_path):
+            path.unlink(missing_ok=True)
+
+    def _write_manifest(self, identity: dict):
+        # Manifest is written last so it only ever describes complete data
+        with open(self._meta_path, 'w') as f:
+            json.dump(identity, f)
@@ -0,0 +1,96 @@
+# Imports
+from threading import Lock
+import numpy as np
+from utilities.lru_cache import LRUCache
+
+
+class SampleStore(LRUCache):
+    """Least-recently-used store of loaded files, shared by every view.
+
+    Entries are the indexed samples, plot pyramids and spectra of one file,
+    keyed by its identity (path, modification time and size), so a file is
+    loaded and indexed once however many views show it. The oldest entries
+    are evicted once the resident size of all entries exceeds the byte
+    bound. Memory-mapped samples are paged by the operating system and are
+    not counted; their in-RAM summaries are.
+
+    Views keep their own references to the entries they show, so eviction
+    only drops entries that nothing displays.
+
+    Loads go through get_or_load(), so a file requested by several threads
+    at once, such as by a prefetch and then by the view, is loaded once.
+
+    Safe to use from several threads at once.
+    """
+
+    ### Constants ###
+    MAX_BYTES = 1024**3
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        super().__init__(max_bytes)
+        self._loading = {}  # Maps key to the lock held while it loads
+
+    def put(self, key, entry: dict):
+        """Stores an entry with 'indices' (RangeIndex per channel group)
+        and 'plots' (EnvelopePyramid per channel), and optionally 'spectra'
+        (SegmentSpectrum per channel group) and 'events' (an EventIndex).
+        """
+
+        super().put(key, entry)
+
+    def _size(self, key, entry: dict) -> int:
+        return _estimate(entry)
+
+    def get_or_load(self, key, load) -> dict:
+        """Returns the entry under key, storing load() there first if there
+        is none.
+
+        A call for a key that another thread is loading waits for that load
+        and returns its entry instead of loading again.
+        """
+
+        with self._lock:
+            loading = self._loading.setdefault(key, Lock())
+
+        try:
+            with loading:
+                entry = self.get(key)
+                if entry is None:
+                    entry = load()
+                    self.put(key, entry)
+        finally:
+            with self._lock:
+                if self._loading.get(key) is loading:
+                    del self._loading[key]
+
+        return entry
+
+
+def _estimate(entry: dict) -> int:
+    """Returns the resident size of a store entry's samples and summaries."""
+
+    size = 0
+    for index in entry['indices']:
+        size += _resident(index.values) + index.nbytes
+    for plot in entry['plots']:
+        size += plot.nbytes  # Rows of the indexed samples; not counted twice
+    for spectrum in entry.get('spectra') or ():
+        if spectrum is not None:
+            size += spectrum.nbytes  # Filled on demand, so counted at its bound
+    if entry.get('events') is not None:
+        size += entry['events'].nbytes
+    return size
+
+def _resident(array: np.ndarray) -> int:
+    """Returns the bytes of an array held in RAM, or 0 if it is a view of a
+    memory map.
+    """
+
+    base = array
+    while isinstance(base, np.ndarray):
+        if isinstance(base, np.memmap):
+            return 0
+        base = base.base
+
+    # Anything else at the root is a mapped file's buffer
+    return array.nbytes if base is None else 0
@@ -0,0 +1,164 @@
+# Imports
+from collections import OrderedDict
+from threading import Lock
+import numpy as np
+from utilities.range_index import as_float
+
+
+class SegmentSpectrum:
+    """Welch-style power spectrum estimator over fixed, aligned segments.
+
+    The data is divided into equal segments at fixed positions. Segments
+    hold at least SEGMENT samples, and more at high sample rates so the
+    frequency resolution stays near RESOLUTION, up to MAX_SEGMENT samples
+    and the size at which the spectra of MAX_SEGMENTS segments still fit
+    in the cache.
+    Each segment is mean-removed, Hann-windowed and zero-padded to a fast FFT
+    length. Its power spectrum is cached, so any window that covers the same
+    segments, such as a zoom or pan of the view, reuses them instead of
+    transforming again. Windows covering more than MAX_SEGMENTS segments
+    average an evenly spaced subset of them, which bounds the cost of any
+    single estimate. The cache is bounded to CACHE_BYTES.
+
+    Data may be one-dimensional or a (channels, samples) array, in which
+    case every channel is transformed at once.
+
+    Safe to use from several threads at once.
+    """
+
+    ### Constants ###
+    SEGMENT = 4096  # Minimum samples per segment
+    MAX_SEGMENT = 1 << 20
+    RESOLUTION = 1.0  # Hz
+    MAX_SEGMENTS = 64  # Segments averaged per estimate
+    CACHE_BYTES = 64 * 1024**2  # Segment spectra kept in memory
+
+    def __init__(self, data, fs: float, segment: int = None):
+        from scipy.fft import next_fast_len  # Deferred; scipy is slow to import
+
+        self.values = as_float(data)
+        self.fs = fs
+        channels = int(np.prod(self.values.shape[:-1]))
+        self.segment = segment or SegmentSpectrum.segment_size(fs, channels)
+        self._nfft = next_fast_len(self.segment, real=True)
+        self._window = np.hanning(self.segment)
+        self._cache = OrderedDict()  # Maps segment number to its power
+        bins = self.values.shape[:-1] + (self._nfft // 2 + 1,)
+        self._power_bytes = 8 * max(1, int(np.prod(bins)))
+        self._capacity = max(1, SegmentSpectrum.CACHE_BYTES // self._power_bytes)
+        self._lock = Lock()
+
+    @staticmethod
+    def segment_size(fs: float, channels: int = 1) -> int:
+        """Returns the power-of-two segment size suited to a sample rate.
+
+        Segments stay small enough that the spectra of a full estimate,
+        MAX_SEGMENTS of them for all channels, fit in CACHE_BYTES.
+        """
+
+        segment = SegmentSpectrum.SEGMENT
+        while fs / segment > SegmentSpectrum.RESOLUTION and \
+                segment < SegmentSpectrum.MAX_SEGMENT and \
+                SegmentSpectrum.cache_bytes(2 * segment, channels) <= SegmentSpectrum.CACHE_BYTES:
+            segment *= 2
+        return segment
+
+    @staticmethod
+    def cache_bytes(segment: int, channels: int = 1) -> int:
+        """Returns the bytes of MAX_SEGMENTS power-of-two segment spectra."""
+
+        bins = channels * (segment // 2 + 1)
+        return SegmentSpectrum.MAX_SEGMENTS * 8 * bins
+
+    def __len__(self) -> int:
+        return self.values.shape[-1]
+
+    @property
+    def nbytes(self) -> int:
+        """The most the cached spectra of the current data can occupy."""
+
+        segments = len(self) // self.segment
+        return min(segments, self._capacity) * self._power_bytes
+
+    def extend(self, data):
+        """Re-points the estimator at a longer version of its data.
+
+        Only whole segments are ever transformed, so every cached spectrum
+        stays valid.
+
+        Args:
+            data: An array whose leading samples equal the current data.
+        """
+
+        self.values = as_float(data)
+
+    def covers(self, left: int, right: int) -> bool:
+        """Returns True if [left, right) holds at least two whole segments."""
+
+        first, last = self._segments(left, right)
+        return last - first >= 2
+
+    def _segments(self, left: int, right: int) -> tuple[int, int]:
+        first = -(-left // self.segment)  # Ceiling division
+        last = right // self.segment
+        return first, max(first, last)
+
+    def _power(self, number: int) -> np.ndarray:
+        with self._lock:
+            power = self._cache.get(number)
+            if power is not None:
+                self._cache.move_to_end(number)
+                return power
+
+        start = number * self.segment
+        samples = self.values[..., start:start + self.segment]
+        mean = samples.mean(axis=-1, keepdims=True, dtype=np.float64)
+        samples = (samples - mean) * self._window
+        from scipy.fft import rfft
+        power = np.square(np.abs(rfft(samples, n=self._nfft, axis=-1)))
+
+        with self._lock:
+            self._cache[number] = power
+            if len(self._cache) > self._capacity:
+                self._cache.popitem(last=False)  # Evict least recently used
+
+        return power
+
+    def density(self, left: int, right: int) -> tuple[np.ndarray, np.ndarray]:
+        """Returns frequencies and averaged power over the whole segments of
+        [left, right).
+        """
+
+        first, last = self._segments(left, right)
+        numbers = np.arange(first, last)
+
+        if len(numbers) > SegmentSpectrum.MAX_SEGMENTS:
+            picks = np.linspace(0, len(numbers) - 1, SegmentSpectrum.MAX_SEGMENTS)
+            numbers = numbers[picks.round().astype(int)]
+
+        power = np.zeros(self.values.shape[:-1] + (self._nfft // 2 + 1,))
+        for number in numbers:
+            power += self._power(int(number))
+
+        from scipy.fft import rfftfreq
+        freqs = rfftfreq(self._nfft, d=1/self.fs)
+        return freqs, power / max(len(numbers), 1)
+
+    def dominant(self, left: int, right: int):
+        """Returns the frequency of the strongest spectral peak in [left, right)."""
+
+        return peak_frequency(*self.density(left, right))
+
+
+def peak_frequency(freqs: np.ndarray, power: np.ndarray):
+    """Returns the frequency of the strongest local maximum of power along
+    its last axis, or 0 where there is none.
+    """
+
+    if power.shape[-1] < 3:
+        return np.zeros(power.shape[:-1])[()]
+
+    inner = power[..., 1:-1]
+    peaks = (inner > power[..., :-2]) & (inner >= power[..., 2:])
+    strongest = np.argmax(np.where(peaks, inner, -np.inf), axis=-1)
+    return np.where(peaks.any(axis=-1), freqs[1:-1][strongest], 0.0)[()]
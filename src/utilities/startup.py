@@ -0,0 +1,89 @@
+# Imports
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from utilities.tracer import tracer
+
+
+class StartupTimer:
+    """Times the milestones of application startup.
+
+    Times are measured from the timer's creation, which app.py does before
+    importing anything else, so they exclude only interpreter startup and,
+    for bundled builds, unpacking. Each milestone is also recorded as a
+    tracer span from the milestone before it.
+
+    The report is off unless the REPORT_ENV environment variable is set. It
+    is printed to standard error when finish() is called, or written as
+    JSON if the value ends in '.json'.
+
+    Attributes:
+        enabled: Whether the report is written on finish().
+        report_path: Where the JSON report is written, if anywhere.
+    """
+
+    ### Constants ###
+    REPORT_ENV = "ANALYZER_STARTUP"
+
+    def __init__(self, enabled: bool = False, report_path: str = None):
+        self.enabled = enabled
+        self.report_path = report_path
+        self._origin = time.perf_counter_ns()
+        self._marks = []  # (milestone, perf_counter_ns) in order
+        self._finished = False
+
+    @staticmethod
+    def from_environment() -> "StartupTimer":
+        value = os.environ.get(StartupTimer.REPORT_ENV, "")
+        report_path = value if value.lower().endswith(".json") else None
+        return StartupTimer(enabled=bool(value), report_path=report_path)
+
+    def mark(self, milestone: str):
+        """Records that a milestone was just reached."""
+
+        if self._finished:
+            return
+
+        now = time.perf_counter_ns()
+        previous = self._marks[-1][1] if self._marks else self._origin
+        self._marks.append((milestone, now))
+        tracer.record(f"startup.{milestone}", previous, now)
+
+    def milestones(self) -> dict[str, float]:
+        """Returns the milliseconds from startup to each milestone."""
+
+        return {
+            milestone: (ns - self._origin) / 1e6 for milestone, ns in self._marks
+        }
+
+    def finish(self):
+        """Marks startup as complete and writes the report, once."""
+
+        if self._finished:
+            return
+
+        self.mark("ready")
+        self._finished = True
+
+        if not self.enabled:
+            return
+
+        if self.report_path:
+            fpath = Path(self.report_path)
+            partial = fpath.with_name(f".{fpath.name}.tmp")
+            partial.write_text(json.dumps(self.milestones(), indent=2))
+            os.replace(partial, fpath)  # Readers never see a partial report
+            return
+
+        previous = 0.0
+        print("Startup:", file=sys.stderr)
+        for milestone, ms in self.milestones().items():
+            print(f"  {milestone:<12} {ms:8.1f} ms  (+{ms - previous:.1f})",
+                  file=sys.stderr)
+            previous = ms
+
+
+# Created on first import, which app.py does first
+startup = StartupTimer.from_environment()
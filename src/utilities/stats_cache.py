@@ -0,0 +1,45 @@
+# Imports
+import sys
+from utilities.lru_cache import LRUCache
+
+
+class StatsCache(LRUCache):
+    """Least-recently-used cache of computed statistics.
+
+    Entries are lists of statistic dictionaries, keyed by whatever uniquely
+    identifies the data and window they describe. The oldest entries are
+    evicted once the estimated size of all entries exceeds the byte bound.
+    Entries larger than the bound are not cached at all.
+
+    Safe to use from several threads at once.
+    """
+
+    ### Constants ###
+    MAX_BYTES = 16 * 1024**2
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        super().__init__(max_bytes)
+
+    def put(self, key, stats: list[dict]):
+        size = self._size(key, stats)
+
+        if size > self.max_bytes:
+            return  # Would evict everything else
+
+        self._store(key, stats, size)
+
+    def _size(self, key, stats: list[dict]) -> int:
+        return _estimate(key) + _estimate(stats)
+
+
+def _estimate(value) -> int:
+    """Returns the approximate memory footprint of nested containers."""
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        size += sum(_estimate(k) + _estimate(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_estimate(item) for item in value)
+
+    return size
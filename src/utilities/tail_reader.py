@@ -0,0 +1,134 @@
+# Imports
+from io import BytesIO
+from pathlib import Path
+import csv
+import numpy as np
+
+
+class TailReader:
+    """Follows a CSV file that is still being written.
+
+    Each read parses only the bytes appended since the previous read. A
+    trailing line without its newline is held back until it is complete.
+    Rows that were already loaded some other way can be skipped first with
+    seek(), so following a file never re-parses it.
+    """
+
+    ### Constants ###
+    SCAN_BYTES = 1 << 22  # Bytes read at a time while seeking
+    WHITESPACE = np.frombuffer(b' \t\r\n', dtype=np.uint8)  # Of blank lines
+
+    def __init__(self, fpath: str, keys: list, dtype: str = 'float64'):
+        self._path = Path(fpath)
+        self._keys = list(keys)
+        self._dtype = np.dtype(dtype)
+        self._offset = 0  # Bytes consumed so far
+        self._partial = b''  # Incomplete last line
+        self._columns = None  # Positions of keys, known once the header is read
+
+    def seek(self, rows: int) -> int:
+        """Skips the header and up to rows complete data rows, so that reads
+        start after them. Blank lines are skipped without counting, as the
+        loaders skip them.
+
+        Returns:
+            The number of rows skipped, fewer than rows if the file does
+            not hold that many complete ones yet.
+
+        Raises:
+            ValueError: The header lacks a key.
+        """
+
+        skipped = 0
+        with open(self._path, 'rb') as f:
+            f.seek(self._offset)
+            while skipped < rows and (block := f.read(TailReader.SCAN_BYTES)):
+                self._offset += len(block)
+                data = self._partial + block
+                start = 0
+
+                # Metadata and header lines come first, and are few
+                while self._columns is None:
+                    end = data.find(b'\n', start) + 1
+                    if not end:
+                        break  # Incomplete line; wait for the next block
+                    self._read_header(data[start:end])
+                    start = end
+
+                if self._columns is not None:
+                    count, start = self._skip_rows(data, start, rows - skipped)
+                    skipped += count
+
+                self._partial = data[start:]  # Parsed by the next read
+
+        return skipped
+
+    def _skip_rows(self, data: bytes, start: int, rows: int) -> tuple[int, int]:
+        """Returns how many of up to rows complete, non-blank lines follow
+        start in data, and the position after the last of them.
+        """
+
+        text = np.frombuffer(data, dtype=np.uint8)[start:]
+        ends = np.flatnonzero(text == ord('\n')) + 1
+        if not len(ends):
+            return 0, start
+
+        # A line is blank if no visible byte precedes its end since the last
+        visible = np.cumsum(~np.isin(text, TailReader.WHITESPACE), dtype=np.int32)
+        seen = visible[ends - 1]
+        counted = np.cumsum(np.diff(seen, prepend=0) > 0)
+
+        if counted[-1] < rows:
+            return int(counted[-1]), start + int(ends[-1])
+
+        last = int(np.searchsorted(counted, rows))
+        return rows, start + int(ends[last])
+
+    def read(self) -> np.ndarray:
+        """Returns new rows as a (channels, samples) array.
+
+        Raises:
+            ValueError: The header lacks a key.
+        """
+
+        with open(self._path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        self._offset += len(chunk)
+
+        # Keep only complete lines
+        data = self._partial + chunk
+        cut = data.rfind(b'\n') + 1
+        self._partial = data[cut:]
+        data = data[:cut]
+
+        # Skip metadata lines, then locate the keys in the header
+        while self._columns is None and data:
+            line, _, data = data.partition(b'\n')
+            self._read_header(line)
+
+        if not data.strip():
+            return np.empty((len(self._keys), 0), dtype=self._dtype)
+
+        from pandas import read_csv  # Slow to import; only needed when live
+
+        dataframe = read_csv(
+            filepath_or_buffer = BytesIO(data),
+            header = None,
+            usecols = self._columns,
+            delimiter = ',',
+            dtype = self._dtype,
+        )
+        return np.ascontiguousarray(dataframe[self._columns].to_numpy().T)
+
+    def _read_header(self, line: bytes):
+        """Locates the keys if line is the header; metadata lines are skipped."""
+
+        if line.startswith(b'#'):
+            return
+
+        names = next(csv.reader([line.decode(errors='replace').rstrip('\r\n')]), [])
+        missing = [key for key in self._keys if key not in names]
+        if missing:
+            raise ValueError(f"{self._path} is missing columns: {', '.join(missing)}")
+        self._columns = [names.index(key) for key in self._keys]
@@ -0,0 +1,34 @@
+# Imports
+import numpy as np
+
+
+class TimeAxis:
+    """Implicit time axis of uniformly sampled data.
+
+    Sample i was taken at start + i / fs. Times are computed only for the
+    indices asked for, so no per-sample timestamp array is ever held.
+
+    Attributes:
+        fs: Sample rate in Hz.
+        start: Time of the first sample in seconds.
+    """
+
+    ### Constants ###
+    DEFAULT_RATE = 1000  # Hz, assumed when a file does not state its rate
+
+    def __init__(self, fs: float = DEFAULT_RATE, start: float = 0.0):
+        self.fs = float(fs)
+        self.start = float(start)
+
+    def __repr__(self) -> str:
+        return f"TimeAxis(fs={self.fs:g}, start={self.start:g})"
+
+    def time(self, index):
+        """Returns the time of a sample index or array of indices."""
+
+        return self.start + np.asarray(index) / self.fs
+
+    def index(self, time):
+        """Returns the fractional sample index of a time."""
+
+        return (np.asarray(time) - self.start) * self.fs
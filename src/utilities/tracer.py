@@ -0,0 +1,170 @@
+# Imports
+from collections import deque
+from functools import wraps
+from threading import Lock, current_thread
+import json
+import os
+import time
+
+
+class Tracer:
+    """Opt-in timing of named processing stages.
+
+    Stages are timed as spans, either with the span() context manager or
+    by decorating a function with traced(). Completed spans are kept in a
+    bounded buffer for export as a Chrome trace (chrome://tracing or
+    Perfetto), and per-stage latencies are kept for a live overlay.
+
+    Tracing is off unless the TRACE_ENV environment variable is set. A
+    value ending in '.json' also names the file the trace is written to on
+    exit. While off, a traced call costs one attribute check.
+
+    Safe to use from several threads at once.
+
+    Attributes:
+        enabled: Whether spans are recorded.
+        export_path: Where the trace is written on exit, if anywhere.
+    """
+
+    ### Constants ###
+    TRACE_ENV = "ANALYZER_TRACE"
+    MAX_SPANS = 200_000  # Oldest spans are dropped beyond this
+    SMOOTHING = 0.2  # Weight of the newest duration in a stage's average
+
+    def __init__(self, enabled: bool = False, export_path: str = None):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._origin = time.perf_counter_ns()
+        self._spans = deque(maxlen=Tracer.MAX_SPANS)
+        self._latencies = {}  # Maps stage name to [last ms, average ms, count]
+        self._threads = {}  # Maps thread ident to name
+        self._lock = Lock()
+
+    @staticmethod
+    def from_environment() -> "Tracer":
+        value = os.environ.get(Tracer.TRACE_ENV, "")
+        export_path = value if value.lower().endswith(".json") else None
+        return Tracer(enabled=bool(value), export_path=export_path)
+
+    def span(self, name: str, **args) -> "Span":
+        """Returns a context manager that times the enclosed block.
+
+        Keyword arguments are attached to the span in the exported trace.
+        """
+
+        return Span(self, name, args)
+
+    def record(self, name: str, start_ns: int, end_ns: int, args: dict = None):
+        """Records a completed span of perf_counter_ns times."""
+
+        if not self.enabled:
+            return
+
+        thread = current_thread()
+        duration = (end_ns - start_ns) / 1e6
+
+        with self._lock:
+            self._spans.append((name, thread.ident, start_ns, end_ns, args))
+            self._threads.setdefault(thread.ident, thread.name)
+
+            latency = self._latencies.get(name)
+            if latency is None:
+                self._latencies[name] = [duration, duration, 1]
+            else:
+                latency[0] = duration
+                latency[1] += Tracer.SMOOTHING * (duration - latency[1])
+                latency[2] += 1
+
+    def latencies(self) -> dict[str, tuple[float, float, int]]:
+        """Returns the last and average duration in milliseconds, and the
+        count, of every stage seen so far.
+        """
+
+        with self._lock:
+            return {name: tuple(latency) for name, latency in self._latencies.items()}
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._latencies.clear()
+
+    def export(self, fpath: str):
+        """Writes the recorded spans as a Chrome trace event file."""
+
+        with self._lock:
+            spans = list(self._spans)
+            threads = dict(self._threads)
+
+        pid = os.getpid()
+        events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+             'args': {'name': name}}
+            for tid, name in threads.items()
+        ]
+        for name, tid, start_ns, end_ns, args in spans:
+            event = {
+                'name': name,
+                'cat': name.split('.')[0],
+                'ph': 'X',  # Complete event
+                'pid': pid,
+                'tid': tid,
+                'ts': (start_ns - self._origin) / 1e3,  # Microseconds
+                'dur': (end_ns - start_ns) / 1e3,
+            }
+            if args:
+                event['args'] = args
+            events.append(event)
+
+        with open(fpath, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+class Span:
+    """Times one block of code for a Tracer."""
+
+    __slots__ = ('_tracer', '_name', '_args', '_start')
+
+    def __init__(self, tracer: Tracer, name: str, args: dict):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._start = 0
+
+    def __enter__(self):
+        if self._tracer.enabled:
+            self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if self._tracer.enabled and self._start:
+            self._tracer.record(self._name, self._start, time.perf_counter_ns(),
+                                self._args)
+        return False
+
+
+# Shared by the whole application
+tracer = Tracer.from_environment()
+
+
+def traced(name: str = None):
+    """Decorates a function so every call is timed as a span.
+
+    Args:
+        name: The stage name. Defaults to the function's qualified name.
+    """
+
+    def decorate(fn):
+        stage = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.record(stage, start, time.perf_counter_ns())
+        return wrapper
+    return decorate
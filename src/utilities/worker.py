@@ -0,0 +1,164 @@
+# Imports
+import logging
+import time
+from utilities.tracer import tracer
+# Qt
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+class WorkerSignals(QObject):
+    """Delivers worker results back to the thread that owns this object."""
+
+    ### Signals ###
+    finished = Signal(object)  # Emits the job's return value
+    failed = Signal(object)  # Emits the exception raised by the job
+    progress = Signal(object)  # Emits partial results reported by the job
+    done = Signal()  # Emits once the worker exits, cancelled or not
+
+
+class Worker(QRunnable):
+    """Runs a single function call on a thread pool.
+
+    Cancellation is cooperative: a cancelled worker that has not started is
+    skipped, and one that is already running has its result discarded.
+
+    When tracing, the time a job spends queued and running is recorded as
+    spans under the worker's name.
+
+    Attributes:
+        signals: A WorkerSignals object for result delivery.
+        name: A label for the job in traces.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.cancelled = False
+        self.name = getattr(fn, '__qualname__', 'job')
+        self.queued_ns = time.perf_counter_ns()
+        self.finished_ns = 0
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self.setAutoDelete(False)  # Lifetime is managed from Python
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report(self, partial) -> bool:
+        """Emits a partial result. Returns False once the job is cancelled,
+        so long-running jobs can stop early.
+        """
+
+        if self.cancelled:
+            return False
+
+        self.signals.progress.emit(partial)
+        return True
+
+    def run(self):
+        started = time.perf_counter_ns()
+        tracer.record(f"{self.name}.queued", self.queued_ns, started)
+
+        try:
+            if self.cancelled:
+                return
+            result = self._fn(*self._args, **self._kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(e)
+        else:
+            if not self.cancelled:
+                self.finished_ns = time.perf_counter_ns()
+                tracer.record(f"{self.name}.ran", started, self.finished_ns)
+                self.signals.finished.emit(result)
+        finally:
+            self.signals.done.emit()
+
+
+class TaskRunner(QObject):
+    """Schedules background jobs so only the latest job per key is applied.
+
+    Submitting a job under a key cancels any job still pending under the
+    same key. Results are delivered on the GUI thread through the given
+    callback, and only if the job is still the latest for its key. So are
+    failures, to an error callback if one is given, or else to the log.
+    """
+
+    def __init__(self, pool: QThreadPool = None):
+        super().__init__()
+        self._pool = pool or QThreadPool.globalInstance()
+        self._latest = {}  # Maps key to its most recently submitted worker
+        self._active = set()  # Keeps workers alive until they exit
+
+    def submit(self, key, callback, fn, *args, progress=None, error=None,
+               **kwargs) -> Worker:
+        """Runs fn(*args, **kwargs) in the background, then callback(result).
+
+        If a progress callback is given, fn is also passed a 'report' keyword
+        argument (see Worker.report) whose partial results reach progress.
+        If fn raises, error(exception) is called instead of callback.
+        """
+
+        self.cancel(key)
+
+        worker = Worker(fn, *args, **kwargs)
+        worker.name = str(key)
+        if progress is not None:
+            worker._kwargs['report'] = worker.report
+            worker.signals.progress.connect(
+                lambda partial: self._progress(key, worker, progress, partial)
+            )
+        worker.signals.finished.connect(
+            lambda result: self._deliver(key, worker, callback, result)
+        )
+        worker.signals.failed.connect(
+            lambda exception: self._discard(key, worker, error, exception)
+        )
+        worker.signals.done.connect(lambda: self._active.discard(worker))
+
+        self._active.add(worker)
+        self._latest[key] = worker
+        self._pool.start(worker)
+        return worker
+
+    def pending(self, key) -> bool:
+        """Returns True if a job under key has not delivered yet."""
+
+        return key in self._latest
+
+    def cancel(self, key):
+        """Cancels the pending job under key, if any."""
+
+        worker = self._latest.pop(key, None)
+
+        if worker is not None:
+            worker.cancel()
+
+            # Drop it outright if it has not started yet
+            if self._pool.tryTake(worker):
+                self._active.discard(worker)
+
+    def _progress(self, key, worker: Worker, progress, partial):
+        if self._latest.get(key) is worker:
+            progress(partial)
+
+    def _deliver(self, key, worker: Worker, callback, result):
+        if self._latest.get(key) is worker:
+            del self._latest[key]
+
+            # Time from the worker's result to the GUI thread picking it up
+            tracer.record(f"{worker.name}.handoff", worker.finished_ns,
+                          time.perf_counter_ns())
+            with tracer.span(f"{worker.name}.delivered"):
+                callback(result)
+
+    def _discard(self, key, worker: Worker, error, exception: Exception):
+        if self._latest.get(key) is worker:
+            del self._latest[key]
+
+            if error is not None:
+                error(exception)
+            else:
+                logger.error("Background job %r failed", key, exc_info=exception)
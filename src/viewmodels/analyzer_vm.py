@@ -1,106 +1,815 @@
 # Imports
 from pathlib import Path
+import numpy as np
 from utilities.data_loader import DataLoader
+from utilities.chunked_loader import ChunkedLoader
+from utilities import columnar
 from viewmodels.data_vm import DataViewModel
-from models.stats_model import StatsModel
+from models.stats_model import StatsModel, RunningStats
+from models.power_model import PowerModel
+from models.event_model import EventDetector, EventIndex
+from models.event_list_model import EventListModel
+from utilities.range_index import RangeIndex
+from utilities.envelope import EnvelopePyramid
+from utilities.spectrum import SegmentSpectrum
+from utilities.sample_store import SampleStore
+from utilities.stats_cache import StatsCache
+from utilities.time_axis import TimeAxis
+from utilities.sample_buffer import SampleBuffer
+from utilities.tail_reader import TailReader
+from utilities.tracer import traced
+from utilities.worker import TaskRunner
 from views.report_dialog import ReportDialog
+from views.report_renderer import ReportRenderer
 # Qt
-from PySide6.QtCore import QObject, Signal
-from PySide6.QtWidgets import QWidget, QPushButton
+from PySide6.QtCore import QObject, QThreadPool, QTimer, Signal
+from PySide6.QtWidgets import QWidget, QPushButton, QLineEdit, QListView
 
 
 class AnalyzerViewModel(QObject):
-    """Dispatches model values to multiple data view-model instances."""
+    """Dispatches model values to multiple data view-model instances.
+
+    There is one data view-model per KEYS column, followed by one per
+    derived power channel. Their plots share an x-range, so the stats of
+    every channel are computed together, one vectorized pass per channel
+    group.
+
+    Loads, stats, events and reports run on background threads. A new
+    request supersedes any pending job of the same kind, so only the latest
+    request's results ever reach the views.
+
+    Attributes:
+        stats_cache: Computed stats, keyed by file and window.
+        sample_store: Loaded files, keyed by file identity.
+    """
+
+    ### Constants ###
+    LIVE_MS = 500  # Polling interval for live files
+    PREFETCH_WORKERS = 1  # Never more than one speculative load at a time
+    EVENT_MARGIN = 2  # Event durations shown either side of an event's peak
+    EVENT_MIN_SAMPLES = 100  # Samples shown either side of an event's peak, at least
+
 
     ### Signals ###
-    voltagePlotChanged = Signal(list)  # Emits new voltage data
-    voltageStatsChanged = Signal(list)  # Emits new voltage stats
-    currentPlotChanged = Signal(list)  # Emits new current data
-    currentStatsChanged = Signal(list)  # Emits new current stats
+    plotChanged = Signal(int, object, object)  # Emits channel, new plot data and time axis
+    plotExtended = Signal(int, object)  # Emits channel and grown plot data
+    statsChanged = Signal(int, list)  # Emits channel and new stats
+    overlayAdded = Signal(int, object, object, str)  # Emits channel, plot data, time axis and name
+    overlayStatsChanged = Signal(int, int, list)  # Emits channel, overlay and new stats
+    overlaysCleared = Signal()
 
 
     ### Constructors ###
-    def __init__(self, button: QPushButton, voltage: QWidget, current: QWidget):
+    def __init__(self, button: QPushButton, live_button: QPushButton,
+                 compare_button: QPushButton, blocks: list[QWidget],
+                 description: QLineEdit = None, events: QListView = None):
         super().__init__()
         self._button = button
-        self._voltage_vm: DataViewModel = voltage.viewmodel
-        self._current_vm: DataViewModel = current.viewmodel
+        self._description = description
+        self._events = events
+        self._live_button = live_button
+        self._compare_button = compare_button
+        self._data_vms: list[DataViewModel] = [block.viewmodel for block in blocks]
         self._data_loader = DataLoader()
+        self._chunked_loader = ChunkedLoader()
+        self._runner = TaskRunner()
+        prefetch_pool = QThreadPool(self)
+        prefetch_pool.setMaxThreadCount(AnalyzerViewModel.PREFETCH_WORKERS)
+        self._prefetcher = TaskRunner(prefetch_pool)
+        self._neighbors: list[Path] = []  # Files to prefetch once the view is idle
         self._dir: Path = ''
+        self._fpath: Path = None
+        self._power = PowerModel(DataLoader.UNITS)
+        self._units = [DataLoader.UNITS, self._power.units]  # Per channel group
+        self._indices: list[RangeIndex]  # One per group: measured, derived
+        self._spectra: list[SegmentSpectrum] = [None, None]
+        self._plots: list[EnvelopePyramid]
+        self._time_axis = TimeAxis()  # Shared by all channels of a file
+        self._file_id: tuple = None  # (path, mtime, size); None for live data
+        self._window: tuple = (0, None)  # Last stats window of the plotted file
+        self._overlays: list[dict] = []  # Overlaid store entries, in order
+        self._detector = EventDetector()
+        self.event_list = EventListModel(self.channels())
+        self.stats_cache = StatsCache()
+        self.sample_store = SampleStore()
+        self._live: dict = None  # Live session state; None when not following
+        self._live_timer = QTimer(self)
+        self._live_timer.setInterval(AnalyzerViewModel.LIVE_MS)
         self._init_views()
 
         # Set signal/slot connections
         self._button.clicked.connect(self._save_img)
-        self.voltagePlotChanged.connect(self._voltage_vm.update_graph)
-        self.voltageStatsChanged.connect(self._voltage_vm.update_stats)
-        self.currentPlotChanged.connect(self._current_vm.update_graph)
-        self.currentStatsChanged.connect(self._current_vm.update_stats)
-        self._voltage_vm.dataSlice.connect(self.update_voltage_stats)
-        self._current_vm.dataSlice.connect(self.update_current_stats)
+        self._live_button.toggled.connect(self._toggle_live)
+        self._compare_button.toggled.connect(self._toggle_compare)
+        self._live_timer.timeout.connect(self._poll_live)
+        self.plotChanged.connect(
+            lambda channel, data, axis: self._data_vms[channel].update_graph(data, axis)
+        )
+        self.plotExtended.connect(
+            lambda channel, data: self._data_vms[channel].extend_graph(data)
+        )
+        self.statsChanged.connect(
+            lambda channel, stats: self._data_vms[channel].update_stats(stats)
+        )
+        self.overlayAdded.connect(
+            lambda channel, data, axis, name:
+                self._data_vms[channel].add_overlay(data, axis, name)
+        )
+        self.overlayStatsChanged.connect(
+            lambda channel, overlay, stats:
+                self._data_vms[channel].update_stats(stats, overlay)
+        )
+        self.overlaysCleared.connect(
+            lambda: [data_vm.clear_overlays() for data_vm in self._data_vms]
+        )
+        if self._events is not None:
+            self._events.setModel(self.event_list)
+            self._events.selectionModel().currentChanged.connect(
+                lambda current, _: self.jump_to_event(current.row())
+            )
+
+        # Linked plots share one window; the first one speaks for all
+        leader = self._data_vms[0]
+        for data_vm in self._data_vms[1:]:
+            data_vm.link_range(leader)
+        leader.dataRange.connect(self.update_stats)
+        leader.dataSettled.connect(self.settle_stats)
+
+    @staticmethod
+    def channels() -> list[tuple[str, str]]:
+        """Returns the name and unit of every data channel, in KEYS order."""
+
+        DataLoader()  # Reads KEYS on first use
+        power = PowerModel(DataLoader.UNITS)
+        return list(zip(DataLoader.KEYS + power.names, DataLoader.UNITS + power.units))
 
     def _init_views(self):
-        default_data = [0,1]
-        voltage_stats = StatsModel(default_data, "V").stats
-        current_stats = StatsModel(default_data, "A").stats
+        default_data = np.array([0,1], dtype=np.float64)
+        self._indices = [
+            RangeIndex(np.tile(default_data, (len(units), 1))) for units in self._units
+        ]
+        stats = self._window_stats(None, self._indices, self._spectra,
+                                   self._time_axis.fs, 0, None)
 
-        self._voltage_vm.init_views(default_data, voltage_stats)
-        self._current_vm.init_views(default_data, current_stats)
+        for data_vm, channel_stats in zip(self._data_vms, stats):
+            data_vm.init_views(default_data, channel_stats)
 
 
     ### Functions ###
-    def new_voltage_plot(self, data: list):
-        self.voltagePlotChanged.emit(data)
+    @traced()
+    def new_plots(self, plots: list[EnvelopePyramid]):
+        for channel, data in enumerate(plots):
+            self.plotChanged.emit(channel, data, self._time_axis)
+
+    @traced()
+    def new_stats(self, stats: list[list[dict]]):
+        for channel, channel_stats in enumerate(stats):
+            self.statsChanged.emit(channel, channel_stats)
+
+    def _running_stats(self, left: int, right: int):
+        """Returns the live running stats if [left, right) is the whole
+        capture, otherwise None.
+        """
+
+        if self._live is None or not self._live['started']:
+            return None
+        if (left, right) != (0, len(self._live['buffer'])):
+            return None
+        return self._live['running']
+
+    def _group_stats(self, sources: list, fs: float, left: int, right: int,
+                     spectral: bool, spectra: list = None) -> list[list[dict]]:
+        """Returns per-channel stats of every channel group, in view order.
+
+        Args:
+            sources: A RangeIndex or RunningStats per channel group.
+        """
+
+        stats = []
+        for group, (source, units) in enumerate(zip(sources, self._units)):
+            if units:
+                spectrum = spectra[group] if spectra else None
+                stats += StatsModel(source, units, left, right, spectral,
+                                    spectrum, fs).channels
+        return stats
+
+    @traced()
+    def _window_stats(self, file_id: tuple, indices: list[RangeIndex],
+                      spectra: list[SegmentSpectrum], fs: float, left: int,
+                      right: int, spectral: bool = True) -> list[list[dict]]:
+        """Returns the per-channel stats of a window, from the stats cache
+        if possible.
+
+        Safe to call from a worker thread. Stats of data without a file
+        identity, such as a live capture, are never cached.
+        """
 
-    def new_voltage_stats(self, stats: list[dict]):
-        self.voltageStatsChanged.emit(stats)
+        left, right = indices[0].clip(left, right)
+        key = (file_id, left, right, fs)
 
-    def new_current_plot(self, data: list):
-        self.currentPlotChanged.emit(data)
+        if file_id is None:
+            return self._group_stats(indices, fs, left, right, spectral, spectra)
 
-    def new_current_stats(self, stats: list[dict]):
-        self.currentStatsChanged.emit(stats)
+        # Cached full stats also answer a request for the cheap ones
+        if key + (True,) in self.stats_cache:
+            spectral = True
+
+        stats = self.stats_cache.get(key + (spectral,))
+        if stats is None:
+            stats = self._group_stats(indices, fs, left, right, spectral, spectra)
+            self.stats_cache.put(key + (spectral,), stats)
+        return stats
+
+    def _settled(self, left: int, right: int) -> bool:
+        """Returns True if the full stats of a window are already cached."""
+
+        left, right = self._indices[0].clip(left, right)
+        key = (self._file_id, left, right, self._time_axis.fs, True)
+        return key in self.stats_cache
+
+
+    @traced()
+    def _load(self, fpath: Path) -> dict:
+        """Loads, indexes and analyzes a file. Runs on a worker thread."""
+
+        entry = self._load_entry(fpath)
+        fs = entry['time_axis'].fs
+
+        if entry['running'] is not None:
+            # Full-file stats of files larger than RAM, without rescanning
+            stats = self._group_stats(entry['running'], fs, 0, None, spectral=False)
+        else:
+            stats = self._window_stats(entry['file_id'], entry['indices'],
+                                       entry['spectra'], fs, 0, None)
+
+        return {**entry, 'stats': stats}
+
+    def _load_entry(self, fpath: Path) -> dict:
+        """Returns a file's sample store entry, loading and indexing the file
+        unless it is stored. Runs on a worker thread.
+
+        The store is shared by the plotted file, overlays and prefetches, so
+        no file is loaded or indexed twice while it stays in memory.
+        """
+
+        stat = fpath.stat()
+        file_id = (str(fpath), stat.st_mtime_ns, stat.st_size)
+
+        def load() -> dict:
+            if self._chunked_loader.is_large(fpath):
+                entry = self._load_chunked(fpath)
+            else:
+                entry = self._load_samples(fpath)
+            return {**entry, 'file_id': file_id}
+
+        # Waits for a prefetch of the same file instead of loading it again
+        return self.sample_store.get_or_load(file_id, load)
+
+    @traced()
+    def _prefetch(self, fpath: Path):
+        """Loads a file and its full-file stats ahead of selection. Runs on
+        the prefetch thread.
+
+        Files larger than RAM are left alone; their loads are dominated by
+        disk reads that a prefetch would only compete with.
+        """
+
+        if not fpath.is_file() or self._chunked_loader.is_large(fpath):
+            return
+
+        self._load(fpath)  # Fills the sample store and stats cache
+
+    def _load_samples(self, fpath: Path) -> dict:
+        """Loads a file that fits in RAM and derives its power channels in
+        a single pass. Runs on a worker thread.
+        """
+
+        # Rows of one (channels, samples) array; no per-sample copies
+        samples = self._data_loader.load_samples(fpath)
+        derived = self._power.derive(samples)
+        time_axis = self._data_loader.time_axis(fpath)
+
+        # Index data once so zoom-window stats never rescan it
+        return {
+            'time_axis': time_axis,
+            'indices': [RangeIndex(samples), RangeIndex(derived)],
+            'plots': [EnvelopePyramid(row) for row in (*samples, *derived)],
+            'spectra': [SegmentSpectrum(samples, time_axis.fs),
+                        SegmentSpectrum(derived, time_axis.fs)],
+            'running': None,
+        }
+
+    @traced()
+    def _load_chunked(self, fpath: Path) -> dict:
+        """Loads a file larger than RAM. Runs on a worker thread.
+
+        Samples stay memory-mapped; full-file stats come from the running
+        accumulators and plots from the cached preview.
+        """
+
+        loaded = self._chunked_loader.load(fpath)
+        derived = self._chunked_loader.derive(
+            loaded['samples'], self._power.derive, len(self._power)
+        )
+        groups = (loaded, derived)
+        time_axis = self._data_loader.time_axis(fpath)
+
+        return {
+            'time_axis': time_axis,
+            'indices': [group['index'] for group in groups],
+            'plots': loaded['plots'] + derived['plots'],
+            'spectra': [SegmentSpectrum(group['samples'], time_axis.fs) for group in groups],
+            'running': [group['running'] for group in groups],
+        }
+
+    def _overlay_stats(self, overlays: list[dict], fs: float, left: int,
+                       right: int, spectral: bool = True) -> list[list[list[dict]]]:
+        """Returns the per-channel stats of every overlay, over the span of
+        time of the plotted file's window [left, right) at rate fs.
+
+        Safe to call from a worker thread.
+        """
+
+        stats = []
+        for overlay in overlays:
+            overlay_fs = overlay['time_axis'].fs
+            scale = overlay_fs / fs
+            stats.append(self._window_stats(
+                overlay['file_id'], overlay['indices'], overlay['spectra'], overlay_fs,
+                round(left * scale), None if right is None else round(right * scale),
+                spectral,
+            ))
+        return stats
+
+    def new_overlay_stats(self, stats: list[list[list[dict]]]):
+        for overlay, overlay_stats in enumerate(stats):
+            for channel, channel_stats in enumerate(overlay_stats):
+                self.overlayStatsChanged.emit(channel, overlay, channel_stats)
 
 
     ### Slots ###
-    def update_voltage_stats(self, data: list):
-        """Updates only the voltage view statistic indicators."""
+    @traced()
+    def update_stats(self, left: int, right: int):
+        """Updates the cheap statistic indicators immediately."""
+
+        self._runner.cancel('stats')  # The view moved on; drop stale spectra
+        self._runner.cancel('overlay stats')
+        self._window = (left, right)
+        running = self._running_stats(left, right)
+        if running is not None:
+            stats = self._group_stats(running, self._time_axis.fs, left, right,
+                                      spectral=False)
+        else:
+            stats = self._window_stats(
+                self._file_id, self._indices, self._spectra, self._time_axis.fs,
+                left, right, spectral=False,
+            )
+        self.new_stats(stats)
+        self.new_overlay_stats(self._overlay_stats(
+            self._overlays, self._time_axis.fs, left, right, spectral=False
+        ))
 
-        stats = StatsModel(data, "V").stats
-        self.new_voltage_stats(stats)
+    @traced()
+    def settle_stats(self, left: int, right: int):
+        """Updates all statistic indicators, in the background unless they
+        are cached.
+        """
 
-    def update_current_stats(self, data: list):
-        """Updates only the current view statistic indicators"""
+        args = (self._file_id, self._stable_indices(), self._spectra,
+                self._time_axis.fs, left, right)
+        self._window = (left, right)
 
-        stats = StatsModel(data, "A").stats
-        self.new_current_stats(stats)
+        if self._settled(left, right):
+            self.new_stats(self._window_stats(*args))
+        else:
+            self._runner.submit('stats', self.new_stats, self._window_stats, *args)
 
+        if self._overlays:
+            self._runner.submit('overlay stats', self.new_overlay_stats,
+                                self._overlay_stats, list(self._overlays),
+                                self._time_axis.fs, left, right)
+
+    def _stable_indices(self) -> list[RangeIndex]:
+        """Returns the indices of the plotted data for use on a worker
+        thread. Live indices grow in place on the GUI thread, so workers
+        get snapshots of them.
+        """
+
+        if self._live is None:
+            return self._indices
+        return [index.snapshot() for index in self._indices]
+
+    @traced()
     def update_views(self, fpath: Path):
-        """Emits new data and stats upon a successful file load.
+        """Loads a file in the background and emits its data and stats.
 
         Args:
             fpath: A Path object that points to a user data file.
         """
 
-        if fpath.is_file():
-            self._dir = fpath.parent  # Set the active data directory
-            all_data = self._data_loader.load(fpath)
-        else:
+        if not fpath.is_file():
             return  # Not a valid file path
 
-        # Buffer named data lists
-        voltage_data = list(all_data[DataLoader.KEYS[0]])
-        current_data = list(all_data[DataLoader.KEYS[1]])
+        self._dir = fpath.parent  # Set the active data directory
+
+        if self._compare_button.isChecked() and self._file_id is not None:
+            self.add_overlay(fpath)
+            return
+
+        self._fpath = fpath
 
-        # Calculate stats from data lists
-        voltage_stats = StatsModel(voltage_data, "V").stats
-        current_stats = StatsModel(current_data, "A").stats
+        if self._live is not None:
+            self._start_live()  # Follow the new file instead
+            return
+
+        # Stats and events pending for the previous file no longer apply
+        self._runner.cancel('stats')
+        self._runner.cancel('events')
+        self._runner.submit('load', self._apply_load, self._load, fpath)
+
+    def prefetch(self, fpaths: list[Path]):
+        """Loads files in the background, ahead of their selection.
+
+        Prefetches of files no longer listed are cancelled. New ones start
+        once the selected file is shown, so they never delay it, and run one
+        at a time on their own thread. Each fills the sample store and the
+        stats cache, so stepping through a series of captures finds each one
+        ready.
+
+        Args:
+            fpaths: Paths to load, most likely to be selected first.
+        """
+
+        for fpath in self._neighbors:
+            if fpath not in fpaths:
+                self._prefetcher.cancel(('prefetch', str(fpath)))
+
+        self._neighbors = list(fpaths)
+
+        if not self._runner.pending('load'):
+            self._prefetch_neighbors()
+
+    def _prefetch_neighbors(self):
+        if self._live is not None:
+            return  # Followed files keep growing; nothing to prefetch
+
+        for fpath in self._neighbors:
+            key = ('prefetch', str(fpath))
+            if not self._prefetcher.pending(key):
+                self._prefetcher.submit(key, lambda _: None, self._prefetch, fpath)
+
+    @traced()
+    def _apply_load(self, result: dict):
+        """Publishes a finished load. Runs on the GUI thread."""
+
+        self._indices = result['indices']
+        self._plots = result['plots']
+        self._spectra = result['spectra']
+        self._time_axis = result['time_axis']
+        self._file_id = result['file_id']
+        self._window = (0, None)
 
         # Notify external module that new data and stats are available
-        self.new_voltage_plot(voltage_data)
-        self.new_voltage_stats(voltage_stats)
-        self.new_current_plot(current_data)
-        self.new_current_stats(current_stats)
+        self.new_plots(result['plots'])
+        self.new_stats(result['stats'])
+
+        if result.get('events') is not None:
+            self.event_list.set_events(result['events'], self._time_axis)
+        else:
+            entry = {key: value for key, value in result.items() if key != 'stats'}
+            self.event_list.set_progress(0)
+            self._runner.submit('events', self._apply_events, self._detect_events,
+                                entry, progress=self.event_list.set_progress)
+
+        self._prefetch_neighbors()
+
+    @traced()
+    def _detect_events(self, entry: dict, report) -> tuple | None:
+        """Detects the events of every channel of a store entry and stores
+        them with it, so each file is scanned once. Runs on a worker thread
+        after the file is shown.
+
+        Returns the entry's file identity and its events, or None if the
+        detection was cancelled.
+        """
+
+        pieces = []
+        channel = 0
+        total = sum(len(index.values) for index in entry['indices'])
+
+        for group, index in enumerate(entry['indices']):
+            done = sum(len(other.values) for other in entry['indices'][:group])
+            events = self._detector.detect(
+                index.values,
+                report=lambda fraction: report((done + fraction * len(index.values)) / total),
+            )
+            if events is None:
+                return None
+
+            events.events['channel'] += channel  # In view order
+            pieces.append(events)
+            channel += len(index.values)
+
+        events = EventIndex(np.concatenate([piece.events for piece in pieces]),
+                            any(piece.truncated for piece in pieces))
+
+        # Reselecting the file finds them ready
+        self.sample_store.put(entry['file_id'], {**entry, 'events': events})
+        return entry['file_id'], events
+
+    def _apply_events(self, result: tuple | None):
+        """Lists detected events. Runs on the GUI thread."""
+
+        if result is None or result[0] != self._file_id:
+            return  # Cancelled, or another file is shown
+
+        self.event_list.set_events(result[1], self._time_axis)
+
+    def jump_to_event(self, row: int):
+        """Frames an event of the event list in every plot.
+
+        The view is centered on the event's peak and shows the whole event
+        with a margin, located from the event index alone.
+        """
+
+        event = self.event_list.event_at(row)
+        if event is None:
+            return
+
+        half = max(AnalyzerViewModel.EVENT_MARGIN * (event['end'] - event['start']),
+                   AnalyzerViewModel.EVENT_MIN_SAMPLES)
+        left = self._time_axis.time(event['peak'] - half)
+        right = self._time_axis.time(event['peak'] + half)
+
+        for data_vm in self._data_vms:
+            data_vm.show_range(left, right)
+
+    def add_overlay(self, fpath: Path):
+        """Overlays a file on the plotted one, loading it in the background
+        unless it is in the sample store.
+
+        Overlays start at the plotted file's start time, and their stats
+        cover the same span of time as the plotted file's.
+        """
+
+        shown = [self._file_id[0]] + [overlay['file_id'][0] for overlay in self._overlays]
+        if str(fpath) in shown:
+            return
+
+        self._runner.submit(('overlay', str(fpath)), self._apply_overlay,
+                            self._load_entry, fpath)
+
+    @traced()
+    def _apply_overlay(self, entry: dict):
+        """Publishes a loaded overlay. Runs on the GUI thread."""
+
+        if not self._compare_button.isChecked() or self._file_id is None:
+            return  # Comparison ended while loading
+
+        # Aligned to the start of the plotted file
+        axis = TimeAxis(entry['time_axis'].fs, self._time_axis.start)
+        name = Path(entry['file_id'][0]).stem
+        self._overlays.append(entry)
+
+        for channel, data in enumerate(entry['plots']):
+            self.overlayAdded.emit(channel, data, axis, name)
+
+        # Cached stats of the other overlays make this cheap
+        self._runner.submit('overlay stats', self.new_overlay_stats,
+                            self._overlay_stats, list(self._overlays),
+                            self._time_axis.fs, *self._window)
+
+    def clear_overlays(self):
+        self._runner.cancel('overlay stats')
+        self._overlays.clear()
+        self.overlaysCleared.emit()
+
+    def _toggle_compare(self, checked: bool):
+        if not checked:
+            self.clear_overlays()
+
+    def _toggle_live(self, checked: bool):
+        if checked:
+            self._start_live()
+        else:
+            self._stop_live()
+
+    def _start_live(self):
+        """Starts following the selected file.
+
+        The file is first loaded in the background as it would be when
+        selected, and followed from the end of that load. Only appended
+        rows are parsed afterwards, and the buffers, indices, plots and
+        running stats are extended in place.
+        """
+
+        self._stop_live()
+
+        # Only text captures are appended to while recording
+        if self._fpath is None or columnar.is_columnar(self._fpath):
+            return
+
+        self._runner.cancel('load')
+        self._runner.cancel('stats')
+        self._runner.cancel('events')
+        self.event_list.set_status("")  # Growing data is not scanned
+        self.clear_overlays()  # Their time alignment no longer applies
+
+        self._file_id = None  # Live data changes; never cache its stats
+        dtype = self._data_loader.dtype
+        self._live = {
+            'reader': TailReader(self._fpath, DataLoader.KEYS, dtype),
+            'buffer': SampleBuffer(len(DataLoader.KEYS), dtype=dtype),  # Until seeded
+            'derived': SampleBuffer(len(self._power), dtype=dtype),
+            'running': [RunningStats(), RunningStats()],  # Per channel group
+            'started': False,  # Set once the first rows are shown
+        }
+        self._live_timer.start()
+
+        # Shares the key of reads, so none starts before the seed is applied
+        self._runner.submit('tail', self._apply_seed, self._seed_live,
+                            self._fpath, self._live['reader'])
+
+    @traced()
+    def _seed_live(self, fpath: Path, reader: TailReader) -> dict:
+        """Loads a file to follow and positions its reader after the loaded
+        rows. Runs on a worker thread.
+
+        The last loaded row is left for the reader, since it may have been
+        loaded while still being written. Files larger than RAM are loaded
+        in chunks and buffered in a temporary file.
+        """
+
+        large = self._chunked_loader.is_large(fpath)
+        if large:
+            samples = self._chunked_loader.load(fpath)['samples']
+        else:
+            samples = self._data_loader.load_samples(fpath)
+
+        rows = reader.seek(max(samples.shape[-1] - 1, 0))
+        capacity = rows + SampleBuffer.CAPACITY
+        live = {
+            'buffer': SampleBuffer(len(DataLoader.KEYS), capacity, samples.dtype, large),
+            'derived': SampleBuffer(len(self._power), capacity, samples.dtype, large),
+            'running': [RunningStats(), RunningStats()],  # Per channel group
+        }
+
+        # In chunks, so memory-mapped samples never need to fit in RAM
+        for start in range(0, rows, ChunkedLoader.CHUNK_ROWS):
+            self._buffer_live(live, samples[:, start:min(start + ChunkedLoader.CHUNK_ROWS, rows)])
+
+        if rows:
+            time_axis = self._data_loader.time_axis(fpath)
+            groups = (live['buffer'].values, live['derived'].values)
+            live.update({
+                'time_axis': time_axis,
+                'indices': [RangeIndex(values) for values in groups],
+                'spectra': [SegmentSpectrum(values, time_axis.fs) for values in groups],
+                'plots': [EnvelopePyramid(row) for values in groups for row in values],
+            })
+        return live
+
+    def _apply_seed(self, seed: dict):
+        """Shows the loaded part of a followed file. Runs on the GUI thread."""
+
+        if self._live is None:
+            return
+
+        self._live.update(seed)
+        if 'indices' in seed:
+            self._live['started'] = True
+            self._time_axis = seed['time_axis']
+            self._indices = seed['indices']
+            self._spectra = seed['spectra']
+            self._plots = seed['plots']
+            self.new_plots(self._plots)
+
+        self._poll_live()
+
+    def _buffer_live(self, live: dict, block: np.ndarray) -> tuple:
+        """Appends measured rows and their derived channels to the live
+        buffers and running stats. Returns the grown data of each channel
+        group.
+        """
+
+        derived_block = self._power.derive(block)
+        live['running'][0].update(block)
+        live['running'][1].update(derived_block)
+        return (
+            live['buffer'].append(block),  # Rows follow KEYS order
+            live['derived'].append(derived_block),
+        )
+
+    def _stop_live(self):
+        self._live_timer.stop()
+        self._runner.cancel('tail')
+        self._live = None
+
+    def _poll_live(self):
+        """Reads appended rows in the background, one read at a time."""
+
+        if self._live is None or self._runner.pending('tail'):
+            return
+
+        self._runner.submit('tail', self._apply_tail, self._live['reader'].read)
+
+    @traced()
+    def _apply_tail(self, block: np.ndarray):
+        """Extends buffers, indices and plots with new rows. Runs on the GUI
+        thread; the cost is proportional to the new rows only.
+        """
+
+        live = self._live
+
+        if live is None or not block.shape[-1]:
+            return
+
+        groups = self._buffer_live(live, block)
+        rows = [row for values in groups for row in values]
+
+        if not live['started']:
+            live['started'] = True
+            self._time_axis = self._data_loader.time_axis(self._fpath)
+            self._indices = [RangeIndex(values) for values in groups]
+            self._spectra = [SegmentSpectrum(values, self._time_axis.fs) for values in groups]
+            self._plots = [EnvelopePyramid(row) for row in rows]
+            self.new_plots(self._plots)
+        else:
+            for index, spectrum, values in zip(self._indices, self._spectra, groups):
+                index.extend(values)
+                spectrum.extend(values)
+            for channel, (plot, row) in enumerate(zip(self._plots, rows)):
+                plot.extend(row)
+                self.plotExtended.emit(channel, plot)
+
+        # Stats follow from the resulting plot range changes
 
     def _save_img(self):
+        """Asks where to save a report of the plotted data, then renders it
+        in the background and tells whether it was saved.
+
+        The report shows the plotted data and the stats of the visible
+        window, at a fixed page size and resolution rather than at the size
+        of the window.
+        """
+
         dialog = ReportDialog(parent=self._button.parent())
-        dialog.save_img(dir=self._dir)
\ No newline at end of file
+        fpath = dialog.ask_path(dir=self._dir)
+        if not fpath:
+            return
+
+        colors = DataViewModel.OVERLAY_COLORS
+        start, end = self._data_vms[0].x_range()
+        report = {
+            'title': self._fpath.name if self._fpath else "Report",
+            'lines': [
+                self._description.text() if self._description else "",
+                f"{self._time_axis.fs:g} Hz, {start:.6g} s to {end:.6g} s"
+                + (" (live)" if self._live is not None else ""),
+            ],
+            'start': start,
+            'end': end,
+        }
+        traces = [
+            {'label': self._fpath.stem if self._fpath else "", 'color': None,
+             'plots': self._plots,
+             'axis': self._time_axis}
+        ] + [
+            {'label': Path(overlay['file_id'][0]).stem,
+             'color': colors[number % len(colors)], 'plots': overlay['plots'],
+             'axis': TimeAxis(overlay['time_axis'].fs, self._time_axis.start)}
+            for number, overlay in enumerate(self._overlays)
+        ]
+
+        self._runner.submit(
+            ('report', fpath), dialog.show_saved, self._save_report, fpath, report,
+            traces, self._file_id, self._stable_indices(), self._spectra,
+            list(self._overlays), self._window,
+            error=lambda error: dialog.show_failed(fpath, error),
+        )
+
+    @traced()
+    def _save_report(self, fpath: str, report: dict, traces: list[dict],
+                     file_id: tuple, indices: list[RangeIndex],
+                     spectra: list[SegmentSpectrum], overlays: list[dict],
+                     window: tuple) -> str:
+        """Computes the stats of the last stats window, usually cached,
+        and renders a report of them. Runs on a worker thread.
+        """
+
+        fs = traces[0]['axis'].fs  # Of the plotted file
+        stats = [self._window_stats(file_id, indices, spectra, fs, *window)]
+        stats += self._overlay_stats(overlays, fs, *window)
+
+        report['channels'] = [
+            {'name': name, 'unit': unit, 'traces': [
+                {'label': trace['label'], 'color': trace['color'],
+                 'pyramid': trace['plots'][channel], 'axis': trace['axis'],
+                 'stats': trace_stats[channel]}
+                for trace, trace_stats in zip(traces, stats)
+            ]}
+            for channel, (name, unit) in enumerate(self.channels())
+        ]
+
+        ReportRenderer().save(fpath, report)
+        return fpath
\ No newline at end of file
@@ -1,34 +1,112 @@
 # Imports
 from math import floor, ceil
+import numpy as np
+from utilities.envelope import EnvelopePyramid
+from utilities.time_axis import TimeAxis
+from utilities.tracer import traced, tracer
 # Qt
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, QTimer, Signal
 from PySide6.QtWidgets import QWidget
 # Graphing toolkit
 from pyqtgraph import PlotWidget
 
 
 class DataViewModel(QObject):
-    """Handles analysis view updates."""
+    """Handles analysis view updates.
+
+    Bursts of plot range changes are coalesced before stats are requested.
+    Cheap stats are requested at most once per refresh interval while the
+    view moves; expensive stats are requested once the view has been still
+    for the settle latency.
+
+    The plot's x-axis is in seconds. Samples are located through the data's
+    implicit time axis, and times are computed only for plotted points.
+
+    Other files can be overlaid on the plotted data, each as its own curve
+    with its own stats column. Adding an overlay draws only its curve.
+
+    Attributes:
+        refresh_ms: Minimum interval between cheap stats requests.
+        settle_ms: Quiet time after the last range change before expensive
+            stats are requested.
+    """
+
+    ### Constants ###
+    REFRESH_MS = 16  # About one request per frame
+    SETTLE_MS = 250
+    FIT_POINTS = 512  # Envelope points read to fit the y-range to a span
+    OVERLAY_COLORS = ("#f0a020", "#40c0f0", "#e05080", "#80e040", "#b080f0", "#f0e040")
+
 
     ### Signals ###
-    dataSlice = Signal(list)  # Emits slice of plot data for stats calculation
+    dataRange = Signal(int, int)  # Emits visible index bounds for cheap stats
+    dataSettled = Signal(int, int)  # Emits settled index bounds for all stats
 
 
     ### Constructors ###
-    def __init__(self, graph: PlotWidget, stats: QWidget):
+    def __init__(self, graph: PlotWidget, stats: QWidget,
+                 refresh_ms: int = REFRESH_MS, settle_ms: int = SETTLE_MS):
         super().__init__()
         self._graph = graph
         self._stats = stats
-        self.data = []  # Buffer plot data once to avoid retrievals from view
+        self.data = np.empty(0)  # Buffer plot data once to avoid retrievals from view
+        self._pyramid = EnvelopePyramid(self.data)
+        self._axis = TimeAxis()
+        self._leader: DataViewModel = None  # Owner of the x-range, if linked
+        self._curve = self._graph.getPlotItem().plot()  # Reused for every render
+        self._overlays: list[dict] = []  # Each has a 'curve', 'pyramid' and 'axis'
+        self._rendered: tuple = None  # X-range and width of the last render
+        self._refresh_timer = self._init_timer(refresh_ms, self._emit_range)
+        self._settle_timer = self._init_timer(settle_ms, self._emit_settled)
 
         # Set signal/slot connections
+        self._graph.sigRangeChanged.connect(self._range_changed)
         self._graph.sigRangeChanged.connect(self.refresh_stats)
 
-    def init_views(self, data: list, stats: list):
+    def _init_timer(self, interval: int, slot) -> QTimer:
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(interval)
+        timer.timeout.connect(slot)
+        return timer
+
+    @property
+    def refresh_ms(self) -> int:
+        return self._refresh_timer.interval()
+
+    @refresh_ms.setter
+    def refresh_ms(self, interval: int):
+        self._refresh_timer.setInterval(interval)
+
+    @property
+    def settle_ms(self) -> int:
+        return self._settle_timer.interval()
+
+    @settle_ms.setter
+    def settle_ms(self, interval: int):
+        self._settle_timer.setInterval(interval)
+
+    def link_range(self, other: "DataViewModel"):
+        """Makes this graph follow the x-range of another's graph.
+
+        The other view-model then owns the x-range: this one no longer
+        frames or scrolls it.
+        """
+
+        self._leader = other
+        self._graph.setXLink(other._graph)
+
+    def x_range(self) -> tuple[float, float]:
+        """Returns the visible span of time, in seconds."""
+
+        rect = self._graph.viewRect()
+        return rect.left(), rect.right()
+
+    def init_views(self, data: np.ndarray, stats: list):
         """Initializes a graph view and all associated statistic indicators.
 
         Args:
-            data: A list of data of any size.
+            data: An array of data of any size.
             stats: A list of any number of statistic dictionaries.
         """
 
@@ -39,35 +117,94 @@ class DataViewModel(QObject):
 
 
     ### Functions ###
+    def render_visible(self):
+        """Uploads only the visible data, decimated to the graph's width.
+
+        The envelope level is chosen so the curve holds about two points per
+        horizontal pixel, regardless of how many samples are in view.
+        """
+
+        self._rendered = self._render_key()
+
+        # Timed inline; a decorated slot would receive every signal argument
+        with tracer.span("DataViewModel.render_visible"):
+            self._render(self._curve, self._pyramid, self._axis)
+            for overlay in self._overlays:
+                self._render(overlay['curve'], overlay['pyramid'], overlay['axis'])
+
+    def _render_key(self) -> tuple:
+        rect = self._graph.viewRect()
+        return rect.left(), rect.right(), int(self._graph.getViewBox().width())
+
+    def _range_changed(self):
+        """Redraws after the x-range or width changed. The y-range alone
+        does not change which samples are drawn.
+        """
+
+        if self._render_key() != self._rendered:
+            self.render_visible()
+
+    def _render(self, curve, pyramid: EnvelopePyramid, axis: TimeAxis):
+        rect = self._graph.viewRect()
+        pixels = max(1, int(self._graph.getViewBox().width()))
+
+        # Include the samples just outside the view so the curve meets the edges
+        left = int(floor(axis.index(rect.left())))
+        right = int(ceil(axis.index(rect.right()))) + 1
+
+        x, y = pyramid.segment(left, right, max_points=2*pixels)
+        curve.setData(x=axis.time(x), y=y)
+
     def refresh_stats(self):
-        """Emits signal if stats are out-of-date based on plot range."""
+        """Schedules stats requests after the plot range changed.
+
+        The cheap request is throttled rather than debounced so indicators
+        keep moving during a drag; the settle timer restarts on every change.
+        """
+
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+        self._settle_timer.start()
+
+    def _visible_window(self) -> tuple[int, int]:
+        """Returns half-open data indices of the visible plot area."""
 
         # Calculate uncoerced x-axis bounds for visible plot area
-        left_index_raw = int(ceil(self._graph.viewRect().left()))
-        right_index_raw = int(floor(self._graph.viewRect().right()))
+        rect = self._graph.viewRect()
+        left_index_raw = int(ceil(self._axis.index(rect.left())))
+        right_index_raw = int(floor(self._axis.index(rect.right())))
 
         # Coerce plot indices to actual data set
         left_index = max(0, left_index_raw)
         right_index = min(right_index_raw, len(self.data)-1)
 
-        #TODO: DELETE
-        print(left_index_raw, left_index)
-        print(right_index_raw, right_index)
+        return left_index, right_index+1
+
+    def _emit_range(self):
+        self.dataRange.emit(*self._visible_window())
 
-        # Retrieve and emit data slice
-        slice = self.data[left_index:right_index+1]
-        self.dataSlice.emit(slice)
+    def _emit_settled(self):
+        self.dataSettled.emit(*self._visible_window())
 
 
     ### Slots ###
-    def update_stats(self, stats: list[dict]):
+    @traced()
+    def update_stats(self, stats: list[dict], overlay: int = None):
         """Updates statistic views with new data.
 
         Args:
             stats: A list of statistical dictionaries.
+            overlay: The overlaid file the stats describe, or None for the
+                plotted data.
         """
 
-        indicators = self._stats.indicators
+        if overlay is None:
+            indicators = self._stats.indicators
+        elif overlay < len(self._stats.overlays):
+            indicators = self._stats.overlays[overlay]
+        else:
+            return  # Overlays were cleared meanwhile
 
         for stat in stats:
             index = stat.get('name')
@@ -76,18 +213,32 @@ class DataViewModel(QObject):
             indicators[index].clear()
             indicators[index].setText(f"{value:.3e}")  # Scientific notation
 
-    def update_graph(self, data: list):
+    @traced()
+    def update_graph(self, data: np.ndarray | EnvelopePyramid,
+                     axis: TimeAxis = None):
         """Updates graph view with new plot data.
 
         Args:
-            data: A list of data points to be plotted.
+            data: An array of data points to be plotted, or a prebuilt
+                envelope pyramid of them. Held by reference.
+            axis: The time axis of the data. Defaults to the default
+                sample rate, starting at zero.
         """
 
-        self._graph.getPlotItem().clearPlots()
-        self._graph.getPlotItem().plot(y=data)
-        self._graph.getPlotItem().autoRange()
+        if not isinstance(data, EnvelopePyramid):
+            data = EnvelopePyramid(data)
 
-        self.data = data
+        self._pyramid = data
+        self.data = data.values
+        self._axis = axis or TimeAxis()
+
+        # Frame the whole data set; the visible segment is rendered on demand
+        y_min, y_max = self._pyramid.bounds()
+        plot_item = self._graph.getPlotItem()
+        if self._leader is None:
+            plot_item.setXRange(self._axis.time(0), self._axis.time(max(len(data)-1, 1)))
+        plot_item.setYRange(y_min, y_max)
+        self.render_visible()
 
         # Not used: Limit zoomed plot scales
         """
@@ -112,4 +263,97 @@ class DataViewModel(QObject):
         # Reset viewbox scales for new data
         self._graph.getPlotItem().setXRange(min=xMin, max=xMax)
         self._graph.getPlotItem().setYRange(min=yMin, max=yMax)
-        """
\ No newline at end of file
+        """
+
+    @traced()
+    def add_overlay(self, data: EnvelopePyramid, axis: TimeAxis, name: str):
+        """Overlays another file's data on the graph.
+
+        The current x-range is kept, and the y-range grows to fit the new
+        data. No other curve is redrawn.
+
+        Args:
+            data: The other file's envelope pyramid. Held by reference.
+            axis: The time axis to plot it against.
+            name: A label for its stats column.
+        """
+
+        colors = DataViewModel.OVERLAY_COLORS
+        color = colors[len(self._overlays) % len(colors)]
+        plot_item = self._graph.getPlotItem()
+        overlay = {'curve': plot_item.plot(pen=color), 'pyramid': data, 'axis': axis}
+        self._overlays.append(overlay)
+        self._stats.add_overlay(name, color)
+
+        bounds = [self._pyramid.bounds()] + [o['pyramid'].bounds() for o in self._overlays]
+        plot_item.setYRange(min(b[0] for b in bounds), max(b[1] for b in bounds))
+        self._render(overlay['curve'], data, axis)
+
+    def show_range(self, left: float, right: float):
+        """Shows the span of time [left, right], in seconds, with the
+        y-range fitted to the data within it.
+
+        The fit reads a coarse level of each envelope pyramid, so it costs
+        the same for any span. Linked graphs only fit their y-range.
+        """
+
+        lows, highs = [], []
+        curves = [(self._pyramid, self._axis)]
+        curves += [(overlay['pyramid'], overlay['axis']) for overlay in self._overlays]
+        for pyramid, axis in curves:
+            first = int(floor(axis.index(left)))
+            last = int(ceil(axis.index(right))) + 1
+            _, y = pyramid.segment(first, last, max_points=DataViewModel.FIT_POINTS)
+            y = y[np.isfinite(y)]
+            if len(y):
+                lows.append(y.min())
+                highs.append(y.max())
+
+        plot_item = self._graph.getPlotItem()
+        if lows:
+            plot_item.setYRange(min(lows), max(highs))
+        if self._leader is None:
+            plot_item.setXRange(left, right, padding=0)
+
+    def clear_overlays(self):
+        plot_item = self._graph.getPlotItem()
+        for overlay in self._overlays:
+            plot_item.removeItem(overlay['curve'])
+
+        self._overlays.clear()
+        self._stats.clear_overlays()
+
+    @traced()
+    def extend_graph(self, data: EnvelopePyramid):
+        """Shows samples appended to the plotted data.
+
+        If the view reaches the end of the old data it scrolls to follow the
+        new end; a view showing the whole data set keeps showing all of it.
+
+        Args:
+            data: The plotted envelope pyramid, extended in place.
+        """
+
+        old_end = len(self.data) - 1
+        self._pyramid = data
+        self.data = data.values
+
+        rect = self._graph.viewRect()
+        plot_item = self._graph.getPlotItem()
+        anchored = rect.left() <= self._axis.start
+
+        if rect.right() < self._axis.time(old_end):
+            self.render_visible()  # Looking at older data; leave it be
+            return
+
+        # Anchored views grow, others slide along with the new end
+        if self._leader is None:
+            shift = (len(data) - 1 - old_end) / self._axis.fs
+            left = rect.left() if anchored else rect.left() + shift
+            plot_item.setXRange(left, rect.right() + shift, padding=0)
+        else:
+            self.render_visible()
+
+        if anchored:
+            y_min, y_max = data.bounds()
+            plot_item.setYRange(y_min, y_max)
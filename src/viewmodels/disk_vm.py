@@ -12,6 +12,7 @@ class DiskViewModel(QObject):
 
     ### Signals ###
     newPath = Signal(Path)  # Emits new data path to external modules
+    neighborPaths = Signal(list)  # Emits paths likely to be selected next
 
 
     ### Constructors ###
@@ -36,13 +37,12 @@ class DiskViewModel(QObject):
         view.editingFinished.connect(self._line_completed)
 
     def _init_tree(self, view: QTreeView):
-        path = QDir.rootPath()
-        view.setModel(self._model)
-        index = self._model.setRootPath(path)
-        view.setRootIndex(index)
+        view.setModel(self._model)  # Empty until populate()
         view.format()
         # Set signal/slot connections
         view.selectionModel().currentChanged.connect(self._tree_changed)
+        # Queued, so the paint completes before the crawl starts
+        view.firstPainted.connect(self.populate, Qt.ConnectionType.QueuedConnection)
 
     def _init_list(self, view: QListView):
         model = FileModel()
@@ -52,6 +52,17 @@ class DiskViewModel(QObject):
 
 
     ### Functions ###
+    def populate(self):
+        """Roots the directory tree at the filesystem root.
+
+        Rooting starts a crawl of the filesystem, and of every drive on
+        Windows, so it is left until the tree has first painted. A tree that
+        is never shown never crawls.
+        """
+
+        index = self._model.setRootPath(QDir.rootPath())
+        self._treeview.setRootIndex(index)
+
     def _check_line(self, path: Path) -> bool:
         """Called every time the line changes by at least one character."""
 
@@ -130,4 +141,5 @@ class DiskViewModel(QObject):
         filepath = index.model().name_to_path(filename)
 
         # Emit signal with new path
-        self.newPath.emit(filepath)
\ No newline at end of file
+        self.newPath.emit(filepath)
+        self.neighborPaths.emit(index.model().neighbors(index.row()))
\ No newline at end of file
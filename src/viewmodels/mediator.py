@@ -1,6 +1,7 @@
 # Imports
 from viewmodels.disk_vm import DiskViewModel
 from viewmodels.analyzer_vm import AnalyzerViewModel
+from utilities.tracer import traced
 # Qt
 from PySide6.QtCore import QObject
 
@@ -18,4 +19,7 @@ class Mediator(QObject):
         super().__init__()
 
         # Connect new file path to data view-model
-        nav_viewmodel.newPath.connect(analyzer_viewmodel.update_views)
\ No newline at end of file
+        nav_viewmodel.newPath.connect(
+            traced("Mediator.newPath")(analyzer_viewmodel.update_views)
+        )
+        nav_viewmodel.neighborPaths.connect(analyzer_viewmodel.prefetch)
\ No newline at end of file
@@ -1,10 +1,12 @@
 # Imports
+from utilities.tracer import tracer
 from viewmodels.analyzer_vm import AnalyzerViewModel
 from viewmodels.data_vm import DataViewModel
 # Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtWidgets import (
-    QWidget, QPushButton, QLabel, QLineEdit,
-    QGridLayout
+    QWidget, QPushButton, QLabel, QLineEdit, QListView,
+    QAbstractItemView, QGridLayout
 )
 # Graphing toolkit
 from pyqtgraph import PlotWidget
@@ -33,7 +35,7 @@ class Graph(PlotWidget):
 
     def _build(self):
         self.setLabel("left", f"{self._name} ({self._unit})")
-        self.setLabel("bottom", "Counts")
+        self.setLabel("bottom", "Time", units="s")  # Scaled to SI prefixes
 
     def _style(self):
         # Style sheet syntax not supported for PlotWidget
@@ -45,9 +47,13 @@ class Graph(PlotWidget):
 class Statistics(QWidget):
     """Statistical indicators that update per loaded file.
 
+    Overlaid files get one more column of indicators each, to the right of
+    the units, headed by the file's name in its trace color.
+
     Attributes:
         indicators: A dictionary of user-defined statistical indicator subviews.
             This attribute may be updated at both compile and run time.
+        overlays: One dictionary of indicators per overlaid file.
     """
 
     class StatIndicator(QLineEdit):
@@ -58,6 +64,9 @@ class Statistics(QWidget):
     def __init__(self):
         super().__init__()
         self.indicators = {}
+        self.overlays = []
+        self._rows = {}  # Maps stat name to its layout row
+        self._overlay_widgets = []
         self._layout = QGridLayout()
         self.setLayout(self._layout)
 
@@ -80,10 +89,52 @@ class Statistics(QWidget):
 
         # Add widgets to same row in layout
         self.indicators[name] = self.StatIndicator()
+        self._rows[name] = next_row
         self._layout.addWidget(QLabel(name), next_row, 0, 1, 1)
         self._layout.addWidget(self.indicators[name], next_row, 1, 1, 2)
         self._layout.addWidget(QLabel(unit), next_row, 3, 1, 1)
 
+    def add_overlay(self, name: str, color: str):
+        """Adds a column of indicators for an overlaid file."""
+
+        column = 4 + len(self.overlays)
+        header = QLabel(name)
+        header.setStyleSheet(f"color: {color}")
+        self._layout.addWidget(header, 0, column)  # Row 0 is above every stat
+        self._overlay_widgets.append(header)
+
+        indicators = {}
+        for stat, row in self._rows.items():
+            indicators[stat] = self.StatIndicator()
+            self._layout.addWidget(indicators[stat], row, column)
+            self._overlay_widgets.append(indicators[stat])
+        self.overlays.append(indicators)
+
+    def clear_overlays(self):
+        for widget in self._overlay_widgets:
+            self._layout.removeWidget(widget)
+            widget.deleteLater()
+
+        self._overlay_widgets.clear()
+        self.overlays.clear()
+
+
+class EventList(QListView):
+    """List of detected events. Selecting one frames it in every graph."""
+
+    ### Constants ###
+    WIDTH = 280  #pixels
+
+    def __init__(self):
+        super().__init__()
+        self._build()
+
+    def _build(self):
+        self.setFixedWidth(EventList.WIDTH)
+        self.setUniformItemSizes(True)  # Rows are never measured one by one
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+
 
 class DataBlock(QWidget):
     """Data block for a single set of loaded data.
@@ -114,6 +165,43 @@ class DataBlock(QWidget):
         self.setLayout(layout)
 
 
+class LatencyOverlay(QLabel):
+    """Live readout of the slowest recent processing stages.
+
+    Floats over the top-right corner of its parent and ignores the mouse.
+    Lists the last and average duration of each stage, slowest first.
+    """
+
+    ### Constants ###
+    REFRESH_MS = 500
+    STAGES = 12  # Rows shown
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+        self.setObjectName("latency")  # Enable styling by name
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background: rgba(0, 0, 0, 160); color: #9f9; font-family: monospace;"
+        )
+        self._timer = QTimer(self)
+        self._timer.setInterval(LatencyOverlay.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start()
+
+    def refresh(self):
+        latencies = sorted(tracer.latencies().items(),
+                           key=lambda item: item[1][0], reverse=True)
+        rows = [f"{'stage':<36} {'last ms':>8} {'avg ms':>8}"]
+        rows += [
+            f"{name[:36]:<36} {last:>8.1f} {average:>8.1f}"
+            for name, (last, average, _) in latencies[:LatencyOverlay.STAGES]
+        ]
+        self.setText("\n".join(rows))
+        self.adjustSize()
+        self.move(self.parentWidget().width() - self.width(), 0)
+        self.raise_()
+
+
 class Analyzer(QWidget):
     """Combined analysis pane for all loaded data.
 
@@ -129,16 +217,32 @@ class Analyzer(QWidget):
     def _build(self):
         desc_box = DescriptionBox()
         save_button = QPushButton("Save")
-        voltage_data = DataBlock(name="Voltage", unit="V")
-        current_data = DataBlock(name="Current", unit="A")
-
-        self.viewmodel = AnalyzerViewModel(
-            save_button, voltage_data, current_data
-        )
+        live_button = QPushButton("Live")
+        live_button.setCheckable(True)  # Follows the file while checked
+        compare_button = QPushButton("Compare")
+        compare_button.setCheckable(True)  # Overlays selected files while checked
+        event_list = EventList()
+
+        # One data block per data channel
+        blocks = [
+            DataBlock(name=name, unit=unit)
+            for name, unit in AnalyzerViewModel.channels()
+        ]
+
+        self.viewmodel = AnalyzerViewModel(save_button, live_button,
+                                           compare_button, blocks, desc_box,
+                                           event_list)
 
         layout = QGridLayout()
         layout.addWidget(desc_box, 0, 0)
-        layout.addWidget(save_button, 0, 1)
-        layout.addWidget(voltage_data, 1, 0, 1, 2)
-        layout.addWidget(current_data, 2, 0, 1, 2)
-        self.setLayout(layout)
\ No newline at end of file
+        layout.addWidget(compare_button, 0, 1)
+        layout.addWidget(live_button, 0, 2)
+        layout.addWidget(save_button, 0, 3)
+        for row, block in enumerate(blocks, start=1):
+            layout.addWidget(block, row, 0, 1, 4)
+        layout.addWidget(QLabel("Events"), 0, 4)
+        layout.addWidget(event_list, 1, 4, len(blocks), 1)
+        self.setLayout(layout)
+
+        if tracer.enabled:
+            LatencyOverlay(self)  # Outside the layout, on top of it
\ No newline at end of file
@@ -1,7 +1,7 @@
 # Imports
 from viewmodels.disk_vm import DiskViewModel
 # Qt
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QWidget, QLineEdit, QListView, QTreeView,
     QVBoxLayout, QSplitter
@@ -20,10 +20,25 @@ class UrlBox(QLineEdit):
         self.setObjectName("url")  # Enable styling by name
 
 class DirTree(QTreeView):
-    """Tree view of available directories."""
+    """Tree view of available directories.
+
+    Emits firstPainted after it first paints, so its model can be populated
+    only once the tree is on screen.
+    """
+
+    ### Signals ###
+    firstPainted = Signal()
 
     def __init__(self):
         super().__init__()
+        self._painted = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+
+        if not self._painted:
+            self._painted = True
+            self.firstPainted.emit()
 
     def format(self):
         """Hides all tree view columns except for the first."""
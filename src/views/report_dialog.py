@@ -1,61 +1,59 @@
 # Imports
 from pathlib import Path
+from views.report_renderer import ReportRenderer
 # Qt
-from PySide6.QtCore import QPoint
-from PySide6.QtWidgets import QWidget, QFileDialog
-from PySide6.QtGui import QPixmap, QPainter, QRegion
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QWidget, QFileDialog, QMessageBox
 
 
 class ReportDialog(QFileDialog):
-    """Dialog window for saving an image of an application view.
+    """Dialog window for choosing where to save a report, and for telling
+    how saving it went.
 
-    The view to be saved is passed in by a parent view reference.
+    The dialog is centered on a parent view reference.
     """
 
+    ### Constants ###
+    FILTERS = "Images (*.png *.jpg *.bmp);;PDF Documents (*.pdf)"
+
     def __init__(self, parent: QWidget):
         super().__init__()
         self._parent = parent
 
-    def save_img(self, dir: Path):
-        """Saves a screenshot of the analysis pane.
-
-        The image is a capture of the view size at the time of saving.
+    def ask_path(self, dir: Path) -> str:
+        """Asks the user for a report file path.
 
         Args:
-            dir: A Path object that represents a save location
+            dir: A Path object that represents the suggested save location
             in the filesystem.
+
+        Returns:
+            The chosen path, with a supported suffix, or '' if cancelled.
         """
 
-        # Get a file path from the user
         dir_path = f"{dir}/Report.png"
 
-        filepath, _ = self.getSaveFileName(
-            self._parent, "Save Image", dir_path,
-            "Image Files (*.png *.jpg *.bmp)"
+        filepath, selected = self.getSaveFileName(
+            self._parent, "Save Report", dir_path, ReportDialog.FILTERS
         )
 
-        if filepath:
-            # Create fixed-sized QPixmap
-            #pixmap_width = 1200  #pixels
-            #pixmap_height = 700  #pixels
-            #pixmap = QPixmap(pixmap_width, pixmap_height)
-
-            # Calculate the self._parent's size and position
-            rect = self._parent.rect()
-            pixmap = QPixmap(rect.size())
-            #scale_width = pixmap_width / rect.width()
-            #scale_height = pixmap_height / rect.height()
-
-            # Create QPainter to render the QPixmap
-            #painter = QPainter(pixmap)
-            #painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            #painter.scale(scale_width, scale_height)
-            #painter.translate(-rect.x(), -rect.y())
-
-            # Render the self._parent on the QPixmap
-            #self._parent.render(painter)
-            self._parent.render(pixmap)
-            #painter.end()
-
-            # Save the rendered self._parent as the specified file
-            pixmap.save(filepath)
\ No newline at end of file
+        # Follow the chosen filter if the name has no usable suffix
+        if filepath and Path(filepath).suffix.lower() not in ReportRenderer.FORMATS:
+            filepath += ".pdf" if "pdf" in selected.lower() else ".png"
+
+        return filepath
+
+    def show_saved(self, fpath: str):
+        self._notify(QMessageBox.Icon.Information, f"Saved report to {fpath}")
+
+    def show_failed(self, fpath: str, error: Exception):
+        self._notify(QMessageBox.Icon.Warning, f"Could not save report to {fpath}:\n{error}")
+
+    def _notify(self, icon: QMessageBox.Icon, text: str):
+        """Shows a message without blocking, as reports finish in the
+        background.
+        """
+
+        box = QMessageBox(icon, "Save Report", text, parent=self._parent)
+        box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        box.open()
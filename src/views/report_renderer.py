@@ -0,0 +1,331 @@
+# Imports
+from datetime import datetime
+from math import ceil, floor, log10
+from pathlib import Path
+import os
+import numpy as np
+# Qt
+from PySide6.QtCore import Qt, QMarginsF, QPointF, QRectF, QSizeF
+from PySide6.QtGui import (
+    QColor, QFont, QFontMetricsF, QImage, QPainter, QPageSize, QPdfWriter,
+    QPen, QPolygonF
+)
+
+
+class ReportRenderer:
+    """Draws analysis reports offscreen, at any page size and resolution.
+
+    Reports are drawn with QPainter straight from the plot pyramids, never
+    from on-screen widgets, so they can be rendered on a worker thread or in
+    a process without a window. Each trace is drawn from the pyramid level
+    that gives about two points per device pixel of its plot, so the cost
+    of a report depends on its size, not on the length of the data.
+
+    Images are written through QImage, and PDFs through QPdfWriter as
+    vector graphics. Plots keep the colors of the analysis view.
+
+    A report is a dictionary with:
+        'title': The heading, usually the file name.
+        'lines': Lines of text printed under the title.
+        'start', 'end': The plotted span of time, in seconds.
+        'channels': One dictionary per plot, with the channel's 'name' and
+            'unit' and a list of 'traces'. Each trace has a 'label', a
+            'color' (None for the view's default), a 'pyramid'
+            (EnvelopePyramid), its 'axis' (TimeAxis) and its 'stats'.
+    """
+
+    ### Constants ###
+    SIZE = (11.0, 8.5)  # Inches; landscape letter
+    DPI = 200
+    FORMATS = (".png", ".jpg", ".bmp", ".pdf")
+    MARGIN = 0.4  # Inches around the page and between a plot and its table
+    PLOT_SHARE = 0.7  # Width of the plots relative to the page
+    TRACE_COLOR = "#c8c8c8"  # The plot view's default pen
+    PLOT_BACKGROUND = "#0c0c0c"
+    GRID_COLOR = "#404040"
+    TICKS = 5  # Target number of labelled ticks per axis
+
+    def __init__(self, size: tuple[float, float] = SIZE, dpi: int = DPI):
+        self.size = size
+        self.dpi = dpi
+
+    def save(self, fpath: str, report: dict):
+        """Renders a report into an image or PDF file, chosen by suffix.
+
+        The file is written next to its destination and then moved into
+        place, so readers never see a partial file.
+
+        Raises:
+            ValueError: If the suffix is not one of FORMATS.
+            OSError: If the file cannot be written.
+        """
+
+        fpath = Path(fpath)
+        suffix = fpath.suffix.lower()
+        if suffix not in ReportRenderer.FORMATS:
+            raise ValueError(f"unsupported report format: {fpath.suffix}")
+
+        partial = fpath.with_name(f".{fpath.name}.tmp")
+        try:
+            if suffix == ".pdf":
+                self._save_pdf(partial, report)
+            else:
+                self._save_image(partial, suffix[1:].upper(), report)
+            os.replace(partial, fpath)
+        finally:
+            partial.unlink(missing_ok=True)
+
+    def _save_pdf(self, fpath: Path, report: dict):
+        writer = QPdfWriter(str(fpath))
+        writer.setResolution(self.dpi)
+        writer.setPageSize(QPageSize(QSizeF(*self.size), QPageSize.Unit.Inch))
+        writer.setPageMargins(QMarginsF(0, 0, 0, 0))
+        writer.setTitle(report['title'])
+
+        painter = QPainter(writer)
+        try:
+            self.render(painter, writer.width(), writer.height(), report)
+        finally:
+            painter.end()
+
+    def _save_image(self, fpath: Path, fmt: str, report: dict):
+        width, height = (round(inches * self.dpi) for inches in self.size)
+        image = QImage(width, height, QImage.Format.Format_RGB32)
+        image.fill(Qt.GlobalColor.white)
+        image.setDotsPerMeterX(round(self.dpi / 0.0254))  # Sizes fonts in points
+        image.setDotsPerMeterY(round(self.dpi / 0.0254))
+
+        painter = QPainter(image)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self.render(painter, width, height, report)
+        finally:
+            painter.end()
+
+        if not image.save(str(fpath), fmt):
+            raise OSError(f"could not write {fpath}")
+
+    def render(self, painter: QPainter, width: int, height: int, report: dict):
+        """Draws a report onto a painter's device of the given pixel size."""
+
+        margin = ReportRenderer.MARGIN * self.dpi
+        top = self._header(painter, QRectF(margin, margin, width - 2*margin, height), report)
+
+        channels = report['channels']
+        if not channels:
+            return
+
+        row_height = (height - margin - top) / len(channels)
+        plot_width = (width - 2*margin) * ReportRenderer.PLOT_SHARE
+        for row, channel in enumerate(channels):
+            y = top + row * row_height
+            self._plot(painter, QRectF(margin, y, plot_width, row_height), channel,
+                       report['start'], report['end'])
+            table = QRectF(margin + plot_width + margin/2, y,
+                           width - 2*margin - plot_width - margin/2, row_height)
+            self._table(painter, table, channel)
+
+    def _font(self, points: float, bold: bool = False) -> QFont:
+        font = QFont()
+        font.setPointSizeF(points)
+        font.setBold(bold)
+        return font
+
+    def _pixels(self, points: float) -> float:
+        return points * self.dpi / 72
+
+    def _header(self, painter: QPainter, rect: QRectF, report: dict) -> float:
+        """Draws the title and text lines. Returns the y below them."""
+
+        painter.setPen(Qt.GlobalColor.black)
+        y = rect.top()
+
+        lines = [(report['title'], self._font(14, bold=True))]
+        lines += [(line, self._font(8)) for line in report.get('lines', ()) if line]
+        lines.append((f"Generated {datetime.now():%Y-%m-%d %H:%M}", self._font(7)))
+
+        for text, font in lines:
+            painter.setFont(font)
+            line_height = QFontMetricsF(font, painter.device()).height()
+            painter.drawText(QRectF(rect.left(), y, rect.width(), line_height),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             text)
+            y += line_height
+
+        return y + self._pixels(6)
+
+    def _plot(self, painter: QPainter, rect: QRectF, channel: dict, start: float,
+              end: float):
+        """Draws one channel's traces over [start, end] seconds, with axes."""
+
+        font = self._font(7)
+        painter.setFont(font)
+        metrics = QFontMetricsF(font, painter.device())
+        label_width = metrics.horizontalAdvance("-0.000e+00") + self._pixels(4)
+        title_width = metrics.height() * 1.5
+
+        area = QRectF(rect.left() + title_width + label_width, rect.top(),
+                      rect.width() - title_width - label_width,
+                      rect.height() - 2 * metrics.height())
+        if area.width() <= 0 or area.height() <= 0:
+            return
+
+        # Decimate first; the y-range follows from what is drawn
+        segments = []
+        for trace in channel['traces']:
+            axis = trace['axis']
+            left = int(floor(axis.index(start)))
+            right = int(ceil(axis.index(end))) + 1
+            x, y = trace['pyramid'].segment(left, right, max_points=2*int(area.width()))
+            if len(y):
+                segments.append((axis.time(x), y, trace['color'] or ReportRenderer.TRACE_COLOR))
+
+        low, high = _y_range(segments)
+
+        painter.fillRect(area, QColor(ReportRenderer.PLOT_BACKGROUND))
+        line_width = max(1.0, self.dpi / 150)
+
+        # Grid and tick labels
+        grid = QPen(QColor(ReportRenderer.GRID_COLOR), line_width)
+        grid.setStyle(Qt.PenStyle.DotLine)
+        for value in _ticks(low, high, ReportRenderer.TICKS):
+            py = area.bottom() - (value - low) / (high - low) * area.height()
+            painter.setPen(grid)
+            painter.drawLine(QPointF(area.left(), py), QPointF(area.right(), py))
+            painter.setPen(Qt.GlobalColor.black)
+            painter.drawText(
+                QRectF(area.left() - label_width, py - metrics.height()/2,
+                       label_width - self._pixels(2), metrics.height()),
+                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                f"{value:.4g}",
+            )
+
+        if end > start:
+            for value in _ticks(start, end, ReportRenderer.TICKS):
+                px = area.left() + (value - start) / (end - start) * area.width()
+                painter.drawText(
+                    QRectF(px - label_width, area.bottom(), 2*label_width, metrics.height()),
+                    Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop,
+                    f"{value:.6g}",
+                )
+        painter.drawText(
+            QRectF(area.left(), area.bottom() + metrics.height(), area.width(),
+                   metrics.height()),
+            Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop,
+            "Time (s)",
+        )
+
+        # Axis title, rotated to read bottom to top
+        painter.save()
+        painter.translate(rect.left(), area.center().y())
+        painter.rotate(-90)
+        painter.drawText(
+            QRectF(-area.height()/2, 0, area.height(), title_width),
+            Qt.AlignmentFlag.AlignCenter,
+            f"{channel['name']} ({channel['unit']})",
+        )
+        painter.restore()
+
+        # Traces, clipped to the plot. Like the view, they are drawn one pixel
+        # wide without antialiasing; any other pen strokes every overlapping
+        # segment of an envelope, which is a hundred times slower
+        painter.save()
+        painter.setClipRect(area)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        scale_x = area.width() / (end - start) if end > start else 0.0
+        scale_y = area.height() / (high - low)
+        for times, values, color in segments:
+            px = area.left() + (times - start) * scale_x
+            py = area.bottom() - (values - low) * scale_y
+            pen = QPen(QColor(color), 1)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawPolyline(QPolygonF([QPointF(x, y) for x, y in zip(px, py)]))
+        painter.restore()
+
+        painter.setPen(QPen(Qt.GlobalColor.black, line_width))
+        painter.drawRect(area)
+
+    def _table(self, painter: QPainter, rect: QRectF, channel: dict):
+        """Draws one channel's stats: a row per stat, a column per trace."""
+
+        traces = channel['traces']
+        stats = traces[0]['stats'] if traces else []
+        if not stats:
+            return
+
+        headed = len(traces) > 1  # Name the columns only when comparing
+        rows = len(stats) + headed
+
+        # Shrink the text if the rows would not fit
+        points = min(8.0, rect.height() / rows / 1.4 / self.dpi * 72)
+        font = self._font(points)
+        painter.setFont(font)
+        row_height = QFontMetricsF(font, painter.device()).height() * 1.4
+
+        columns = len(traces) + 2  # Name, a value per trace, unit
+        name_width = rect.width() * 0.35
+        unit_width = rect.width() * 0.12
+        value_width = (rect.width() - name_width - unit_width) / (columns - 2)
+        y = rect.top()
+
+        if headed:
+            for column, trace in enumerate(traces):
+                painter.setPen(QColor(trace['color']) if trace['color'] else Qt.GlobalColor.black)
+                painter.drawText(
+                    QRectF(rect.left() + name_width + column * value_width, y,
+                           value_width, row_height),
+                    Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+                    trace['label'],
+                )
+            y += row_height
+
+        painter.setPen(Qt.GlobalColor.black)
+        for row, stat in enumerate(stats):
+            if row % 2 == 0:
+                painter.fillRect(QRectF(rect.left(), y, rect.width(), row_height),
+                                 QColor("#eeeeee"))
+
+            cells = [(stat['name'], rect.left(), name_width, Qt.AlignmentFlag.AlignLeft)]
+            for column, trace in enumerate(traces):
+                values = trace['stats']
+                value = values[row]['value'] if row < len(values) else np.nan
+                cells.append((f"{value:.3e}",
+                              rect.left() + name_width + column * value_width,
+                              value_width, Qt.AlignmentFlag.AlignRight))
+            cells.append((stat['unit'], rect.right() - unit_width + self._pixels(3),
+                          unit_width, Qt.AlignmentFlag.AlignLeft))
+
+            for text, x, cell_width, align in cells:
+                painter.drawText(QRectF(x, y, cell_width, row_height),
+                                 align | Qt.AlignmentFlag.AlignVCenter, text)
+            y += row_height
+
+
+def _y_range(segments: list) -> tuple[float, float]:
+    """Returns a padded y-range that fits every finite value drawn."""
+
+    lows = [np.nanmin(values) for _, values, _ in segments if np.isfinite(values).any()]
+    highs = [np.nanmax(values) for _, values, _ in segments if np.isfinite(values).any()]
+    if not lows:
+        return 0.0, 1.0
+
+    low, high = float(min(lows)), float(max(highs))
+    pad = (high - low) * 0.05 or abs(high) * 0.05 or 0.5
+    return low - pad, high + pad
+
+def _ticks(low: float, high: float, count: int) -> list[float]:
+    """Returns round tick values inside [low, high], about count of them."""
+
+    span = high - low
+    if not span > 0:
+        return []
+
+    step = 10 ** floor(log10(span / count))
+    for multiple in (1, 2, 5, 10):
+        if span / (step * multiple) <= count:
+            step *= multiple
+            break
+
+    first = ceil(low / step) * step
+    return [float(value) for value in np.arange(first, high + step/2, step) if value <= high]
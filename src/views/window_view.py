@@ -1,10 +1,10 @@
 # Imports
 from pathlib import Path
+from utilities.data_loader import DataLoader
+from utilities.startup import startup
 from views.disk_view import FileNav
-from views.analyzer_view import Analyzer
-from viewmodels.mediator import Mediator
 # Qt
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThreadPool, QTimer
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QHBoxLayout, QSplitter
@@ -12,7 +12,16 @@ from PySide6.QtWidgets import (
 
 
 class Window(QMainWindow):
-    """Main app GUI window."""
+    """Main app GUI window.
+
+    Only the file navigation pane is built before the window first paints.
+    The analysis pane, whose plotting and analysis modules are slow to
+    import, is built right after. The file parsers are then imported in the
+    background, ahead of the first file selection.
+
+    Closing the window, or quitting the application, cancels a build that
+    has not run yet and waits for background jobs before teardown.
+    """
 
     ### Constants ###
     WIDTH = 1200  #pixels
@@ -20,6 +29,12 @@ class Window(QMainWindow):
 
     def __init__(self):
         super().__init__(parent = None)
+        self._filenav: FileNav
+        self._splitter: QSplitter
+        self._painted = False
+        self._build_timer = QTimer(self)
+        self._build_timer.setSingleShot(True)
+        self._build_timer.timeout.connect(self._build_analyzer)
         self._build()
 
     def _build(self):
@@ -29,23 +44,62 @@ class Window(QMainWindow):
         self.setWindowTitle("Power Analyzer")
         self.resize(Window.WIDTH, Window.HEIGHT)
 
-        # Custom widgets
-        filenav = FileNav()
-        analyzer = Analyzer()
-
-        # Compose mediator for widget view-models (data highway)
-        Mediator(filenav.viewmodel, analyzer.viewmodel)
+        # Custom widgets; the analyzer takes the placeholder's place later
+        self._filenav = FileNav()
 
         # Put file navigation in its own pane
-        splitter = QSplitter(Qt.Orientation.Horizontal)
-        splitter.addWidget(filenav)
-        splitter.addWidget(analyzer)
+        self._splitter = QSplitter(Qt.Orientation.Horizontal)
+        self._splitter.addWidget(self._filenav)
+        self._splitter.addWidget(QWidget())
 
         # Compose remaining view features
         layout = QHBoxLayout()
-        layout.addWidget(splitter)
+        layout.addWidget(self._splitter)
 
         # Establish core layout
         widget = QWidget(self)
         widget.setLayout(layout)
-        self.setCentralWidget(widget)
\ No newline at end of file
+        self.setCentralWidget(widget)
+
+    def _build_analyzer(self):
+        """Builds the analysis pane and connects it. Runs once, after the
+        first paint.
+        """
+
+        from views.analyzer_view import Analyzer
+        from viewmodels.mediator import Mediator
+
+        analyzer = Analyzer()
+        placeholder = self._splitter.widget(1)
+        self._splitter.insertWidget(1, analyzer)  # Parented by the splitter
+        placeholder.deleteLater()
+
+        # Compose mediator for widget view-models (data highway)
+        Mediator(self._filenav.viewmodel, analyzer.viewmodel)
+        startup.mark("analyzer")
+        startup.finish()
+
+        QThreadPool.globalInstance().start(DataLoader.preload)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+
+        if not self._painted:
+            self._painted = True
+            startup.mark("first paint")
+            self._build_timer.start(0)
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
+
+    def shutdown(self):
+        """Stops the deferred analyzer build and waits for background jobs,
+        so none outlives the window. Queued jobs that have not started are
+        dropped.
+        """
+
+        self._build_timer.stop()
+        pool = QThreadPool.globalInstance()
+        pool.clear()
+        pool.waitForDone()